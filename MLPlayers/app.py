@@ -3,6 +3,8 @@ import pandas as pd
 import altair as alt
 import streamlit.components.v1 as components
 import os
+import sys
+import pyarrow.parquet as pq
 
 # --- Ajout TEAM_INFO pour logos et abréviations ---
 TEAM_INFO = {
@@ -118,10 +120,24 @@ def generate_player_card(template_path, player_photo_url, team_id, position, sco
     return template
 
 # 1) Chargement des données (en cache)
-@st.cache_data
+sys.path.insert(0, os.path.abspath("nba_rating/scripts"))
+from column_contracts import dashboard_columns
+from arrow_snapshots import read_snapshot
+
+DASHBOARD_SLIM = "nba_rating/data/curated/dashboard_slim.parquet"
+DASHBOARD_FULL = "nba_rating/data/curated/dashboard_data.parquet"
+
+# cache_resource + instantané Arrow memory-mappé : partagé entre workers
+@st.cache_resource
 def load_data():
-    df = pd.read_parquet("nba_rating/data/curated/dashboard_data.parquet")
-    return df
+    snap = read_snapshot("dashboard")
+    if snap is not None:
+        return snap
+    if os.path.exists(DASHBOARD_SLIM):
+        return pd.read_parquet(DASHBOARD_SLIM)
+    # Artefact slim pas encore généré : lecture projetée de l'artefact complet
+    cols = dashboard_columns(pq.read_schema(DASHBOARD_FULL).names)
+    return pd.read_parquet(DASHBOARD_FULL, columns=cols)
 
 df = load_data()
 
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+arrow_snapshots.py
+------------------
+Instantanés Arrow IPC (Feather v2, non compressés) des tables lues par les
+dashboards, dans data/snapshots/ (surchargeable via NBA_SNAPSHOT_DIR) :
+  · dashboard    ← curated/dashboard_slim.parquet        (dashboard_data.py)
+  · team_gamelog ← dataset raw/team_gamelog              (MLTeams prepare_curated.py)
+  · pair_preds   ← MLTeams/data/curated/all_pair_preds.parquet
+
+Les apps les ouvrent en memory-map (`read_snapshot`) : pas de décompression
+ni de décodage Parquet, les colonnes numériques sans manquants sont vues
+directement dans le page cache de l'OS, partagé par tous les workers
+Streamlit d'une même machine.
+
+Usage :
+    python nba_rating/scripts/arrow_snapshots.py     # (re)génère tous les instantanés
+"""
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.feather as feather
+
+BASE = Path(__file__).resolve().parents[1]
+SNAPSHOT_DIR = Path(os.environ.get("NBA_SNAPSHOT_DIR", BASE / "data" / "snapshots"))
+SOURCES = {
+    "dashboard":  BASE / "data" / "curated" / "dashboard_slim.parquet",
+    "pair_preds": BASE.parents[1] / "MLTeams" / "data" / "curated" / "all_pair_preds.parquet",
+}
+
+
+def snapshot_path(name: str) -> Path:
+    return SNAPSHOT_DIR / f"{name}.arrow"
+
+
+def write_snapshot(df: pd.DataFrame, name: str) -> Path:
+    """Écrit l'instantané `name` (Feather v2 non compressé, écriture atomique)."""
+    path = snapshot_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    feather.write_feather(df, tmp, compression="uncompressed", version=2)
+    tmp.replace(path)
+    print(f"🧊 Instantané Arrow : {path.name} ({len(df):,} lignes)")
+    return path
+
+
+def read_snapshot(name: str, columns=None) -> pd.DataFrame | None:
+    """
+    Ouvre l'instantané en memory-map (None s'il n'existe pas).
+    split_blocks évite la consolidation pandas, qui recopierait chaque colonne.
+    """
+    path = snapshot_path(name)
+    if not path.exists():
+        return None
+    table = feather.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+if __name__ == "__main__":
+    from gamelog_store import gamelog_seasons, scan_gamelogs
+
+    for name, src in SOURCES.items():
+        if src.exists():
+            write_snapshot(pd.read_parquet(src), name)
+        else:
+            print(f"⚠️  {src.name} manquant – instantané {name} non généré")
+    if gamelog_seasons("T"):
+        write_snapshot(scan_gamelogs("T"), "team_gamelog")
+    else:
+        print("⚠️  dataset team_gamelog vide – instantané team_gamelog non généré")
@@ -14,10 +14,14 @@ import pandas as pd
 from pathlib import Path
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
+from column_contracts import CLUSTER_INPUT, available
+from compact_schema import compact
+from parquet_io import write_parquet
 
 # Répertoire des données curées
 BASE    = Path(__file__).resolve().parents[1] / "data" / "curated"
-SEASONS = [f"{y}-{str(y+1)[-2:]}" for y in range(1999, 2024)]
+# toutes les saisons curées présentes, saison en cours (ingest_daemon) comprise
+SEASONS = sorted(p.stem.removeprefix("player_season_") for p in BASE.glob("player_season_*.parquet"))
 OUT     = BASE / "player_clusters.parquet"
 
 # 1) Charger et concaténer toutes les saisons
@@ -26,7 +30,7 @@ for season in SEASONS:
     p = BASE / f"player_season_{season}.parquet"
     if not p.exists():
         continue
-    df = pd.read_parquet(p)
+    df = pd.read_parquet(p, columns=available(p, CLUSTER_INPUT))
     df["season"] = season
     dfs.append(df)
 if not dfs:
@@ -65,5 +69,5 @@ df_cluster["profile_name"] = df_cluster["player_cluster"].map(cluster_names)
 
 # 7) Sélection et sauvegarde
 out = df_cluster[["PLAYER_ID", "season", "player_cluster", "profile_name"]]
-out.to_parquet(OUT, index=False)
+write_parquet(compact(out, categories=False), OUT, sort_by=["PLAYER_ID", "season"])
 print(f"✅ Clustering terminé : {len(out)} lignes écrites dans {OUT}")
\ No newline at end of file
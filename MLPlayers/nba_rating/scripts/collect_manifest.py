@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+collect_manifest.py
+-------------------
+Manifest de collecte (raw/_manifest.json) : pour chaque (saison, endpoint)
+  · status      : running | done | failed | corrupt
+  · rows        : nombre de lignes du parquet (métadonnées, sans lecture)
+  · sha256      : checksum du fichier écrit
+  · duration_s  : durée de la collecte
+  · updated_at  : horodatage
+
+Un run interrompu laisse l'entrée en "running" ; un parquet vide ou dont le
+checksum ne correspond plus n'est jamais considéré comme terminé.
+En reprise (`--resume`), un fichier existant sans entrée "done" (écrit avant
+le manifest, ou par un run interrompu après l'écriture) est relu : lisible et
+non vide, il est adopté tel quel ; sinon il est supprimé puis recollecté.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+
+import pyarrow.parquet as pq
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def parquet_rows(path: Path) -> int:
+    return pq.ParquetFile(path).metadata.num_rows
+
+
+def readable_rows(path: Path) -> int | None:
+    """Nombre de lignes si le parquet se relit entièrement, None sinon."""
+    try:
+        return pq.read_table(path).num_rows
+    except Exception:
+        return None
+
+
+class CollectManifest:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.entries = json.loads(self.path.read_text()) if self.path.exists() else {}
+
+    @staticmethod
+    def key(season: str, endpoint: str) -> str:
+        return f"{season}/{endpoint}"
+
+    def get(self, season: str, endpoint: str) -> dict:
+        return self.entries.get(self.key(season, endpoint), {})
+
+    def _set(self, season: str, endpoint: str, **fields):
+        with self.lock:
+            entry = self.entries.setdefault(self.key(season, endpoint), {})
+            entry.update(fields, updated_at=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+            tmp = self.path.with_suffix(f".tmp{os.getpid()}")
+            tmp.write_text(json.dumps(self.entries, indent=1, sort_keys=True))
+            tmp.replace(self.path)
+
+    def start(self, season, endpoint):
+        self._set(season, endpoint, status="running")
+
+    def fail(self, season, endpoint, error: str):
+        self._set(season, endpoint, status="failed", error=error)
+
+    def done(self, season, endpoint, path: Path, duration: float | None):
+        self._set(season, endpoint, status="done", error=None,
+                  rows=parquet_rows(path), sha256=file_sha256(path),
+                  duration_s=None if duration is None else round(duration, 3),
+                  path=str(path))
+
+    def is_done(self, season, endpoint, path: Path) -> bool:
+        entry = self.get(season, endpoint)
+        return entry.get("status") == "done" and entry.get("rows", 0) > 0 and path.exists()
+
+    def verify(self) -> list[str]:
+        """Recontrôle checksum / nb de lignes de toutes les entrées "done", sans réseau."""
+        problems = []
+        for key, entry in sorted(self.entries.items()):
+            if entry.get("status") != "done":
+                continue
+            season, endpoint = key.split("/", 1)
+            path = Path(entry["path"])
+            if not path.exists():
+                err = "fichier absent"
+            elif file_sha256(path) != entry.get("sha256"):
+                err = "checksum différent"
+            elif parquet_rows(path) == 0:
+                err = "0 ligne"
+            else:
+                continue
+            problems.append(f"{key} : {err}")
+            self._set(season, endpoint, status="corrupt", error=err)
+        return problems
+
+    def tracked(self, endpoint: str, path_of, resume: bool = False):
+        """
+        Décorateur pour un collecteur `fn(season, ...)` qui écrit `path_of(season)`.
+        En mode resume, une entrée terminée est sautée ; une sortie existante
+        sans entrée terminée est adoptée si elle se relit et n'est pas vide
+        (sauf si verify l'a marquée corrompue), sinon supprimée puis recollectée.
+        """
+        def deco(fn):
+            @wraps(fn)
+            def wrapper(season, *args, **kwargs):
+                path = path_of(season)
+                if resume:
+                    if self.is_done(season, endpoint, path):
+                        return None
+                    if path.exists():
+                        if (self.get(season, endpoint).get("status") != "corrupt"
+                                and path.stat().st_size > 0 and readable_rows(path)):
+                            # fichier antérieur au manifest : adopté, pas recollecté
+                            self.done(season, endpoint, path, None)
+                            return None
+                        path.unlink()
+                before = path.stat().st_mtime_ns if path.exists() else None
+                t0 = time.perf_counter()
+                if before is not None and self.get(season, endpoint).get("status") == "done":
+                    # sortie déjà enregistrée : ne re-hasher que si le collecteur la réécrit
+                    out = fn(season, *args, **kwargs)
+                    if path.exists() and path.stat().st_mtime_ns != before:
+                        self.done(season, endpoint, path, time.perf_counter() - t0)
+                    return out
+
+                self.start(season, endpoint)
+                try:
+                    out = fn(season, *args, **kwargs)
+                except Exception as e:
+                    self.fail(season, endpoint, str(e))
+                    raise
+                if path.exists():
+                    # fichier antérieur au manifest : adopté sans durée de collecte
+                    fresh = before is None or path.stat().st_mtime_ns != before
+                    self.done(season, endpoint, path, time.perf_counter() - t0 if fresh else None)
+                else:
+                    self.fail(season, endpoint, "aucune sortie écrite")
+                return out
+            return wrapper
+        return deco
@@ -5,26 +5,48 @@
 collect_raw.py
 --------------
 Collecte les données brutes NBA :
-  · player_gamelog (P)
-  · player_phys + POSITION + EXP (CommonTeamRoster)
-  · bulk offense → esv_mean (LeagueDashPlayerStats)
-  · team pace via GameLog (T)
+  · player_gamelog (P) et team_gamelog (T), dans le store partagé avec MLTeams
+  · player_phys + POSITION + EXP (CommonTeamRoster, 30 équipes en parallèle,
+    rosters intermédiaires dans raw/_rosters/{season}/)
+  · esv_mean et team pace dérivés localement des gamelogs (aucun appel API)
   · DEF_RATING désactivé pour rapidité
+
+Toutes les requêtes passent par la session partagée de nba_client.py
+(token bucket commun, débit ajusté en AIMD) ; `--workers N` collecte plusieurs saisons/endpoints
+en parallèle. `--incremental` ajoute aux gamelogs existants les seuls matchs
+joués depuis la dernière collecte (rafraîchissement de la saison en cours).
+
+Chaque (saison, endpoint) est tracé dans raw/_manifest.json (statut, lignes,
+checksum, durée) : `--resume` reprend exactement le travail non terminé,
+`--verify` recontrôle les checksums sans rien télécharger.
+Un rapport de télémétrie (latences, octets, lignes, retries, attentes par
+endpoint et saison) est écrit dans data/reports/ à chaque run.
+
+Usage :
+    python nba_rating/scripts/collect_raw.py [--workers 4]
+    python nba_rating/scripts/collect_raw.py --incremental --season 2024-25
+    python nba_rating/scripts/collect_raw.py --verify && python nba_rating/scripts/collect_raw.py --resume
 """
-import time, random
+import argparse
+from functools import partial
 from pathlib import Path
 import pandas as pd
-from tqdm import tqdm
 from nba_api.stats.static import teams
-from nba_api.stats.endpoints import (
-    LeagueGameLog,
-    CommonTeamRoster,
-    LeagueDashPlayerStats,
+from nba_api.stats.endpoints import CommonTeamRoster
+from nba_client import (
+    install_session, print_metrics, write_report, run_parallel, with_retry, MAX_WORKERS,
 )
+from telemetry import TELEMETRY
+from gamelog_store import update_gamelog, gamelog_path, derive_esv, derive_pace
+from collect_manifest import CollectManifest
+from compact_schema import compact
+from parquet_io import write_parquet
 
 # Répertoire raw
 RAW_DIR = Path("nba_rating/data/raw")
 RAW_DIR.mkdir(parents=True, exist_ok=True)
+MANIFEST_PATH = RAW_DIR / "_manifest.json"
+REPORT_DIR    = Path("nba_rating/data/reports")
 
 SEASONS = [f"{y}-{str(y+1)[-2:]}" for y in range(1999, 2024)]
 TEAMS   = teams.get_teams()
@@ -36,75 +58,151 @@ def convert_height(ht: str) -> float:
     except:
         return None
 
-def collect_gamelog(season: str):
-    out_path = RAW_DIR / f"player_gamelog_{season}.parquet"
-    if out_path.exists():
+def collect_gamelog(season: str, incremental: bool = False):
+    out_path = gamelog_path("P", season)
+    added = update_gamelog(out_path, "P", season, incremental=incremental)
+    if added is None:
         print(f"📁 Gamelog {season} déjà présent")
-        return
-    df = LeagueGameLog(
-        player_or_team_abbreviation="P",
-        season=season,
-        season_type_all_star="Regular Season",
-        timeout=60
-    ).get_data_frames()[0]
-    df.to_parquet(out_path, index=False)
-    print(f"✅ {season}: {len(df)} lignes")
-    time.sleep(1)
-
-def collect_phys(season: str):
-    out_path = RAW_DIR / f"player_phys_{season}.parquet"
+    elif incremental:
+        print(f"✅ {season}: +{added} lignes (incrémental)")
+    else:
+        print(f"✅ {season}: {added} lignes")
+
+def _fetch_roster(tm: dict, season: str, team_dir: Path):
+    """Roster d'une équipe (avec retry), persisté pour ne pas le redemander au prochain run."""
+    df_tm = with_retry(
+        lambda: CommonTeamRoster(tm["id"], season, timeout=30).get_data_frames()[0],
+        endpoint="commonteamroster", season=season,
+    )
+    TELEMETRY.add_rows("commonteamroster", season, len(df_tm))
+    write_parquet(df_tm, team_dir / f"{tm['id']}.parquet", sort_by=["PLAYER_ID"])
+
+def collect_phys(season: str, workers: int = MAX_WORKERS):
+    out_path = phys_path(season)
     if out_path.exists():
         print(f"📁 Physiques {season} déjà présent")
         return
-    rows = []
-    for tm in tqdm(TEAMS, desc=f"Mensurations {season}"):
-        try:
-            df_tm = CommonTeamRoster(tm["id"], season, timeout=30).get_data_frames()[0]
-            rows.append(df_tm)
-        except:
-            pass
-        time.sleep(random.uniform(0.3, 0.6))
+    # Un fichier par équipe : seules les équipes en échec sont redemandées.
+    # Un roster vide (franchise inexistante cette saison) compte comme collecté.
+    team_dir = RAW_DIR / "_rosters" / season
+    team_dir.mkdir(parents=True, exist_ok=True)
+    todo = [tm for tm in TEAMS if not (team_dir / f"{tm['id']}.parquet").exists()]
+    failed = run_parallel(
+        [(tm["abbreviation"], lambda tm=tm: _fetch_roster(tm, season, team_dir)) for tm in todo],
+        workers=workers,
+        desc=f"Mensurations {season}",
+    )
+    if failed:
+        print(f"⚠️ {season}: {len(failed)}/{len(TEAMS)} équipes manquantes {sorted(failed)}"
+              f" → relancer pour compléter")
+        return
+
+    rows = [pd.read_parquet(team_dir / f"{tm['id']}.parquet") for tm in TEAMS]
     df = pd.concat(rows, ignore_index=True)
     df["height_cm"] = df["HEIGHT"].apply(convert_height)
     df["weight_kg"] = pd.to_numeric(df["WEIGHT"], errors="coerce") / 2.205
     df["bmi"]       = df["weight_kg"] / (df["height_cm"]/100)**2
     df = df.rename(columns={"AGE":"age","EXP":"exp"})
-    df.to_parquet(out_path, index=False)
-    print(f"✅ {season}: {len(df)} joueurs physiques")
+    write_parquet(compact(df, categories=False), out_path, sort_by=["PLAYER_ID"])
+    print(f"✅ {season}: {len(df)} joueurs physiques ({len(TEAMS)} équipes)")
 
-def collect_esv(season: str):
-    out_path = RAW_DIR / f"player_esv_{season}.parquet"
-    if out_path.exists():
+def collect_esv(season: str, refresh: bool = False):
+    out_path = esv_path(season)
+    if out_path.exists() and not refresh:
         return
-    bulk = LeagueDashPlayerStats(
-        season=season,
-        season_type_all_star="Regular Season"
-    ).get_data_frames()[0]
-    bulk["esv_mean"] = ((bulk["FGM"] - bulk["FG3M"]) * 2 + bulk["FG3M"] * 3) / bulk["GP"]
-    bulk[["PLAYER_ID","esv_mean"]].to_parquet(out_path, index=False)
-    print(f"✅ {season}: ESV pour {len(bulk)} joueurs")
-
-def collect_pace(season: str):
-    out_path = RAW_DIR / f"team_pace_{season}.parquet"
-    if out_path.exists():
+    gl = pd.read_parquet(gamelog_path("P", season), columns=["PLAYER_ID", "GAME_ID", "FGM", "FG3M"])
+    esv = derive_esv(gl)
+    write_parquet(compact(esv), out_path, sort_by=["PLAYER_ID"])
+    print(f"✅ {season}: ESV pour {len(esv)} joueurs")
+
+def collect_team_gamelog(season: str, incremental: bool = False):
+    # Le team gamelog est stocké tel quel : MLTeams le lit au même endroit
+    update_gamelog(gamelog_path("T", season), "T", season, incremental=incremental)
+
+def collect_pace(season: str, refresh: bool = False):
+    out_path = pace_path(season)
+    if out_path.exists() and not refresh:
         return
-    tgl = LeagueGameLog(
-        player_or_team_abbreviation="T",
-        season=season,
-        season_type_all_star="Regular Season",
-        timeout=60
-    ).get_data_frames()[0]
-    tgl["poss"] = tgl["FGA"] + 0.4*tgl["FTA"] - tgl["OREB"] + tgl["TOV"]
-    pace = tgl.groupby("TEAM_ID")["poss"].mean().reset_index().rename(columns={"poss":"pace"})
-    pace.to_parquet(out_path, index=False)
+    tgl = pd.read_parquet(gamelog_path("T", season), columns=["TEAM_ID", "FGA", "FTA", "OREB", "TOV"])
+    pace = derive_pace(tgl)
+    write_parquet(compact(pace), out_path, sort_by=["TEAM_ID"])
     print(f"✅ {season}: Pace pour {len(pace)} équipes")
 
+def esv_path(season: str) -> Path:
+    return RAW_DIR / f"player_esv_{season}.parquet"
+
+def pace_path(season: str) -> Path:
+    return RAW_DIR / f"team_pace_{season}.parquet"
+
+def phys_path(season: str) -> Path:
+    return RAW_DIR / f"player_phys_{season}.parquet"
+
+def build_collectors(manifest: CollectManifest, resume: bool, incremental: bool):
+    """
+    Collecteurs d'une saison, chacun enregistré dans le manifest sous son endpoint.
+    Les dérivations locales restent dans la même tâche que le gamelog dont elles dépendent.
+    """
+    track = partial(manifest.tracked, resume=resume)
+    gamelog  = track("player_gamelog", partial(gamelog_path, "P"))(collect_gamelog)
+    esv      = track("player_esv", esv_path)(collect_esv)
+    team_gl  = track("team_gamelog", partial(gamelog_path, "T"))(collect_team_gamelog)
+    pace     = track("team_pace", pace_path)(collect_pace)
+    phys     = track("player_phys", phys_path)(collect_phys)
+
+    def collect_players(season: str):
+        """Gamelog joueurs puis ESV dérivé localement."""
+        gamelog(season, incremental=incremental)
+        esv(season, refresh=incremental)
+
+    def collect_teams(season: str):
+        """Team gamelog puis pace dérivé localement."""
+        team_gl(season, incremental=incremental)
+        pace(season, refresh=incremental)
+
+    return [collect_players, collect_teams, phys]
+
 if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Collecte des données brutes NBA")
+    p.add_argument("--workers", type=int, default=1,
+                   help=f"Nombre d'appels simultanés (1 = séquentiel, conseillé ≤ {MAX_WORKERS})")
+    p.add_argument("--incremental", action="store_true",
+                   help="Ajoute les nouveaux matchs aux gamelogs existants au lieu de les ignorer")
+    p.add_argument("--season", action="append",
+                   help="Saison(s) à collecter, ex. 2024-25 (défaut : 1999-00 → 2023-24)")
+    p.add_argument("--resume", action="store_true",
+                   help="Ne refait que les (saison, endpoint) non terminés d'après le manifest")
+    p.add_argument("--verify", action="store_true",
+                   help="Recontrôle les checksums du manifest sans rien collecter")
+    args = p.parse_args()
+
+    manifest = CollectManifest(MANIFEST_PATH)
+    if args.verify:
+        problems = manifest.verify()
+        for pb in problems:
+            print(f"❌ {pb}")
+        print(f"{'⚠️' if problems else '✅'} Vérification : {len(problems)} problème(s) "
+              f"sur {len(manifest.entries)} entrées → relancer avec --resume")
+        raise SystemExit(1 if problems else 0)
+
+    seasons    = args.season or SEASONS
+    collectors = build_collectors(manifest, args.resume, args.incremental)
+    install_session()
     print(f"📦 Collecte raw dans {RAW_DIR.resolve()}")
-    for season in SEASONS:
-        print(f"\n=== Saison {season} ===")
-        collect_gamelog(season)
-        collect_phys(season)
-        collect_esv(season)
-        collect_pace(season)
+    if args.workers <= 1:
+        for season in seasons:
+            print(f"\n=== Saison {season} ===")
+            for collect in collectors:
+                collect(season)
+    else:
+        # Chaque (saison, endpoint) est une tâche indépendante : le bucket
+        # partagé garde le débit global au niveau de la limite de l'API.
+        tasks = [
+            (f"{collect.__name__} {season}", lambda c=collect, s=season: c(s))
+            for season in seasons for collect in collectors
+        ]
+        failed = run_parallel(tasks, workers=args.workers)
+        if failed:
+            print(f"\n⚠️ {len(failed)} tâches en échec : {sorted(failed)}")
+    print_metrics()
+    write_report(REPORT_DIR, "collect_raw")
     print("\n✅ Collecte raw terminée.")
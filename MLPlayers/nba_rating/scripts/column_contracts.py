@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+column_contracts.py
+-------------------
+Contrats de colonnes : ce que chaque consommateur lit réellement.
+Les lectures parquet sont projetées sur ces listes (seules les colonnes
+utiles sont décodées) au lieu de charger des fichiers entiers.
+
+  · SEASON_FEATURES    : build_dataset_ml  ← curated/player_season_*.parquet
+  · CLUSTER_INPUT      : cluster_players   ← curated/player_season_*.parquet
+  · DASHBOARD_COLUMNS  : app.py (onglet joueurs) ← curated/dashboard_slim.parquet
+  · TEAM_GAMELOG_COLUMNS : app.py / dashboards MLTeams ← raw/team_gamelog
+"""
+from pathlib import Path
+
+import pyarrow.parquet as pq
+
+KEYS = ["PLAYER_ID", "season"]
+
+SEASON_FEATURES = [
+    "PLAYER_ID",
+    "pts_mean", "reb_mean", "ast_mean", "plus_minus_mean",
+    "efg_pct", "ts_pct", "stl_mean", "blk_mean", "tov_mean",
+    "pts36", "reb36", "ast36", "stl36", "blk36", "tov36", "pm36",
+    "min_per_game", "gp",
+    "esv_mean", "pace",
+    "height_cm", "bmi", "age", "exp",
+]
+
+CLUSTER_INPUT = [
+    "PLAYER_ID", "gp", "avail",
+    "pts_mean", "reb_mean", "ast_mean", "plus_minus_mean",
+    "height_cm", "bmi", "age",
+]
+
+# app.py détecte certaines colonnes par motif (nom, cluster, poste, équipe…) :
+# on garde toutes celles qui correspondent, dans leur ordre d'origine.
+DASHBOARD_COLUMNS = [
+    "PLAYER_ID", "season", "player_name", "score_100",
+    "pts_mean", "reb_mean", "ast_mean", "win_shares", "vorp", "Win_Shares", "VORP",
+    "efg_pct", "ts_pct", "ast_tov_ratio", "usage_rate",
+    "age", "exp", "height_cm", "weight_kg", "avail",
+    "photo_url", "yt_clip_url",
+    "proj_1", "proj_2", "proj_3", "proj_4", "proj_5",
+]
+DASHBOARD_PATTERNS = ["name", "cluster", "profile", "position", "team"]
+DASHBOARD_EXACT_LOWER = {"pos", "player_pos"}
+
+TEAM_GAMELOG_COLUMNS = [
+    "season", "GAME_DATE", "TEAM_ID", "TEAM_NAME", "TEAM_ABBREVIATION",
+    "WL", "PTS", "AST", "REB", "STL", "BLK",
+]
+
+
+def available(path: Path, wanted, rename=None) -> list[str]:
+    """
+    Colonnes de `wanted` présentes dans le parquet (lecture du seul schéma).
+    `rename` permet de matcher des noms physiques variantes (ex. suffixes _x/_y).
+    """
+    wanted = set(wanted)
+    rename = rename or (lambda c: c)
+    return [c for c in pq.read_schema(path).names if rename(c) in wanted]
+
+
+def dashboard_columns(columns) -> list[str]:
+    """Colonnes du contrat dashboard parmi `columns`, ordre d'origine conservé."""
+    wanted = set(DASHBOARD_COLUMNS)
+    return [
+        c for c in columns
+        if c in wanted
+        or c.lower() in DASHBOARD_EXACT_LOWER
+        or any(p in c.lower() for p in DASHBOARD_PATTERNS)
+    ]
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+compact_schema.py
+-----------------
+Types compacts appliqués à l'ingestion (gamelogs, phys, esv, pace) et à la
+curation (player_season, scores, dataset ML, dashboard), conservés dans le
+Parquet :
+  · identifiants (PLAYER_ID, TEAM_ID, GAME_ID "0022300001" → 22300001) : int32
+  · SEASON_ID "22023" → int16 ; la saison "YYYY-YY" des gamelogs n'est plus
+    stockée par ligne (clé de partition, lue en dictionnaire)
+  · chaînes répétées (TEAM_NAME, MATCHUP, WL, PLAYER_NAME…) : category
+  · compteurs (FGM, PTS, REB, gp…) : int16, ou float32 s'il y a des manquants
+  · features par match (moyennes, %, per36…) : float32
+
+La colonne `season` des tables curées reste une chaîne : elle sert de clé de
+jointure et de comparaison (saison < début de carrière) dans les dashboards,
+et ces tables ne font que quelques milliers de lignes par saison.
+"""
+import numpy as np
+import pandas as pd
+
+ID_COLS  = {"PLAYER_ID", "TEAM_ID", "GAME_ID", "TeamID", "team_id"}
+SMALL_INT_COLS = {"SEASON_ID", "VIDEO_AVAILABLE"}
+CATEGORY_COLS = {
+    "PLAYER_NAME", "TEAM_ABBREVIATION", "TEAM_NAME", "MATCHUP", "WL",
+    "POSITION", "SCHOOL", "HOW_ACQUIRED", "SEASON", "LeagueID",
+}
+COUNT_COLS = {
+    "MIN", "FGM", "FGA", "FG3M", "FG3A", "FTM", "FTA", "OREB", "DREB", "REB",
+    "AST", "STL", "BLK", "TOV", "PF", "PTS", "PLUS_MINUS", "gp",
+}
+
+
+def _to_int(s: pd.Series, dtype: str) -> pd.Series:
+    """Entier compact si la colonne est entière et complète, float32 sinon."""
+    s = pd.to_numeric(s, errors="coerce")
+    if s.isna().any() or not np.all(np.mod(s.to_numpy(dtype="float64"), 1) == 0):
+        return s.astype("float32")
+    return s.astype(dtype)
+
+
+def _to_id(s: pd.Series) -> pd.Series:
+    s = pd.to_numeric(s, errors="coerce")
+    return s.astype("Int32") if s.isna().any() else s.astype("int32")
+
+
+def compact(df: pd.DataFrame, categories: bool = True) -> pd.DataFrame:
+    """
+    Applique les types compacts aux colonnes connues ; les autres flottants
+    passent en float32. `categories=False` laisse les chaînes telles quelles
+    (tables lues par les dashboards, qui les filtrent comme des str).
+    """
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if col in ID_COLS:
+            out[col] = _to_id(s)
+        elif col in SMALL_INT_COLS:
+            out[col] = _to_int(s, "int16")
+        elif col in COUNT_COLS and pd.api.types.is_numeric_dtype(s):
+            out[col] = _to_int(s, "int16")
+        elif col == "GAME_DATE":
+            out[col] = pd.to_datetime(s)
+        elif categories and col in CATEGORY_COLS:
+            out[col] = s.astype("category")
+        elif pd.api.types.is_float_dtype(s):
+            out[col] = s.astype("float32")
+        else:
+            out[col] = s
+    return pd.DataFrame(out, index=df.index)
@@ -5,96 +5,134 @@ compute_rating_all.py
 ---------------------
 1) Calcule score_100 pour chaque saison (merge dans player_season_{season}.parquet)
 2) Construit all_seasons_scores.parquet avec (PLAYER_ID, season, score_100)
+
+`score_season` (calcul seul, sans I/O) est aussi appelée par curate_players.py.
+`--jobs N` répartit les saisons sur N processus (season_pool.py) ;
+`--backend polars` calcule les scores en requêtes lazy (polars_backend.py).
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 from scipy.stats import zscore
 from pathlib import Path
 import pyarrow.parquet as pq
 import sys
+from compact_schema import compact
+from parquet_io import write_parquet
+from season_pool import add_jobs_argument, map_seasons
+from polars_backend import add_backend_argument
 
 # Répertoires
 BASE    = Path(__file__).resolve().parents[1]
 CURATED = BASE / "data" / "curated"
 
-def compute_per_season(season):
-    path = CURATED / f"player_season_{season}.parquet"
-    df   = pd.read_parquet(path)
+# Features à normaliser
+basic         = ["pts_mean","reb_mean","ast_mean","plus_minus_mean","avail"]
+advanced_rate = ["efg_pct","ts_pct","stl_mean","blk_mean","tov_mean"]
+per36         = ["pts36","reb36","ast36","stl36","blk36","tov36","pm36"]
+context       = ["esv_mean","pace"]
+phys          = ["height_cm","bmi","age","exp"]
 
-    # 1) Disponibilité
-    df["avail"] = pd.to_numeric(df["gp"], errors="coerce") / 82
+TO_Z = basic + advanced_rate + per36 + context + phys
 
-    # 2) Features à normaliser
-    basic         = ["pts_mean","reb_mean","ast_mean","plus_minus_mean","avail"]
-    advanced_rate = ["efg_pct","ts_pct","stl_mean","blk_mean","tov_mean"]
-    per36         = ["pts36","reb36","ast36","stl36","blk36","tov36","pm36"]
-    context       = ["esv_mean","pace"]
-    phys          = ["height_cm","bmi","age","exp"]
+# Poids de la note brute
+WEIGHTS = {
+    "pts_mean": 0.25, "reb_mean": 0.10, "ast_mean": 0.10, "plus_minus_mean": 0.15,
+    "avail": 0.05,
+    "efg_pct": 0.10, "ts_pct": 0.10,
+    "stl_mean": 0.05, "blk_mean": 0.05, "tov_mean": -0.05,
+    "pts36": 0.10, "reb36": 0.05, "ast36": 0.05,
+    "stl36": 0.03, "blk36": 0.03, "tov36": -0.03, "pm36": 0.05,
+    "esv_mean": 0.05, "pace": 0.05,
+    "height_cm": 0.02, "bmi": -0.02, "age": -0.05, "exp": 0.05
+}
 
-    to_z = basic + advanced_rate + per36 + context + phys
 
-    # 3) Coercition en numérique & imputation, puis z-score
-    for col in to_z:
+def score_season(df: pd.DataFrame, season: str) -> pd.DataFrame:
+    """Ajoute avail, score_100 et season à la table joueur/saison `df`."""
+    df = df.copy()
+
+    # 1) Disponibilité
+    df["avail"] = pd.to_numeric(df["gp"], errors="coerce") / 82
+
+    # 2) Coercition en numérique & imputation, puis z-score
+    for col in TO_Z:
         df[col] = pd.to_numeric(df[col], errors="coerce")
-        df[col].fillna(df[col].mean(), inplace=True)
+        df[col] = df[col].fillna(df[col].mean())
         df[f"Z_{col}"] = zscore(df[col])
 
-    # 4) Poids de la note brute
-    weights = {
-        "pts_mean": 0.25, "reb_mean": 0.10, "ast_mean": 0.10, "plus_minus_mean": 0.15,
-        "avail": 0.05,
-        "efg_pct": 0.10, "ts_pct": 0.10,
-        "stl_mean": 0.05, "blk_mean": 0.05, "tov_mean": -0.05,
-        "pts36": 0.10, "reb36": 0.05, "ast36": 0.05,
-        "stl36": 0.03, "blk36": 0.03, "tov36": -0.03, "pm36": 0.05,
-        "esv_mean": 0.05, "pace": 0.05,
-        "height_cm": 0.02, "bmi": -0.02, "age": -0.05, "exp": 0.05
-    }
-
-    # 5) Calcul de note_raw et normalisation 0–100
-    df["note_raw"] = sum(df[f"Z_{f}"] * w for f, w in weights.items())
+    # 3) Calcul de note_raw et normalisation 0–100
+    df["note_raw"] = sum(df[f"Z_{f}"] * w for f, w in WEIGHTS.items())
     mn, mx = df["note_raw"].min(), df["note_raw"].max()
     df["score_100"] = 100 * (df["note_raw"] - mn) / (mx - mn)
 
-    # 6) Nettoyage des colonnes intermédiaires
-    drop_cols = [f"Z_{c}" for c in to_z] + ["note_raw"]
+    # 4) Nettoyage des colonnes intermédiaires
+    drop_cols = [f"Z_{c}" for c in TO_Z] + ["note_raw"]
     df.drop(columns=drop_cols, inplace=True, errors="ignore")
 
     # Assurez-vous d’ajouter la saison comme colonne
     df["season"] = season
+    return df
 
+
+def write_scored(df: pd.DataFrame, season: str) -> pd.DataFrame:
     # Sauvegarde de player_season_{season}.parquet
-    df.to_parquet(path, index=False)
-    print(f"✅ Saison {season} mise à jour → score_100 ajouté")
+    path = CURATED / f"player_season_{season}.parquet"
+    write_parquet(compact(df, categories=False), path, sort_by=["PLAYER_ID"])
 
     # Retour pour l’agrégation globale
     return df[["PLAYER_ID", "season", "score_100"]]
 
 
-
-# 1) Récupère la liste des saisons
-files   = sorted(CURATED.glob("player_season_*.parquet"))
-seasons = [f.stem.split("_")[-1] for f in files]
-
-all_scores = []
-for s in seasons:
-    # 2) Vérifie via le schéma parquet que les colonnes avancées existent
-    schema = pq.ParquetFile(CURATED / f"player_season_{s}.parquet").schema.names
-    missing = [c for c in ("efg_pct", "ts_pct") if c not in schema]
-    if missing:
-        print(f"⚠️ Skip saison {s}: colonnes manquantes {missing}")
-        continue
-
-    # 3) Calcul pour cette saison
-    all_scores.append(compute_per_season(s))
-
-if not all_scores:
-    print("❌ Aucune saison traitée : vérifie feature_engineering.py")
-    sys.exit(1)
-
-# 4) Concatène et sauvegarde le fichier global
-df_all = pd.concat(all_scores, ignore_index=True)
-out    = CURATED / "all_seasons_scores.parquet"
-df_all.to_parquet(out, index=False)
-print(f"\n🎉 all_seasons_scores.parquet généré ({len(df_all)} lignes)")
\ No newline at end of file
+def compute_per_season(season):
+    path = CURATED / f"player_season_{season}.parquet"
+    return write_scored(score_season(pd.read_parquet(path), season), season)
+
+
+def write_all_scores(all_scores: list[pd.DataFrame]):
+    """Concatène les (PLAYER_ID, season, score_100) et écrit all_seasons_scores.parquet."""
+    df_all = pd.concat(all_scores, ignore_index=True)
+    out    = CURATED / "all_seasons_scores.parquet"
+    write_parquet(compact(df_all, categories=False), out, sort_by=["PLAYER_ID", "season"])
+    print(f"\n🎉 all_seasons_scores.parquet généré ({len(df_all)} lignes)")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="score_100 par saison + all_seasons_scores.parquet")
+    add_jobs_argument(p)
+    add_backend_argument(p)
+    args = p.parse_args()
+
+    # 1) Récupère la liste des saisons
+    files   = sorted(CURATED.glob("player_season_*.parquet"))
+    seasons = [f.stem.split("_")[-1] for f in files]
+
+    tasks = []
+    for s in seasons:
+        # 2) Vérifie via le schéma parquet que les colonnes avancées existent
+        schema = pq.ParquetFile(CURATED / f"player_season_{s}.parquet").schema.names
+        missing = [c for c in ("efg_pct", "ts_pct") if c not in schema]
+        if missing:
+            print(f"⚠️ Skip saison {s}: colonnes manquantes {missing}")
+            continue
+        tasks.append((s, (s,)))
+
+    # 3) Calcul par saison (pool de processus si --jobs > 1, ou requêtes polars)
+    if args.backend == "polars":
+        from polars_backend import scored_tables
+        tables = scored_tables({s: CURATED / f"player_season_{s}.parquet" for s, _ in tasks})
+        results, failed = map_seasons(write_scored, [(s, (df, s)) for s, df in tables.items()])
+    else:
+        results, failed = map_seasons(compute_per_season, tasks, args.jobs)
+    for s in results:
+        print(f"✅ Saison {s} mise à jour → score_100 ajouté")
+
+    if not results:
+        print("❌ Aucune saison traitée : vérifie feature_engineering.py")
+        sys.exit(1)
+
+    # 4) Concatène et sauvegarde le fichier global
+    write_all_scores(list(results.values()))
+    if failed:
+        sys.exit(f"❌ Saisons en échec : {', '.join(failed)}")
\ No newline at end of file
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+curate_players.py
+-----------------
+Étape de curation fusionnée, remplaçant la chaîne
+prepare_curated → feature_engineering → compute_rating_all.
+
+Le dataset player_gamelog est lu une seule fois (colonnes utiles, toutes
+saisons) et agrégé par le noyau gamelog_aggregates.py, puis pour chaque saison :
+  1. stats de base + phys + esv_mean + pace   (prepare_curated.base_features)
+  2. features avancées                        (déjà dans l'agrégat)
+  3. avail + score_100                        (compute_rating_all.score_season)
+et curated/player_season_{season}.parquet est écrit une seule fois.
+
+La table est toujours reconstruite depuis les raw, jamais relue puis
+fusionnée : relancer l'étape donne le même fichier, sans colonnes _x/_y.
+all_seasons_scores.parquet est écrit à la fin, comme par compute_rating_all ;
+avec --season, les lignes des autres saisons y sont conservées.
+
+Usage (depuis MLPlayers/) :
+    python nba_rating/scripts/curate_players.py [--season 2023-24 ...] [--jobs 8 | --backend polars]
+"""
+import argparse
+import sys
+
+import pandas as pd
+
+from gamelog_store import gamelog_seasons, scan_gamelogs
+from gamelog_aggregates import GAMELOG_COLUMNS, ADVANCED_FEATURES, aggregate_player_seasons
+from compact_schema import compact
+from parquet_io import write_parquet
+from season_pool import add_jobs_argument, map_seasons
+from polars_backend import add_backend_argument
+from prepare_curated import SEASONS, base_features
+from compute_rating_all import BASE, CURATED, score_season, write_all_scores
+
+SCORES = CURATED / "all_seasons_scores.parquet"
+
+RAW = BASE / "data" / "raw"
+
+
+def curated_table(agg: pd.DataFrame, season: str) -> pd.DataFrame:
+    """Table player_season_{season} (base + avancé + score) à partir des lignes `agg` de la saison."""
+    df = base_features(agg, season, raw=RAW)
+    df = df.merge(agg[["PLAYER_ID", *ADVANCED_FEATURES]], on="PLAYER_ID", how="left")
+    return score_season(df, season)
+
+
+def curate_season(agg: pd.DataFrame, season: str) -> pd.DataFrame:
+    """
+    Construit et écrit player_season_{season}.parquet à partir des lignes
+    `agg` de la saison ; renvoie (PLAYER_ID, season, score_100).
+    """
+    return write_curated(curated_table(agg, season), season)
+
+
+def write_curated(df: pd.DataFrame, season: str) -> pd.DataFrame:
+    write_parquet(compact(df, categories=False), CURATED / f"player_season_{season}.parquet",
+                  sort_by=["PLAYER_ID"])
+    return df[["PLAYER_ID", "season", "score_100"]]
+
+
+def main(seasons: list[str], partial: bool = False, jobs: int = 1, backend: str = "pandas"):
+    CURATED.mkdir(parents=True, exist_ok=True)
+    present = set(gamelog_seasons("P"))
+    for season in sorted(set(seasons) - present):
+        print(f"⚠️ Skip saison {season}: gamelog joueurs absent")
+    seasons = [s for s in seasons if s in present]
+
+    results, failed = {}, []
+    if seasons and backend == "polars":
+        from polars_backend import curated_tables
+        tables = curated_tables(seasons, RAW)
+        results, failed = map_seasons(write_curated, [(s, (df, s)) for s, df in tables.items()])
+        for season, scores in results.items():
+            print(f"✅ {season} → {len(scores)} joueurs")
+    elif seasons:
+        gl  = scan_gamelogs("P", columns=GAMELOG_COLUMNS, seasons=seasons)
+        agg = aggregate_player_seasons(gl)
+        tasks = [(season, (rows, season)) for season, rows in agg.groupby("season", sort=True)]
+        results, failed = map_seasons(curate_season, tasks, jobs)
+        for season, scores in results.items():
+            print(f"✅ {season} → {len(scores)} joueurs")
+
+    all_scores = list(results.values())
+    if not all_scores:
+        print("❌ Aucune saison traitée : vérifie collect_raw.py")
+        sys.exit(1)
+    if partial and SCORES.exists():
+        done = {s for df in all_scores for s in df["season"].unique()}
+        kept = pd.read_parquet(SCORES)
+        all_scores.insert(0, kept[~kept["season"].isin(done)])
+    write_all_scores(all_scores)
+    if failed:
+        sys.exit(f"❌ Saisons en échec : {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Curation joueur/saison en une passe (base + avancé + score)")
+    p.add_argument("--season", action="append",
+                   help="Saison(s) à traiter, ex. 2023-24 (défaut : 1999-00 → 2023-24)")
+    add_jobs_argument(p)
+    add_backend_argument(p)
+    args = p.parse_args()
+    main(args.season or SEASONS, partial=bool(args.season), jobs=args.jobs, backend=args.backend)
@@ -5,7 +5,10 @@ dashboard_data.py
 ──────────────────
 Assemble toutes les sources de données nécessaires au dashboard
 MLPlayers **sans lancer Streamlit** et produit un unique
-`dashboard_data.parquet` dans `data/curated/`.
+`dashboard_data.parquet` dans `data/curated/`, ainsi que
+`dashboard_slim.parquet` : les seules colonnes lues par app.py
+(contrat DASHBOARD_COLUMNS de column_contracts.py), dupliqué en instantané
+Arrow data/snapshots/dashboard.arrow (arrow_snapshots.py).
 
 Sources fusionnées
 ------------------
@@ -26,7 +29,11 @@ python -m nba_rating.scripts.dashboard_data
 from __future__ import annotations
 import pandas as pd
 from pathlib import Path
-import pyarrow.parquet as pq
+from gamelog_store import PREFIX, gamelog_dataset, gamelog_seasons, scan_gamelogs
+from column_contracts import available, dashboard_columns
+from compact_schema import compact
+from parquet_io import write_parquet
+from arrow_snapshots import write_snapshot
 
 # ────────────────────────────────
 #  1. Chemins de base
@@ -38,10 +45,12 @@ IN_DS   = CURATED / "dataset_ml.parquet"
 IN_S100 = CURATED / "all_seasons_scores.parquet"
 IN_WS   = CURATED / "wins_shares_vorp.parquet"
 IN_CL   = CURATED / "player_clusters.parquet"
-IN_LOGS = CURATED / "all_player_gamelogs.parquet"
+IN_LOGS = PREFIX["P"]   # dataset gamelog joueurs du store raw
+HAS_LOGS = bool(gamelog_seasons("P"))
 IN_PROJ = CURATED / "projections.parquet"
 
 OUTFILE = CURATED / "dashboard_data.parquet"
+SLIMFILE = CURATED / "dashboard_slim.parquet"
 
 
 def make_photo_url(player_id: int, size: str = "260x190") -> str:
@@ -68,7 +77,7 @@ id_name_map = (
 if IN_S100.exists():
     print(f"🔄  Fusion score_100 : {IN_S100.name}")
     s100 = (
-        pd.read_parquet(IN_S100)[["PLAYER_ID", "season", "score_100"]]
+        pd.read_parquet(IN_S100, columns=["PLAYER_ID", "season", "score_100"])
         .drop_duplicates()
     )
     df = df.merge(s100, on=["PLAYER_ID", "season"], how="left")
@@ -78,10 +87,10 @@ else:
 # ────────────────────────────────
 #  4. Extraction noms officiels
 # ────────────────────────────────
-if IN_LOGS.exists():
-    print(f"🔄  Extraction noms  : {IN_LOGS.name}")
+if HAS_LOGS:
+    print(f"🔄  Extraction noms  : {IN_LOGS}")
     names = (
-        pd.read_parquet(IN_LOGS, columns=["PLAYER_ID", "PLAYER_NAME"])
+        scan_gamelogs("P", columns=["PLAYER_ID", "PLAYER_NAME"])
         .drop_duplicates()
         .rename(columns={"PLAYER_NAME": "player_name_official"})
     )
@@ -92,7 +101,7 @@ if IN_LOGS.exists():
     else:
         df = df.rename(columns={"player_name_official": "player_name"})
 else:
-    print(f"⚠️  {IN_LOGS.name} manquant – noms non mis à jour")
+    print(f"⚠️  {IN_LOGS} manquant – noms non mis à jour")
 
 # URL photo
 df["photo_url"] = df["PLAYER_ID"].apply(make_photo_url)
@@ -112,7 +121,8 @@ else:
 # ────────────────────────────────
 if IN_CL.exists():
     print(f"🔄  Fusion clusters  : {IN_CL.name}")
-    cl = pd.read_parquet(IN_CL).drop_duplicates(subset=["PLAYER_ID", "season"])
+    cl = pd.read_parquet(IN_CL, columns=available(IN_CL, ["PLAYER_ID", "season", "player_cluster", "cluster"]))
+    cl = cl.drop_duplicates(subset=["PLAYER_ID", "season"])
     cl = cl.rename(columns={"player_cluster": "cluster"}) if "player_cluster" in cl.columns else cl
     df = df.merge(cl[["PLAYER_ID", "season", "cluster"]], on=["PLAYER_ID", "season"], how="left")
 else:
@@ -162,14 +172,14 @@ else:
 #  7.b Équipe principale (team_id)
 #      + Position principale (pos)
 # ────────────────────────────────
-if IN_LOGS.exists():
-    print(f"🔄  Attribution équipe & position principales : {IN_LOGS.name}")
+if HAS_LOGS:
+    print(f"🔄  Attribution équipe & position principales : {IN_LOGS}")
 
     # ❶ Lire le schéma (zéro I/O) pour connaître les noms exacts de colonnes
-    sample_cols = pq.ParquetFile(IN_LOGS).schema.names
+    sample_cols = gamelog_dataset("P").schema.names
 
-    # ❷ Colonne saison possible : SEASON ou SEASON_ID
-    season_src = "SEASON" if "SEASON" in sample_cols else "SEASON_ID"
+    # ❷ Colonne saison : clé de partition "season" (format 2023-24, comme df)
+    season_src = "season"
 
     # ❸ Détection souple de la colonne position (POSITION, POS, …)
     pos_candidates = [
@@ -193,12 +203,12 @@ if IN_LOGS.exists():
     # Colonnes supplémentaires à charger pour l’équipe
     cols_to_load.extend(team_name_cols)
 
-    logs_min = pd.read_parquet(IN_LOGS, columns=cols_to_load)
+    logs_min = scan_gamelogs("P", columns=cols_to_load)
 
     # ❺ Équipe principale : mode de TEAM_ID par joueur & saison
     team_lookup = (
         logs_min
-          .groupby(["PLAYER_ID", season_src])["TEAM_ID"]
+          .groupby(["PLAYER_ID", season_src], observed=True)["TEAM_ID"]
           .agg(lambda x: x.value_counts().idxmax())
           .reset_index()
           .rename(columns={season_src: "season", "TEAM_ID": "team_id"})
@@ -210,7 +220,7 @@ if IN_LOGS.exists():
         if "TEAM_NAME" in team_name_cols:
             name_lookup = (
                 logs_min
-                  .groupby(["PLAYER_ID", season_src])["TEAM_NAME"]
+                  .groupby(["PLAYER_ID", season_src], observed=True)["TEAM_NAME"]
                   .agg(lambda x: x.value_counts().idxmax())
                   .reset_index()
                   .rename(columns={season_src: "season", "TEAM_NAME": "team_name"})
@@ -220,7 +230,7 @@ if IN_LOGS.exists():
         if "TEAM_ABBREVIATION" in team_name_cols:
             abbr_lookup = (
                 logs_min
-                  .groupby(["PLAYER_ID", season_src])["TEAM_ABBREVIATION"]
+                  .groupby(["PLAYER_ID", season_src], observed=True)["TEAM_ABBREVIATION"]
                   .agg(lambda x: x.value_counts().idxmax())
                   .reset_index()
                   .rename(columns={season_src: "season", "TEAM_ABBREVIATION": "team_abbrev"})
@@ -231,7 +241,7 @@ if IN_LOGS.exists():
     if pos_src:
         pos_lookup = (
             logs_min
-              .groupby(["PLAYER_ID", season_src])[pos_src]
+              .groupby(["PLAYER_ID", season_src], observed=True)[pos_src]
               .agg(lambda x: x.value_counts().idxmax())
               .reset_index()
               .rename(columns={season_src: "season", pos_src: "pos"})
@@ -255,10 +265,17 @@ if IN_LOGS.exists():
               .fillna(df["pos"])
         )
 else:
-    print(f"⚠️  {IN_LOGS.name} manquant – team_id/pos non ajoutés")
+    print(f"⚠️  {IN_LOGS} manquant – team_id/pos non ajoutés")
 
 # ────────────────────────────────
 #  8. Sauvegarde
 # ────────────────────────────────
 print(f"✅  Écriture         : {OUTFILE.name}  ({len(df):,} lignes, {df.shape[1]} colonnes incluant team_name/team_abbrev/pos_full)")
-df.to_parquet(OUTFILE, index=False)
+df = compact(df, categories=False)
+write_parquet(df, OUTFILE, sort_by=["PLAYER_ID", "season"])
+
+# Artefact dashboard : projection sur le contrat de colonnes d'app.py
+slim = df[dashboard_columns(df.columns)]
+write_parquet(slim, SLIMFILE, sort_by=["PLAYER_ID", "season"])
+print(f"✅  Écriture         : {SLIMFILE.name}  ({slim.shape[1]}/{df.shape[1]} colonnes)")
+write_snapshot(slim, "dashboard")   # lu en memory-map par les apps Streamlit
@@ -3,95 +3,59 @@
 """
 feature_engineering.py
 ----------------------
-À partir de raw/player_gamelog_{season}.parquet et
-   curated/player_season_{season}.parquet,
-   calcule et ajoute :
+À partir du dataset raw/player_gamelog (noyau gamelog_aggregates.py, toutes
+   saisons en un groupby) et de curated/player_season_{season}.parquet,
+   ajoute (ratios calculés sur les totaux de la saison) :
    - efg_pct, ts_pct
    - stl_mean, blk_mean, tov_mean
    - per36_* (pts36,…)
    - shooting splits: fg2_pct, fg3_pct, ft_pct
    - usage_rate (approx)
    - ast_tov_ratio
+
+Relancer le script remplace les features déjà présentes (pas de doublons
+_x/_y). `--jobs N` répartit les saisons sur N processus (season_pool.py) ;
+`--backend polars` calcule l'agrégat en requête lazy (polars_backend.py).
 """
+import argparse
 import pandas as pd
 from pathlib import Path
+from gamelog_store import gamelog_seasons, scan_gamelogs
+from gamelog_aggregates import GAMELOG_COLUMNS, ADVANCED_FEATURES, aggregate_player_seasons
+from compact_schema import compact
+from parquet_io import write_parquet
+from season_pool import add_jobs_argument, map_seasons
+from polars_backend import add_backend_argument
 
-RAW     = Path("nba_rating/data/raw")
 CURATED = Path("nba_rating/data/curated")
 
-files   = sorted(RAW.glob("player_gamelog_*.parquet"))
-seasons = [f.stem.rsplit("_",1)[-1] for f in files]
-
-for season in seasons:
-    print(f"🔄 Traitement de la saison {season}...")
-
-    # 1) Chargement
-    df_raw = pd.read_parquet(RAW / f"player_gamelog_{season}.parquet")
-
-    # 2) Indicateurs de tir
-    df_raw["FG2M"]    = df_raw["FGM"] - df_raw["FG3M"]
-    df_raw["FG2A"]    = df_raw["FGA"] - df_raw["FG3A"]
-    df_raw["fg2_pct"] = df_raw["FG2M"] / df_raw["FG2A"]
-    df_raw["fg3_pct"] = df_raw["FG3M"] / df_raw["FG3A"]
-    df_raw["ft_pct"]  = df_raw["FTM"]  / df_raw["FTA"]
-
-    # 3) Indicateurs avancés déjà existants
-    df_raw["efg_pct"] = (df_raw["FGM"] + 0.5 * df_raw["FG3M"]) / df_raw["FGA"]
-    df_raw["ts_pct"]  = df_raw["PTS"]  / (2 * (df_raw["FGA"] + 0.44 * df_raw["FTA"]))
 
-    # 4) Estimation possessions (approximation NBA : Poss = FGA + 0.44*FTA + TOV)
-    df_raw["poss"] = df_raw["FGA"] + 0.44 * df_raw["FTA"] + df_raw["TOV"]
+def add_features(rows: pd.DataFrame, season: str):
+    new_feats = rows[["PLAYER_ID", *ADVANCED_FEATURES]]
 
-    # 5) Agglo par joueur
-    agg = df_raw.groupby("PLAYER_ID").agg(
-        efg_pct        = ("efg_pct",    "mean"),
-        ts_pct         = ("ts_pct",     "mean"),
-        fg2_pct        = ("fg2_pct",    "mean"),
-        fg3_pct        = ("fg3_pct",    "mean"),
-        ft_pct         = ("ft_pct",     "mean"),
-        stl_mean       = ("STL",        "mean"),
-        blk_mean       = ("BLK",        "mean"),
-        tov_mean       = ("TOV",        "mean"),
-        ast_tov_ratio  = ("AST","sum"),  # on calculera juste après
-        pts_total      = ("PTS",        "sum"),
-        reb_total      = ("REB",        "sum"),
-        ast_total      = ("AST",        "sum"),
-        stl_total      = ("STL",        "sum"),
-        blk_total      = ("BLK",        "sum"),
-        tov_total      = ("TOV",        "sum"),
-        min_total      = ("MIN",        "sum"),
-        pm_total       = ("PLUS_MINUS", "sum"),
-        poss_total     = ("poss",       "sum")
-    )
-
-    # 6) Ratios et per36
-    # AST/TOV
-    agg["ast_tov_ratio"] = agg["ast_total"] / agg["tov_total"].replace(0, pd.NA)
-    # per36 et usage rate
-    per36_map = {
-        "pts_total":"pts36","reb_total":"reb36","ast_total":"ast36",
-        "stl_total":"stl36","blk_total":"blk36","tov_total":"tov36",
-        "pm_total":"pm36"
-    }
-    for raw_col,new_col in per36_map.items():
-        agg[new_col] = agg[raw_col] * (36/agg["min_total"]) \
-                         .replace([float("inf"), -float("inf")], pd.NA)
-
-    # Usage rate approximé = joueur poss / équipe poss
-    # Ici team poss par game ≃ 100 possessions,
-    # mais on peut normaliser par GP*100 si tu veux
-    agg["usage_rate"] = agg["poss_total"] / (agg["min_total"]/48)  # approx possessions/48'
-
-    # 7) Sélection features
-    new_feats = agg[[
-        "efg_pct","ts_pct","fg2_pct","fg3_pct","ft_pct",
-        "stl_mean","blk_mean","tov_mean","ast_tov_ratio","usage_rate",
-        "pts36","reb36","ast36","stl36","blk36","tov36","pm36"
-    ]].reset_index()
-
-    # 8) Merge et sauvegarde
-    ps     = pd.read_parquet(CURATED / f"player_season_{season}.parquet")
+    # Merge et sauvegarde (les features d'un passage précédent sont remplacées)
+    path   = CURATED / f"player_season_{season}.parquet"
+    ps     = pd.read_parquet(path).drop(columns=ADVANCED_FEATURES, errors="ignore")
     df_out = ps.merge(new_feats, on="PLAYER_ID", how="left")
-    df_out.to_parquet(CURATED / f"player_season_{season}.parquet", index=False)
-
-    print(f"✅ Avancé features ajoutées pour {season}")
+    write_parquet(compact(df_out, categories=False), path, sort_by=["PLAYER_ID"])
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Ajoute les features avancées aux tables joueur/saison")
+    add_jobs_argument(p)
+    add_backend_argument(p)
+    args = p.parse_args()
+
+    seasons = gamelog_seasons("P")
+    if args.backend == "polars":
+        from polars_backend import aggregate_player_seasons as aggregate_lazy
+        agg = aggregate_lazy(seasons)
+    else:
+        agg = aggregate_player_seasons(scan_gamelogs("P", columns=GAMELOG_COLUMNS, seasons=seasons))
+    tasks = [(season, (rows, season)) for season, rows in agg.groupby("season", sort=True)]
+    print(f"🔄 Traitement de {len(tasks)} saisons (--jobs {args.jobs})...")
+    results, failed = map_seasons(add_features, tasks, args.jobs)
+    for season in results:
+        print(f"✅ Avancé features ajoutées pour {season}")
+    if failed:
+        raise SystemExit(f"❌ Saisons en échec : {', '.join(failed)}")
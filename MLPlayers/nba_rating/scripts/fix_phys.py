@@ -12,11 +12,15 @@ en ajoutant les colonnes physiques manquantes :
 Il est destiné à rendre les fichiers compatibles avec `prepare_curated.py` pour les saisons < 2023-24.
 
 Usage :  
-    python nba_rating/scripts/fix_phys.py
+    python nba_rating/scripts/fix_phys.py [--jobs 8]
 """
 
+import argparse
 import pandas as pd
 from pathlib import Path
+from compact_schema import compact
+from parquet_io import write_parquet
+from season_pool import add_jobs_argument, map_seasons
 
 RAW = Path("nba_rating/data/raw")
 seasons = [f"{y}-{str(y+1)[-2:]}" for y in range(1999, 2024)]
@@ -28,34 +32,39 @@ def convert_height(ht):
     except:
         return None
 
-for season in seasons:
+def fix_season(season):
+    """Complète player_phys_{season}.parquet ; renvoie le message de bilan."""
     path = RAW / f"player_phys_{season}.parquet"
     if not path.exists():
-        print(f"⏭️  {season} : fichier manquant")
-        continue
+        return f"⏭️  {season} : fichier manquant"
 
-    try:
-        df = pd.read_parquet(path)
+    df = pd.read_parquet(path)
+
+    updated = False
+
+    if "HEIGHT" in df.columns and "height_cm" not in df.columns:
+        df["height_cm"] = df["HEIGHT"].apply(convert_height)
+        updated = True
 
-        updated = False
+    if "WEIGHT" in df.columns and "weight_kg" not in df.columns:
+        df["weight_kg"] = pd.to_numeric(df["WEIGHT"], errors="coerce") / 2.205
+        updated = True
 
-        if "HEIGHT" in df.columns and "height_cm" not in df.columns:
-            df["height_cm"] = df["HEIGHT"].apply(convert_height)
-            updated = True
+    if {"height_cm", "weight_kg"}.issubset(df.columns) and "bmi" not in df.columns:
+        df["bmi"] = df["weight_kg"] / (df["height_cm"] / 100) ** 2
+        updated = True
 
-        if "WEIGHT" in df.columns and "weight_kg" not in df.columns:
-            df["weight_kg"] = pd.to_numeric(df["WEIGHT"], errors="coerce") / 2.205
-            updated = True
+    if updated:
+        write_parquet(compact(df, categories=False), path, sort_by=["PLAYER_ID"])
+        return f"✅ {season} : colonnes physiques mises à jour"
+    return f"✔️  {season} : déjà complet"
 
-        if {"height_cm", "weight_kg"}.issubset(df.columns) and "bmi" not in df.columns:
-            df["bmi"] = df["weight_kg"] / (df["height_cm"] / 100) ** 2
-            updated = True
 
-        if updated:
-            df.to_parquet(path, index=False)
-            print(f"✅ {season} : colonnes physiques mises à jour")
-        else:
-            print(f"✔️  {season} : déjà complet")
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Complète les colonnes physiques des player_phys_*.parquet")
+    add_jobs_argument(p)
+    args = p.parse_args()
 
-    except Exception as e:
-        print(f"❌ {season} : erreur → {e}")
+    results, failed = map_seasons(fix_season, [(s, (s,)) for s in seasons], args.jobs)
+    for msg in results.values():
+        print(msg)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+gamelog_aggregates.py
+---------------------
+Noyau d'agrégation unique des gamelogs joueurs, partagé par
+prepare_curated.py, feature_engineering.py et curate_players.py.
+
+Un seul groupby (PLAYER_ID, season) sur toutes les saisons à la fois : les
+colonnes de comptage sont sommées en float64 dans une même passe, le nombre
+de matchs est la taille du groupe. Toutes les features sont ensuite dérivées
+de ces sommes :
+  · moyennes par match      : total / gp
+  · pourcentages (eFG, TS…) : ratio des totaux de la saison, et non moyenne
+    des ratios match par match (un 1/1 ne pèse plus autant qu'un 10/20)
+  · per36, AST/TOV, usage   : totaux rapportés aux minutes / pertes de balle
+Un dénominateur nul donne NaN.
+"""
+import pandas as pd
+
+KEYS = ["PLAYER_ID", "season"]
+SUM_COLUMNS = [
+    "PTS", "REB", "AST", "STL", "BLK", "TOV", "MIN", "PLUS_MINUS",
+    "FGM", "FGA", "FG3M", "FG3A", "FTM", "FTA",
+]
+# colonnes à lire dans le dataset player_gamelog (season = clé de partition)
+GAMELOG_COLUMNS = ["PLAYER_ID", "season", "TEAM_ID", *SUM_COLUMNS]
+
+BASE_STATS = ["pts_mean", "reb_mean", "ast_mean", "plus_minus_mean", "gp", "min_per_game"]
+ADVANCED_FEATURES = [
+    "efg_pct", "ts_pct", "fg2_pct", "fg3_pct", "ft_pct",
+    "stl_mean", "blk_mean", "tov_mean", "ast_tov_ratio", "usage_rate",
+    "pts36", "reb36", "ast36", "stl36", "blk36", "tov36", "pm36",
+]
+PER36 = {"PTS": "pts36", "REB": "reb36", "AST": "ast36", "STL": "stl36",
+         "BLK": "blk36", "TOV": "tov36", "PLUS_MINUS": "pm36"}
+
+
+def _ratio(num: pd.Series, den: pd.Series) -> pd.Series:
+    return num / den.where(den != 0)
+
+
+def _main_team(values: pd.DataFrame) -> pd.Series:
+    """Équipe avec le plus de matchs joués par (PLAYER_ID, season)."""
+    cnt = values.groupby([*KEYS, "TEAM_ID"]).size().rename("cnt").reset_index()
+    return (
+        cnt.sort_values("cnt", ascending=False, kind="stable")
+           .drop_duplicates(KEYS)
+           .set_index(KEYS)["TEAM_ID"]
+    )
+
+
+def aggregate_player_seasons(gl: pd.DataFrame) -> pd.DataFrame:
+    """
+    `gl` : gamelog joueurs multi-saisons (colonnes GAMELOG_COLUMNS,
+    cf. scan_gamelogs("P", columns=GAMELOG_COLUMNS)).
+    Renvoie une ligne par (PLAYER_ID, season) : KEYS + BASE_STATS + TEAM_ID
+    (équipe principale) + ADVANCED_FEATURES ; season en str.
+    """
+    values = pd.DataFrame({c: gl[c].to_numpy(dtype="float64") for c in SUM_COLUMNS})
+    for c in (*KEYS, "TEAM_ID"):
+        values[c] = gl[c].to_numpy()
+    grouped = values.groupby(KEYS, sort=True)
+    t = grouped[SUM_COLUMNS].sum()
+    gp = grouped.size()
+
+    out = pd.DataFrame(index=t.index)
+    out["pts_mean"]        = t["PTS"] / gp
+    out["reb_mean"]        = t["REB"] / gp
+    out["ast_mean"]        = t["AST"] / gp
+    out["plus_minus_mean"] = t["PLUS_MINUS"] / gp
+    out["gp"]              = gp
+    out["min_per_game"]    = t["MIN"] / gp
+    out["TEAM_ID"]         = _main_team(values)
+
+    # pourcentages de tir sur les totaux de la saison
+    out["efg_pct"] = _ratio(t["FGM"] + 0.5 * t["FG3M"], t["FGA"])
+    out["ts_pct"]  = _ratio(t["PTS"], 2 * (t["FGA"] + 0.44 * t["FTA"]))
+    out["fg2_pct"] = _ratio(t["FGM"] - t["FG3M"], t["FGA"] - t["FG3A"])
+    out["fg3_pct"] = _ratio(t["FG3M"], t["FG3A"])
+    out["ft_pct"]  = _ratio(t["FTM"], t["FTA"])
+
+    out["stl_mean"] = t["STL"] / gp
+    out["blk_mean"] = t["BLK"] / gp
+    out["tov_mean"] = t["TOV"] / gp
+    out["ast_tov_ratio"] = _ratio(t["AST"], t["TOV"])
+
+    # Possessions (approximation NBA : Poss = FGA + 0.44*FTA + TOV), ramenées à 48'
+    poss = t["FGA"] + 0.44 * t["FTA"] + t["TOV"]
+    out["usage_rate"] = _ratio(poss, t["MIN"] / 48)
+    for col, name in PER36.items():
+        out[name] = _ratio(t[col] * 36, t["MIN"])
+
+    out = out.reset_index()
+    out["season"] = out["season"].astype(str)
+    return out
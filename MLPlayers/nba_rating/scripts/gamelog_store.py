@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+gamelog_store.py
+----------------
+Stockage raw partagé entre MLPlayers et MLTeams (MLPlayers/nba_rating/data/raw,
+surchargeable via NBA_RAW_STORE) : un seul téléchargement par gamelog.
+
+Chaque gamelog est un dataset Parquet partitionné Hive par saison :
+    raw/player_gamelog/season=2023-24/part-0.parquet
+    raw/team_gamelog/season=2023-24/part-0.parquet
+Une mise à jour ne réécrit que la partition de sa saison ; les lectures
+multi-saisons passent par `scan_gamelogs` (élagage des partitions et filtres
+poussés au scan) au lieu d'une copie concaténée.
+
+Écriture des gamelogs LeagueGameLog (joueurs "P" ou équipes "T") :
+  · collecte complète d'une saison si le fichier n'existe pas
+  · mode incrémental : lit le GAME_DATE max déjà stocké, ne demande à l'API
+    que les matchs à partir de cette date, déduplique sur
+    (GAME_ID, PLAYER_ID/TEAM_ID) et ajoute les nouvelles lignes
+
+Les gamelogs sont stockés avec les types compacts de compact_schema.py.
+
+Dérivations locales (sans appel API) :
+  · esv_mean par joueur  ← player gamelog (remplace LeagueDashPlayerStats)
+  · pace par équipe      ← team gamelog   (remplace le 2e LeagueGameLog "T")
+
+Utilisé par collect_raw.py et MLTeams/scripts/collect_team_data.py.
+"""
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from nba_api.stats.endpoints import LeagueGameLog
+
+from telemetry import TELEMETRY
+from compact_schema import compact
+from parquet_io import write_parquet
+
+RAW_STORE = Path(os.environ.get(
+    "NBA_RAW_STORE",
+    Path(__file__).resolve().parents[1] / "data" / "raw",
+))
+KEYS   = {"P": ["GAME_ID", "PLAYER_ID"], "T": ["GAME_ID", "TEAM_ID"]}
+PREFIX = {"P": "player_gamelog", "T": "team_gamelog"}
+SORT_BY = {"P": ["PLAYER_ID", "GAME_DATE"], "T": ["TEAM_ID", "GAME_DATE"]}
+PARTITIONING = ds.partitioning(pa.schema([("season", pa.string())]), flavor="hive")
+
+
+def dataset_dir(kind: str) -> Path:
+    return RAW_STORE / PREFIX[kind]
+
+
+def gamelog_path(kind: str, season: str) -> Path:
+    """Partition du gamelog joueurs ("P") ou équipes ("T") d'une saison dans le store partagé."""
+    return dataset_dir(kind) / f"season={season}" / "part-0.parquet"
+
+
+def legacy_gamelog_path(kind: str, season: str) -> Path:
+    """Ancien fichier plat raw/{prefix}_{season}.parquet."""
+    return RAW_STORE / f"{PREFIX[kind]}_{season}.parquet"
+
+
+def gamelog_seasons(kind: str) -> list[str]:
+    """Saisons présentes dans le dataset (lecture des noms de partitions, sans I/O parquet)."""
+    return sorted(
+        d.name.split("=", 1)[1] for d in dataset_dir(kind).glob("season=*")
+        if (d / "part-0.parquet").exists()
+    )
+
+
+def gamelog_dataset(kind: str) -> ds.Dataset:
+    return ds.dataset(dataset_dir(kind), format="parquet", partitioning=PARTITIONING)
+
+
+def scan_gamelogs(kind: str, columns=None, seasons=None, filter=None) -> pd.DataFrame:
+    """
+    Lit le dataset gamelog : `seasons` élague les partitions, `filter`
+    (expression pyarrow.dataset, ex. ds.field("TEAM_ID") == 1610612747) est
+    poussé au scan. La colonne `season` (partition) est toujours disponible.
+    """
+    expr = None if seasons is None else ds.field("season").isin(list(seasons))
+    if filter is not None:
+        expr = filter if expr is None else expr & filter
+    table = gamelog_dataset(kind).to_table(columns=columns, filter=expr)
+    if "season" in table.column_names:
+        # clé de partition : une valeur par saison → category plutôt que str par ligne
+        i = table.column_names.index("season")
+        table = table.set_column(i, "season", table.column("season").dictionary_encode())
+    return table.to_pandas()
+
+
+def migrate_legacy(kind: str) -> list[str]:
+    """Déplace (sans copie) les anciens fichiers plats par saison dans le dataset partitionné."""
+    moved = []
+    for f in sorted(RAW_STORE.glob(f"{PREFIX[kind]}_*.parquet")):
+        season = f.stem.rsplit("_", 1)[-1]
+        if _adopt_legacy(kind, season):
+            moved.append(season)
+    return moved
+
+
+def _adopt_legacy(kind: str, season: str) -> bool:
+    legacy, dest = legacy_gamelog_path(kind, season), gamelog_path(kind, season)
+    if dest.exists() or not legacy.exists():
+        return False
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    legacy.replace(dest)
+    return True
+
+
+def fetch_league_gamelog(kind: str, season: str, date_from=None) -> pd.DataFrame:
+    """LeagueGameLog d'une saison régulière, éventuellement borné à partir de `date_from`."""
+    params = dict(
+        player_or_team_abbreviation=kind,
+        season=season,
+        season_type_all_star="Regular Season",
+        timeout=60,
+    )
+    if date_from is not None:
+        params["date_from_nullable"] = pd.Timestamp(date_from).strftime("%m/%d/%Y")
+    df = LeagueGameLog(**params).get_data_frames()[0]
+    TELEMETRY.add_rows("leaguegamelog", season, len(df))
+    return df
+
+
+def last_game_date(path: Path):
+    """GAME_DATE max déjà présent dans le parquet (None si vide ou absent)."""
+    if not path.exists():
+        return None
+    dates = pd.to_datetime(pd.read_parquet(path, columns=["GAME_DATE"])["GAME_DATE"])
+    return dates.max() if len(dates) else None
+
+
+def update_gamelog(path: Path, kind: str, season: str, incremental: bool = False):
+    """
+    Met à jour `path` pour la saison donnée.
+    Renvoie le nombre de lignes ajoutées, ou None si le fichier est laissé tel quel.
+    """
+    if path == gamelog_path(kind, season):
+        _adopt_legacy(kind, season)   # store pas encore migré : pas de re-téléchargement
+    if path.exists() and not incremental:
+        return None
+    since = last_game_date(path)
+
+    # On repart du dernier jour stocké (inclus) : les matchs de ce jour
+    # terminés après la précédente collecte sont rattrapés, la
+    # déduplication élimine ceux déjà présents.
+    new = compact(fetch_league_gamelog(kind, season, date_from=since))
+    if since is None:
+        df, added = new, len(new)
+    else:
+        old = compact(pd.read_parquet(path))   # fichiers antérieurs non typés compris
+        df = compact(
+            pd.concat([old, new], ignore_index=True)
+              .drop_duplicates(subset=KEYS[kind], keep="last")
+              .reset_index(drop=True)
+        )   # re-typage : l'union de deux categoricals différents redevient object
+        added = len(df) - len(old)
+        if added == 0:
+            return 0
+
+    write_parquet(df, path, sort_by=SORT_BY[kind])
+    return added
+
+
+def derive_esv(gl: pd.DataFrame) -> pd.DataFrame:
+    """
+    esv_mean = points marqués sur tirs (2 pts × FG2M + 3 pts × FG3M) par match joué,
+    identique au calcul fait auparavant sur LeagueDashPlayerStats (totaux / GP).
+    """
+    agg = gl.groupby("PLAYER_ID").agg(
+        FGM  = ("FGM", "sum"),
+        FG3M = ("FG3M", "sum"),
+        GP   = ("GAME_ID", "nunique"),
+    )
+    agg["esv_mean"] = ((agg["FGM"] - agg["FG3M"]) * 2 + agg["FG3M"] * 3) / agg["GP"]
+    return agg[["esv_mean"]].reset_index()
+
+
+def derive_pace(tgl: pd.DataFrame) -> pd.DataFrame:
+    """Possessions moyennes par match : FGA + 0.4·FTA − OREB + TOV, moyenne par TEAM_ID."""
+    poss = tgl["FGA"] + 0.4 * tgl["FTA"] - tgl["OREB"] + tgl["TOV"]
+    return (
+        poss.groupby(tgl["TEAM_ID"]).mean()
+            .rename("pace")
+            .reset_index()
+    )
@@ -5,48 +5,79 @@ generate_ws_vorp.py
 -------------------
 Automatisation de la collecte des métriques avancées (Win Shares, VORP)
 depuis Basketball-Reference pour chaque saison NBA de 1999-00 à 2023-24,
-puis matching sur PLAYER_ID via all_player_gamelogs.parquet, avec
+puis matching sur PLAYER_ID via le dataset raw/player_gamelog, avec
 normalisation des noms, fuzzy matching, et export des noms non mappés.
 
+La résolution nom → PLAYER_ID est persistée dans curated/name_aliases.parquet
+(clé : nom normalisé + saison, provenance exact/fuzzy/manual) : seuls les
+nouveaux noms passent par le fuzzy matching. Les noms non résolus sont
+ajoutés à data/manual_aliases.csv, où il suffit de renseigner PLAYER_ID
+("-" pour un non-joueur, ex. "league average").
+
+Les pages B-Ref sont mises en cache par saison (raw/bref/advanced_YYYY.html.gz) :
+seules les saisons absentes du cache sont téléchargées, en parallèle mais
+sous une limite de politesse par hôte ; le parsing (lxml) se fait toujours
+depuis le cache, donc relancer le matching ne touche jamais le réseau.
+
 Usage:
-    python nba_rating/scripts/generate_ws_vorp.py
+    python nba_rating/scripts/generate_ws_vorp.py [--force] [--rebuild-aliases]
 """
 
+import argparse
+import gzip
 import warnings
-import unicodedata
-import re
+from io import StringIO
 from pathlib import Path
 
 import pandas as pd
-from thefuzz import process
-
-
-def normalize(name: str) -> str:
-    if not isinstance(name, str):
-        return ""
-    # enlever accents
-    nfkd = unicodedata.normalize("NFKD", name)
-    ascii_str = "".join(c for c in nfkd if not unicodedata.combining(c))
-    # ➊ remplacer tirets/traits d’union par espace
-    ascii_str = ascii_str.replace("-", " ").replace("–", " ")
-    # ➋ minuscules, ne garder que alphanum & espace
-    s = re.sub(r"[^a-zA-Z0-9 ]+", "", ascii_str.lower()).strip()
-    # ➌ retirer suffixes
-    s = re.sub(r"\b(jr|sr|ii|iii|iv)\b", "", s)
-    # ➍ compresser espaces multiples
-    return re.sub(r"\s+", " ", s).strip()
-
-
-def fetch_season_table(year: int) -> pd.DataFrame:
+import requests
+
+from nba_client import TokenBucket, run_parallel
+from gamelog_store import scan_gamelogs, gamelog_seasons
+from parquet_io import write_parquet
+from name_matching import (
+    normalize_series, fuzzy_match, ALIAS_KEY,
+    load_aliases, save_aliases, make_aliases, upsert_aliases,
+    load_manual_aliases, append_pending_manual,
+)
+
+BREF_URL      = "https://www.basketball-reference.com/leagues/NBA_{year}_advanced.html"
+BREF_RATE     = 1 / 3.5   # ≤ 20 requêtes/min tolérées par B-Ref
+BREF_WORKERS  = 3
+BREF_BUCKET   = TokenBucket(rate=BREF_RATE, capacity=1)
+BREF_HEADERS  = {"User-Agent": "Mozilla/5.0"}
+
+
+def html_cache_path(year: int) -> Path:
+    return HTML_DIR / f"advanced_{year}.html.gz"
+
+
+def fetch_season_html(session: requests.Session, year: int):
+    """Télécharge la page "Advanced" d'une saison et la stocke compressée dans le cache."""
+    BREF_BUCKET.acquire()
+    resp = session.get(BREF_URL.format(year=year), headers=BREF_HEADERS, timeout=30)
+    resp.raise_for_status()
+    path = html_cache_path(year)
+    tmp  = path.with_suffix(".tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        f.write(resp.text)
+    tmp.replace(path)
+
+
+def parse_season_table(year: int) -> pd.DataFrame:
     """
-    Récupère la table "Advanced" pour la saison (year-1)-year depuis B-Ref,
+    Parse la table "Advanced" pour la saison (year-1)-year depuis le cache HTML,
     extrait Player, WS, VORP, ajoute 'season' format 'YYYY-YY'.
     """
-    url = f"https://www.basketball-reference.com/leagues/NBA_{year}_advanced.html"
+    path = html_cache_path(year)
+    if not path.exists():
+        warnings.warn(f"Page B-Ref {year} absente du cache")
+        return pd.DataFrame()
     try:
-        df = pd.read_html(url)[0]
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            df = pd.read_html(StringIO(f.read()), flavor="lxml")[0]
     except Exception as e:
-        warnings.warn(f"Impossible de télécharger {url}: {e}")
+        warnings.warn(f"Impossible de parser {path.name}: {e}")
         return pd.DataFrame()
 
     # flatten header
@@ -79,13 +110,23 @@ BASE        = Path(__file__).resolve().parents[1] / "data"
 RAW_DIR     = BASE / "raw"
 CURATED_DIR = BASE / "curated"
 OUT_PATH    = CURATED_DIR / "wins_shares_vorp.parquet"
-LOGS_UNI    = CURATED_DIR / "all_player_gamelogs.parquet"
+HTML_DIR    = RAW_DIR / "bref"
+ALIASES_PATH = CURATED_DIR / "name_aliases.parquet"
+MANUAL_PATH  = BASE / "manual_aliases.csv"
+HTML_DIR.mkdir(parents=True, exist_ok=True)
+
+p = argparse.ArgumentParser(description="Win Shares / VORP depuis Basketball-Reference")
+p.add_argument("--force", action="store_true",
+               help="Refait le matching même si wins_shares_vorp.parquet est complet")
+p.add_argument("--rebuild-aliases", action="store_true",
+               help="Ignore les alias exact/fuzzy déjà stockés (garde les alias manuels)")
+args = p.parse_args()
 
-if not LOGS_UNI.exists():
-    raise FileNotFoundError("…lance d'abord rassemble_gamelogs.py…")
+if not gamelog_seasons("P"):
+    raise FileNotFoundError("…lance d'abord collect_raw.py / rassemble_gamelogs.py…")
 
 # 0) Vérifier si wins_shares_vorp.parquet existe et est complet
-if OUT_PATH.exists():
+if OUT_PATH.exists() and not args.force:
     try:
         existing_ws = pd.read_parquet(OUT_PATH)
         expected_seasons = [f"{y-1}-{str(y)[2:]}" for y in range(2000, 2025)]
@@ -94,71 +135,102 @@ if OUT_PATH.exists():
             print(f"🔄 {OUT_PATH.name} déjà à jour, saisons couvertes : {sorted(expected_seasons)}. Sortie.")
             exit(0)
         else:
-            print(f"⚠️ {OUT_PATH.name} incomplet, saisons manquantes : {sorted(missing)}. Relancement du scraping.")
+            print(f"⚠️ {OUT_PATH.name} incomplet, saisons manquantes : {sorted(missing)}. Complément du scraping.")
     except Exception as e:
         print(f"⚠️ Impossible de lire {OUT_PATH.name} ({e}), exécution du scraping.")
 
-# 1) Scraping → df_ws
+# 1) Scraping des seules saisons absentes du cache, puis parsing depuis le cache → df_ws
 years, dfs = range(2000,2025), []
+to_fetch = [y for y in years if not html_cache_path(y).exists()]
+if to_fetch:
+    print(f"🌐 Téléchargement B-Ref : {len(to_fetch)} saisons")
+    session = requests.Session()
+    failed = run_parallel(
+        [(f"B-Ref {y}", lambda y=y: fetch_season_html(session, y)) for y in to_fetch],
+        workers=BREF_WORKERS,
+    )
+    if failed:
+        warnings.warn(f"Saisons non téléchargées : {sorted(failed)}")
 for y in years:
-    df_s = fetch_season_table(y)
+    df_s = parse_season_table(y)
     if not df_s.empty:
         dfs.append(df_s)
 df_ws = pd.concat(dfs, ignore_index=True)
 
 # 2) Normalisation
-df_ws["PLAYER_NAME_NORM"] = df_ws["PLAYER_NAME"].apply(normalize)
+df_ws["PLAYER_NAME_NORM"] = normalize_series(df_ws["PLAYER_NAME"])
 
-# 3) Mapping complet
-mapping = (
-    pd.read_parquet(LOGS_UNI, columns=["PLAYER_ID","PLAYER_NAME"])
-        .drop_duplicates("PLAYER_NAME")
+# 3) Mapping complet (par saison : lève l'ambiguïté des homonymes, ex. père/fils)
+# la saison est la clé de partition du dataset (pas de conversion de SEASON_ID)
+logs_ids = (
+    scan_gamelogs("P", columns=["PLAYER_ID","PLAYER_NAME","season"])
+        .drop_duplicates()
+)
+logs_ids["PLAYER_NAME_NORM"] = normalize_series(logs_ids["PLAYER_NAME"])
+mapping = logs_ids.drop_duplicates("PLAYER_NAME")
+
+# 4) Résolution nom → PLAYER_ID
+#    a) table d'alias persistante : les noms déjà résolus passent par un seul hash join
+#    b) CSV manuel (prioritaire)
+#    c) nouveaux noms : match exact, puis fuzzy
+if not MANUAL_PATH.exists():
+    # reprise de l'ancien manual_map inline
+    pd.DataFrame([{"PLAYER_NAME_NORM": "league average", "season": "*",
+                   "PLAYER_ID": "-", "PLAYER_NAME": "League Average"}]).to_csv(MANUAL_PATH, index=False)
+aliases = load_aliases(ALIASES_PATH)
+if args.rebuild_aliases:
+    aliases = aliases[aliases["method"] == "manual"]
+aliases = upsert_aliases(aliases, load_manual_aliases(MANUAL_PATH, df_ws["season"].unique()))
+
+keys = df_ws[ALIAS_KEY].drop_duplicates()
+known = keys.set_index(ALIAS_KEY).index.isin(aliases.set_index(ALIAS_KEY).index)
+new_keys = keys[~known]
+print(f"🔗 Alias connus : {known.sum()} | nouveaux noms à résoudre : {len(new_keys)}")
+
+exact_season = new_keys.merge(
+    logs_ids[["PLAYER_ID","PLAYER_NAME_NORM","season"]].drop_duplicates(ALIAS_KEY),
+    on=ALIAS_KEY, how="inner")
+exact_name = (
+    new_keys[~new_keys.set_index(ALIAS_KEY).index.isin(exact_season.set_index(ALIAS_KEY).index)]
+        .merge(mapping[["PLAYER_ID","PLAYER_NAME_NORM"]].drop_duplicates("PLAYER_NAME_NORM"),
+               on="PLAYER_NAME_NORM", how="inner")
 )
-mapping["PLAYER_NAME_NORM"] = mapping["PLAYER_NAME"].apply(normalize)
-
-# 4) Merge norm
-df_ext = df_ws.merge(mapping[["PLAYER_ID","PLAYER_NAME_NORM"]],
-                        on="PLAYER_NAME_NORM", how="left")
-
-# 5) Fuzzy matching
-miss = df_ext["PLAYER_ID"].isna()
-noms = df_ext.loc[miss,"PLAYER_NAME_NORM"].unique()
-choices = mapping["PLAYER_NAME_NORM"].tolist()
-fmap = {n: process.extractOne(n, choices, score_cutoff=90)[0]
-        for n in noms if process.extractOne(n, choices, score_cutoff=90)}
-df_ext["PLAYER_NAME_NORM_FUZZY"] = df_ext["PLAYER_NAME_NORM"].map(lambda x: fmap.get(x,x))
-df_ext = df_ext.merge(mapping[["PLAYER_ID","PLAYER_NAME_NORM"]],
-                        left_on="PLAYER_NAME_NORM_FUZZY",
-                        right_on="PLAYER_NAME_NORM",
-                        how="left",
-                        suffixes=("","_fuzzy"))
-df_ext["PLAYER_ID"] = df_ext["PLAYER_ID"].fillna(df_ext["PLAYER_ID_fuzzy"])
-
-# 6) Manual map pour derniers cas
-manual_map = {
-    "league average": None,
-    # ex :
-    # "tre scott":       "762",
-    # "jeenathan williams":"1630252",
-    # …
-}
-df_ext["PLAYER_NAME_NORM"] = df_ext["PLAYER_NAME_NORM"].replace(manual_map)
-df_ext = df_ext.merge(mapping[["PLAYER_ID","PLAYER_NAME_NORM"]],
-                        on="PLAYER_NAME_NORM",
-                        how="left",
-                        suffixes=("","_manu"))
-df_ext["PLAYER_ID"] = df_ext["PLAYER_ID"].fillna(df_ext["PLAYER_ID_manu"])
-
-# —— DEBUG export non-mappés ——
-unmatched = df_ext[df_ext["PLAYER_ID"].isna()]
+exact = pd.concat([exact_season, exact_name], ignore_index=True)
+aliases = upsert_aliases(aliases, make_aliases(exact, exact["PLAYER_ID"], "exact"))
+
+# 5) Fuzzy matching (blocking + matrices de similarité vectorisées) des seuls noms restants
+rest = new_keys[~new_keys.set_index(ALIAS_KEY).index.isin(exact.set_index(ALIAS_KEY).index)]
+fmap = fuzzy_match(rest["PLAYER_NAME_NORM"].unique(),
+                   mapping["PLAYER_NAME_NORM"].tolist(), score_cutoff=90, with_scores=True)
+fuzzy = rest[rest["PLAYER_NAME_NORM"].isin(fmap.keys())].copy()
+fuzzy["matched_name"] = fuzzy["PLAYER_NAME_NORM"].map(lambda n: fmap[n][0])
+fuzzy["score"]        = fuzzy["PLAYER_NAME_NORM"].map(lambda n: fmap[n][1])
+fuzzy = fuzzy.merge(mapping[["PLAYER_ID","PLAYER_NAME_NORM"]]
+                        .drop_duplicates("PLAYER_NAME_NORM")
+                        .rename(columns={"PLAYER_NAME_NORM": "matched_name"}),
+                    on="matched_name", how="left")
+aliases = upsert_aliases(aliases, make_aliases(fuzzy, fuzzy["PLAYER_ID"], "fuzzy",
+                                               fuzzy["matched_name"], fuzzy["score"]))
+save_aliases(aliases, ALIASES_PATH)
+print(f"💾 Table d'alias → {ALIASES_PATH.name} ({len(aliases)} entrées, "
+      f"+{len(exact)} exact, +{len(fuzzy)} fuzzy)")
+
+# 6) Jointure finale sur la table d'alias
+df_ext = df_ws.merge(aliases[ALIAS_KEY + ["PLAYER_ID"]], on=ALIAS_KEY, how="left")
+
+# —— DEBUG export non-mappés (hors non-joueurs déclarés dans le CSV manuel) ——
+declared = df_ext.set_index(ALIAS_KEY).index.isin(aliases.set_index(ALIAS_KEY).index)
+unmatched = df_ext[df_ext["PLAYER_ID"].isna() & ~declared]
 if not unmatched.empty:
-    to_debug = (unmatched[["PLAYER_NAME","PLAYER_NAME_NORM"]]
+    to_debug = (unmatched[["PLAYER_NAME","PLAYER_NAME_NORM","season"]]
                 .drop_duplicates())
     debug_path = CURATED_DIR / "unmatched_ws_vorp.parquet"
-    to_debug.to_parquet(debug_path, index=False)
-    print(f"🔍 noms non mappés → {debug_path} ({len(to_debug)} uniq)")
+    write_parquet(to_debug, debug_path, sort_by=["season", "PLAYER_NAME_NORM"])
+    pending = append_pending_manual(MANUAL_PATH, to_debug)
+    print(f"🔍 noms non mappés → {debug_path} ({len(to_debug)} uniq, "
+          f"{pending} ajoutés à compléter dans {MANUAL_PATH.name})")
 
 # 7) Export final
-df_ext.loc[:,["PLAYER_ID","season","Win_Shares","VORP"]] \
-        .to_parquet(OUT_PATH, index=False)
+write_parquet(df_ext.loc[:,["PLAYER_ID","season","Win_Shares","VORP"]], OUT_PATH,
+              sort_by=["PLAYER_ID","season"])
 print(f"✅ wins_shares_vorp.parquet ({len(df_ext)}) → {OUT_PATH}")
\ No newline at end of file
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+http_cache.py
+-------------
+Cache disque des réponses HTTP (nba_api, CDN logos) :
+  · clé = sha256(méthode + URL + paramètres triés) → data/raw/_http_cache/ab/abcd….json.gz
+  · corps compressé gzip, métadonnées (status, headers, date de collecte) dans le même fichier
+  · TTL par endpoint : une réponse collectée après la fin de sa saison n'est
+    jamais re-téléchargée ; collectée pendant la saison, elle expire après
+    CURRENT_SEASON_TTL_H heures (même une fois la saison terminée : les
+    données partielles sont remplacées par une collecte définitive)
+  · mode "replay" strict : un cache miss lève CacheMissError (exécution 100 % hors-ligne)
+
+Mode choisi via la variable d'environnement NBA_HTTP_CACHE :
+    on (défaut) | off | replay
+Répertoire surchargeable via NBA_HTTP_CACHE_DIR.
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+
+CACHE_DIR = Path(os.environ.get(
+    "NBA_HTTP_CACHE_DIR",
+    Path(__file__).resolve().parents[1] / "data" / "raw" / "_http_cache",
+))
+MODE = os.environ.get("NBA_HTTP_CACHE", "on").lower()
+
+CURRENT_SEASON_TTL_H = 6
+# TTL (heures) par endpoint pour les requêtes sans saison ; None = jamais expiré
+ENDPOINT_TTL_H = {
+    "leaguegamelog":         None,
+    "commonteamroster":      None,
+    "leaguedashplayerstats": None,
+    "logo.svg":              24 * 7,
+}
+DEFAULT_TTL_H = 24
+
+
+class CacheMissError(RuntimeError):
+    """Levée en mode replay quand la réponse n'a pas été enregistrée."""
+
+
+def season_end(season: str) -> float | None:
+    """Horodatage de clôture d'une saison 'YYYY-YY' : 1er octobre, quand la suivante commence."""
+    try:
+        y = int(season[:4])
+    except (TypeError, ValueError):
+        return None
+    return datetime(y + 1, 10, 1).timestamp()
+
+
+def _endpoint(url: str) -> str:
+    return urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1].lower()
+
+
+def _params(params) -> dict:
+    """dict ou liste de (clé, valeur) — nba_api trie ses paramètres en liste."""
+    return dict(params or {})
+
+
+def ttl_hours(url: str, params, fetched_at: float):
+    """
+    TTL d'une entrée collectée à `fetched_at` : avec une saison, None (permanente)
+    seulement si elle a été collectée après la clôture de la saison ; sinon le
+    TTL de l'endpoint.
+    """
+    season = _params(params).get("Season")
+    end = season_end(season) if season is not None else None
+    if end is not None:
+        return None if fetched_at >= end else CURRENT_SEASON_TTL_H
+    return ENDPOINT_TTL_H.get(_endpoint(url), DEFAULT_TTL_H)
+
+
+def cache_key(method: str, url: str, params) -> str:
+    items = sorted((str(k), str(v)) for k, v in _params(params).items())
+    raw = json.dumps([method.upper(), url, items], separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class HTTPCache:
+    def __init__(self, root: Path = CACHE_DIR, mode: str = MODE):
+        self.root = Path(root)
+        self.mode = mode
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json.gz"
+
+    def lookup(self, method: str, url: str, params):
+        """Renvoie une requests.Response reconstruite, ou None si absente/expirée."""
+        if not self.enabled:
+            return None
+        path = self._path(cache_key(method, url, params))
+        if path.exists():
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+            ttl = ttl_hours(url, params, entry["fetched_at"])
+            fresh = ttl is None or time.time() - entry["fetched_at"] < ttl * 3600
+            if fresh or self.mode == "replay":
+                return _to_response(entry)
+        if self.mode == "replay":
+            raise CacheMissError(f"Réponse non enregistrée : {url} {params or ''}")
+        return None
+
+    def store(self, method: str, url: str, params, resp: requests.Response):
+        if not self.enabled or resp.status_code != 200:
+            return
+        key  = cache_key(method, url, params)
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "url":        resp.url,
+            "status":     resp.status_code,
+            "headers":    {k: v for k, v in resp.headers.items()
+                           if k.lower() in ("content-type", "etag", "last-modified")},
+            "encoding":   resp.encoding,
+            "body":       resp.content.decode("latin-1"),
+            "fetched_at": time.time(),
+        }
+        # Écriture atomique : un run interrompu ne laisse pas d'entrée tronquée ;
+        # fichier temporaire unique, les threads d'un même processus ne le partagent pas
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f"{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+def _to_response(entry: dict) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = entry["status"]
+    resp.url         = entry["url"]
+    resp.headers.update(entry["headers"])
+    resp.encoding    = entry["encoding"]
+    resp._content    = entry["body"].encode("latin-1")
+    resp.from_cache  = True
+    return resp
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ingest_daemon.py
+----------------
+Service d'ingestion continu pour la saison en cours (asyncio) :
+  · un poller interroge LeagueGameLog (joueurs "P" et équipes "T") toutes les
+    `--interval` secondes via update_gamelog(incremental=True) : seuls les
+    matchs terminés depuis la dernière collecte sont ajoutés au store partagé
+  · chaque ajout produit un lot (kind, saison, lignes) dans une file bornée
+    (QUEUE_MAX) : si le pipeline aval est en retard, le poller attend
+    (backpressure) au lieu d'empiler des reconstructions
+  · le consommateur regroupe tous les lots en attente (soirée chargée →
+    une seule reconstruction) et ne relance que les étapes touchées par
+    les gamelogs modifiés, dans l'ordre du Makefile ; les étapes par saison
+    (curate_players --season) ne reconstruisent que les saisons des lots
+  · les mensurations de la saison suivie (rosters) sont collectées une fois ;
+    tant que phys / ESV / pace manquent pour une saison, sa curation est
+    sautée (et l'aval joueurs avec) jusqu'au lot suivant
+  · une reconstruction en erreur est journalisée et retentée au lot suivant ;
+    si le consommateur meurt malgré tout, le service s'arrête (code 1) au
+    lieu de rester bloqué sur la file
+
+Hors saison (juillet → septembre), le poller dort `--offseason-interval`.
+
+Usage (depuis MLPlayers/) :
+    python nba_rating/scripts/ingest_daemon.py --season 2024-25 [--interval 600]
+    python nba_rating/scripts/ingest_daemon.py --once      # un cycle puis sortie
+"""
+import argparse
+import asyncio
+import signal
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+from nba_client import install_session, with_retry, write_report, print_metrics
+from gamelog_store import update_gamelog, gamelog_path
+from collect_raw import collect_esv, collect_pace, collect_phys, esv_path, pace_path, phys_path, REPORT_DIR
+
+SCRIPTS   = Path(__file__).resolve().parent
+MLTEAMS   = SCRIPTS.parents[2] / "MLTeams"
+QUEUE_MAX = 4
+INTERVAL_S           = 600
+OFFSEASON_INTERVAL_S = 6 * 3600
+IN_SEASON_MONTHS     = {10, 11, 12, 1, 2, 3, 4, 5, 6}
+
+
+@dataclass
+class Batch:
+    kind:   str   # "P" ou "T"
+    season: str
+    rows:   int
+
+
+@dataclass
+class Stage:
+    name:       str
+    kinds:      set[str]      # gamelogs qui rendent l'étape obsolète
+    action:     object        # script (sous-processus) ou callable(season, refresh) dans un thread
+    per_season: bool = False  # script lancé avec --season pour chaque saison des lots
+    deps:       tuple = ()    # étapes dont l'étape lit les sorties
+
+
+def ensure_phys(season: str, refresh: bool = False):
+    """Mensurations de la saison (rosters) : collectées une fois, pas à chaque lot."""
+    collect_phys(season)
+
+
+# Étapes aval dans l'ordre d'exécution
+STAGES = [
+    Stage("player_esv",       {"P"},      collect_esv),
+    Stage("team_pace",        {"T"},      collect_pace),
+    Stage("player_phys",      {"P"},      ensure_phys),
+    Stage("curate",           {"P", "T"}, SCRIPTS / "curate_players.py", per_season=True,
+          deps=("player_esv", "team_pace", "player_phys")),
+    Stage("cluster_players",  {"P", "T"}, SCRIPTS / "cluster_players.py", deps=("curate",)),
+    Stage("build_dataset_ml", {"P", "T"}, SCRIPTS / "build_dataset_ml.py",
+          deps=("curate", "cluster_players")),
+    Stage("predict_future",   {"P", "T"}, SCRIPTS / "predict_future.py", deps=("build_dataset_ml",)),
+    Stage("dashboard_data",   {"P", "T"}, SCRIPTS / "dashboard_data.py",
+          deps=("build_dataset_ml", "predict_future")),
+    Stage("teams_curated",    {"T"},      MLTEAMS / "scripts" / "prepare_curated.py"),
+]
+# entrées raw de curate_players en plus du gamelog joueurs
+CURATE_INPUTS = (phys_path, esv_path, pace_path)
+
+
+def affected_stages(kinds: set[str]) -> list[Stage]:
+    return [s for s in STAGES if s.kinds & kinds]
+
+
+def curatable(seasons: list[str]) -> list[str]:
+    """Saisons dont toutes les entrées de curation existent ; signale les autres."""
+    ready = []
+    for season in seasons:
+        missing = [f(season).name for f in CURATE_INPUTS if not f(season).exists()]
+        if missing:
+            print(f"⚠️ Curation {season} sautée : {', '.join(missing)} absent(s)")
+        else:
+            ready.append(season)
+    return ready
+
+
+def in_season(today: date) -> bool:
+    return today.month in IN_SEASON_MONTHS
+
+
+# ────────────────────────────────
+#  Poller
+# ────────────────────────────────
+async def poll_once(season: str, queue: asyncio.Queue):
+    for kind in ("P", "T"):
+        path = gamelog_path(kind, season)
+        try:
+            added = await asyncio.to_thread(
+                with_retry, lambda k=kind, p=path: update_gamelog(p, k, season, incremental=True),
+                endpoint="leaguegamelog", season=season,
+            )
+        except Exception as e:
+            print(f"⚠️ Poll {kind} {season} en échec : {e}")
+            continue
+        if added:
+            print(f"📥 {season} {kind} : +{added} lignes")
+            # file pleine → le poller attend que le pipeline aval ait rattrapé
+            await queue.put(Batch(kind, season, added))
+
+
+async def poller(season: str, queue: asyncio.Queue, stop: asyncio.Event,
+                 interval: float, offseason_interval: float, once: bool):
+    while not stop.is_set():
+        if in_season(date.today()) or once:
+            await poll_once(season, queue)
+            wait = interval
+        else:
+            wait = offseason_interval
+        if once:
+            break
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=wait)
+        except asyncio.TimeoutError:
+            pass
+
+
+# ────────────────────────────────
+#  Pipeline aval
+# ────────────────────────────────
+async def run_stage(name: str, action, season: str | None = None, args: list[str] = ()) -> bool:
+    t0 = time.perf_counter()
+    if callable(action):
+        try:
+            await asyncio.to_thread(action, season, refresh=True)
+            ok = True
+        except Exception as e:
+            print(f"❌ {name} : {e}")
+            ok = False
+    else:
+        # Les scripts MLTeams s'exécutent depuis MLTeams/, les autres depuis MLPlayers/
+        cwd = MLTEAMS if MLTEAMS in action.parents else SCRIPTS.parents[1]
+        proc = await asyncio.create_subprocess_exec(sys.executable, str(action), *args, cwd=cwd)
+        ok = await proc.wait() == 0
+    print(f"{'✅' if ok else '❌'} {name} ({time.perf_counter() - t0:.1f} s)")
+    return ok
+
+
+def drain(queue: asyncio.Queue, first: Batch) -> list[Batch]:
+    batches = [first]
+    while True:
+        try:
+            batches.append(queue.get_nowait())
+        except asyncio.QueueEmpty:
+            return batches
+
+
+async def rebuild(batches: list[Batch]):
+    kinds   = {b.kind for b in batches}
+    seasons = sorted({b.season for b in batches})
+    print(f"\n🔁 {len(batches)} lot(s), {sum(b.rows for b in batches)} lignes "
+          f"({', '.join(sorted(kinds))}) → reconstruction aval")
+    skipped = set()   # étapes sautées : leurs dépendants le sont aussi
+    for stage in affected_stages(kinds):
+        if skipped & set(stage.deps):
+            skipped.add(stage.name)
+            continue
+        if callable(stage.action):
+            ok = all([await run_stage(stage.name, stage.action, s) for s in seasons])
+        elif stage.per_season:
+            ready = curatable(seasons)
+            if not ready:
+                print(f"⏭️  {stage.name} et son aval sautés ; nouvel essai au prochain lot")
+                skipped.add(stage.name)
+                continue
+            ok = await run_stage(stage.name, stage.action,
+                                 args=[a for s in ready for a in ("--season", s)])
+        else:
+            ok = await run_stage(stage.name, stage.action)
+        if not ok:
+            print(f"⚠️ Arrêt de la reconstruction après {stage.name} ; nouvel essai au prochain lot")
+            break
+
+
+async def consumer(queue: asyncio.Queue):
+    while True:
+        batches = drain(queue, await queue.get())
+        try:
+            await rebuild(batches)
+        except Exception as e:
+            # une erreur inattendue ne doit pas tuer le consommateur (poller bloqué sur la file)
+            print(f"❌ Reconstruction en échec : {type(e).__name__}: {e} ; nouvel essai au prochain lot")
+        finally:
+            for _ in batches:
+                queue.task_done()
+
+
+async def main(args) -> int:
+    install_session()
+    queue = asyncio.Queue(maxsize=QUEUE_MAX)
+    stop  = asyncio.Event()
+    loop  = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    print(f"🛰️  Ingestion {args.season} : poll toutes les {args.interval:.0f} s, file ≤ {QUEUE_MAX} lots")
+    worker  = asyncio.create_task(consumer(queue))
+    polling = asyncio.create_task(
+        poller(args.season, queue, stop, args.interval, args.offseason_interval, args.once))
+    # un consommateur mort est détecté au lieu de bloquer le poller (file pleine) ou queue.join()
+    await asyncio.wait({polling, worker}, return_when=asyncio.FIRST_COMPLETED)
+    if not worker.done():
+        joined = asyncio.create_task(queue.join())   # termine les reconstructions en cours
+        await asyncio.wait({joined, worker}, return_when=asyncio.FIRST_COMPLETED)
+        joined.cancel()
+    status = 0
+    if polling.done() and polling.exception() is not None:
+        print(f"❌ Poller arrêté : {polling.exception()!r}")
+        status = 1
+    if worker.done():
+        print(f"❌ Consommateur arrêté : {worker.exception()!r} ; {queue.qsize()} lot(s) non traité(s)")
+        status = 1
+    for task in (polling, worker):
+        task.cancel()
+    await asyncio.gather(polling, worker, return_exceptions=True)
+    print_metrics()
+    write_report(REPORT_DIR, "ingest_daemon")
+    return status
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Ingestion continue des gamelogs de la saison en cours")
+    p.add_argument("--season", default="2024-25", help="Saison suivie, ex. 2024-25")
+    p.add_argument("--interval", type=float, default=INTERVAL_S, help="Période de poll en saison (s)")
+    p.add_argument("--offseason-interval", type=float, default=OFFSEASON_INTERVAL_S,
+                   help="Période de poll hors saison (s)")
+    p.add_argument("--once", action="store_true", help="Un seul cycle poll → reconstruction")
+    sys.exit(asyncio.run(main(p.parse_args())))
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+mock_nba_server.py
+------------------
+Serveur local qui se fait passer pour stats.nba.com et cdn.nba.com, pour
+tester et mesurer les collecteurs sur une machine hors-ligne.
+
+Endpoints servis :
+  · /stats/leaguegamelog          (P et T, DateFrom respecté → mode incrémental)
+  · /stats/commonteamroster
+  · /stats/leaguedashplayerstats
+  · /logos/nba/{team_id}/primary/L/logo.svg   (ETag → 304)
+  · /headshots/nba/latest/{size}/{player_id}.png
+
+Chaque réponse stats est, par ordre de priorité :
+  1. rejouée depuis le cache HTTP enregistré (http_cache.py) pour l'URL réelle
+  2. générée synthétiquement, de façon déterministe (mêmes paramètres → même payload)
+
+Modes de défaillance configurables : latence (moyenne ± jitter), taux d'erreurs
+500, taux de requêtes qui « pendent » (→ timeout client), débit max au-delà
+duquel le serveur répond 429.
+
+Usage :
+    python nba_rating/scripts/mock_nba_server.py --port 8765 --latency-ms 300 \\
+        --error-rate 0.05 --rps 3
+    NBA_STATS_BASE_URL=http://127.0.0.1:8765 NBA_CDN_BASE_URL=http://127.0.0.1:8765 \\
+        NBA_HTTP_CACHE=off python nba_rating/scripts/collect_raw.py --workers 4
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from nba_api.stats.static import teams
+
+import http_cache
+from nba_client import TokenBucket
+
+TEAMS = sorted(teams.get_teams(), key=lambda t: t["id"])
+ROSTER_SIZE  = 15
+ACTIVE       = 10     # joueurs utilisés par match
+GAMES_PER_TM = 82
+REAL_STATS   = "https://stats.nba.com/stats/{endpoint}"
+
+# PNG 1×1 transparent pour les head-shots
+PNG_1PX = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+GAMELOG_STATS = ["MIN", "FGM", "FGA", "FG_PCT", "FG3M", "FG3A", "FG3_PCT", "FTM", "FTA",
+                 "FT_PCT", "OREB", "DREB", "REB", "AST", "STL", "BLK", "TOV", "PF", "PTS",
+                 "PLUS_MINUS"]
+P_HEADERS = (["SEASON_ID", "PLAYER_ID", "PLAYER_NAME", "TEAM_ID", "TEAM_ABBREVIATION",
+              "TEAM_NAME", "GAME_ID", "GAME_DATE", "MATCHUP", "WL"]
+             + GAMELOG_STATS + ["FANTASY_PTS", "VIDEO_AVAILABLE"])
+T_HEADERS = (["SEASON_ID", "TEAM_ID", "TEAM_ABBREVIATION", "TEAM_NAME", "GAME_ID",
+              "GAME_DATE", "MATCHUP", "WL"] + GAMELOG_STATS + ["VIDEO_AVAILABLE"])
+ROSTER_HEADERS = ["TeamID", "SEASON", "LeagueID", "PLAYER", "NICKNAME", "PLAYER_SLUG", "NUM",
+                  "POSITION", "HEIGHT", "WEIGHT", "BIRTH_DATE", "AGE", "EXP", "SCHOOL",
+                  "PLAYER_ID", "HOW_ACQUIRED"]
+DASH_HEADERS = ["PLAYER_ID", "PLAYER_NAME", "TEAM_ID", "TEAM_ABBREVIATION", "AGE", "GP",
+                "MIN", "FGM", "FGA", "FG3M", "FG3A", "FTM", "FTA", "PTS"]
+
+
+# ────────────────────────────────
+#  Données synthétiques
+# ────────────────────────────────
+def _rng(*key) -> random.Random:
+    return random.Random(hashlib.sha256(repr(key).encode()).hexdigest())
+
+
+def _player_id(team_idx: int, slot: int) -> int:
+    return 100000 + team_idx * 100 + slot
+
+
+def _box(rng: random.Random) -> dict:
+    fga  = rng.randint(2, 22)
+    fgm  = rng.randint(0, fga)
+    fg3a = rng.randint(0, min(fga, 10))
+    fg3m = rng.randint(0, min(fg3a, fgm))
+    fta  = rng.randint(0, 10)
+    ftm  = rng.randint(0, fta)
+    oreb, dreb = rng.randint(0, 4), rng.randint(0, 9)
+    return {
+        "MIN": rng.randint(8, 40), "FGM": fgm, "FGA": fga,
+        "FG3M": fg3m, "FG3A": fg3a, "FTM": ftm, "FTA": fta,
+        "OREB": oreb, "DREB": dreb, "REB": oreb + dreb,
+        "AST": rng.randint(0, 10), "STL": rng.randint(0, 3), "BLK": rng.randint(0, 3),
+        "TOV": rng.randint(0, 5), "PF": rng.randint(0, 6),
+        "PTS": 2 * (fgm - fg3m) + 3 * fg3m + ftm,
+    }
+
+
+def _pct(m, a):
+    return round(m / a, 3) if a else None
+
+
+def _schedule(season: str):
+    """(game_id, date, home_idx, away_idx) pour toute la saison régulière."""
+    start_year = int(season[:4])
+    first = date(start_year, 10, 25)
+    rng = _rng("schedule", season)
+    games, n = [], len(TEAMS)
+    for g in range(n * GAMES_PER_TM // 2):
+        home, away = rng.sample(range(n), 2)
+        day = first + timedelta(days=g * 170 // (n * GAMES_PER_TM // 2))
+        games.append((f"002{str(start_year)[-2:]}{g+1:05d}", day, home, away))
+    return games
+
+
+def synth_gamelog(params: dict) -> dict:
+    season = params.get("Season", "2023-24")
+    kind   = params.get("PlayerOrTeam", "P")
+    since  = params.get("DateFrom") or ""
+    since  = date(int(since[6:]), int(since[:2]), int(since[3:5])) if since else None
+    season_id = f"2{season[:4]}"
+    p_rows, t_rows = [], []
+    for gid, day, home, away in _schedule(season):
+        if since and day < since:
+            continue
+        team_lines = {}
+        for idx, opp, sep in ((home, away, " vs. "), (away, home, " @ ")):
+            tm, rng = TEAMS[idx], _rng("game", gid, idx)
+            lines = []
+            for slot in rng.sample(range(ROSTER_SIZE), ACTIVE):
+                box = _box(rng)
+                lines.append((slot, box))
+            tot = {k: sum(b[k] for _, b in lines) for k in lines[0][1]}
+            team_lines[idx] = (tm, opp, sep, lines, tot)
+        h_pts, a_pts = team_lines[home][4]["PTS"], team_lines[away][4]["PTS"]
+        for idx, (tm, opp, sep, lines, tot) in team_lines.items():
+            won = (h_pts >= a_pts) == (idx == home)
+            diff = (h_pts - a_pts) * (1 if idx == home else -1)
+            matchup = f"{tm['abbreviation']}{sep}{TEAMS[opp]['abbreviation']}"
+            common = [gid, day.isoformat(), matchup, "W" if won else "L"]
+            for slot, b in lines:
+                stats = [b.get(k) for k in GAMELOG_STATS]
+                stats[GAMELOG_STATS.index("FG_PCT")]  = _pct(b["FGM"], b["FGA"])
+                stats[GAMELOG_STATS.index("FG3_PCT")] = _pct(b["FG3M"], b["FG3A"])
+                stats[GAMELOG_STATS.index("FT_PCT")]  = _pct(b["FTM"], b["FTA"])
+                stats[GAMELOG_STATS.index("PLUS_MINUS")] = round(diff * b["MIN"] / 48)
+                pid = _player_id(idx, slot)
+                p_rows.append([season_id, pid, f"Player {pid}", tm["id"], tm["abbreviation"],
+                               tm["full_name"], *common, *stats, b["PTS"] + b["REB"], 1])
+            stats = [tot.get(k) for k in GAMELOG_STATS]
+            stats[GAMELOG_STATS.index("MIN")]     = 240
+            stats[GAMELOG_STATS.index("FG_PCT")]  = _pct(tot["FGM"], tot["FGA"])
+            stats[GAMELOG_STATS.index("FG3_PCT")] = _pct(tot["FG3M"], tot["FG3A"])
+            stats[GAMELOG_STATS.index("FT_PCT")]  = _pct(tot["FTM"], tot["FTA"])
+            stats[GAMELOG_STATS.index("PLUS_MINUS")] = diff
+            t_rows.append([season_id, tm["id"], tm["abbreviation"], tm["full_name"],
+                           *common, *stats, 1])
+    if kind == "T":
+        return _result("LeagueGameLog", T_HEADERS, t_rows)
+    return _result("LeagueGameLog", P_HEADERS, p_rows)
+
+
+def synth_roster(params: dict) -> dict:
+    team_id = int(params.get("TeamID", TEAMS[0]["id"]))
+    season  = params.get("Season", "2023-24")
+    idx = next((i for i, t in enumerate(TEAMS) if t["id"] == team_id), 0)
+    rows = []
+    for slot in range(ROSTER_SIZE):
+        rng = _rng("player", idx, slot, season)
+        pid = _player_id(idx, slot)
+        rows.append([team_id, season[:4], "00", f"Player {pid}", f"P{pid}", f"player-{pid}",
+                     str(slot), rng.choice(["G", "F", "C", "G-F", "F-C"]),
+                     f"{rng.randint(6, 7)}-{rng.randint(0, 11)}", str(rng.randint(170, 280)),
+                     "JAN 01, 2000", rng.randint(19, 38), str(rng.randint(0, 15)),
+                     "Mock U", pid, ""])
+    return {"resource": "commonteamroster", "parameters": params, "resultSets": [
+        {"name": "CommonTeamRoster", "headers": ROSTER_HEADERS, "rowSet": rows},
+        {"name": "Coaches", "headers": ["TEAM_ID", "COACH_NAME"], "rowSet": []},
+    ]}
+
+
+def synth_dash(params: dict) -> dict:
+    season = params.get("Season", "2023-24")
+    rows = []
+    for idx, tm in enumerate(TEAMS):
+        for slot in range(ROSTER_SIZE):
+            rng = _rng("dash", idx, slot, season)
+            gp = rng.randint(10, 82)
+            b = _box(rng)
+            pid = _player_id(idx, slot)
+            rows.append([pid, f"Player {pid}", tm["id"], tm["abbreviation"], rng.randint(19, 38),
+                         gp, b["MIN"] * gp, b["FGM"] * gp, b["FGA"] * gp, b["FG3M"] * gp,
+                         b["FG3A"] * gp, b["FTM"] * gp, b["FTA"] * gp, b["PTS"] * gp])
+    return _result("LeagueDashPlayerStats", DASH_HEADERS, rows)
+
+
+def _result(name, headers, rows) -> dict:
+    return {"resource": name.lower(), "resultSets": [{"name": name, "headers": headers, "rowSet": rows}]}
+
+
+SYNTH = {
+    "leaguegamelog":         synth_gamelog,
+    "commonteamroster":      synth_roster,
+    "leaguedashplayerstats": synth_dash,
+}
+
+
+def synth_logo(team_id: str) -> bytes:
+    abbr = next((t["abbreviation"] for t in TEAMS if str(t["id"]) == team_id), "NBA")
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100">'
+            f'<circle cx="50" cy="50" r="48" fill="#17408B"/>'
+            f'<text x="50" y="58" font-size="28" text-anchor="middle" fill="#fff">{abbr}</text>'
+            f'</svg>').encode()
+
+
+# ────────────────────────────────
+#  Serveur
+# ────────────────────────────────
+class MockConfig:
+    def __init__(self, args):
+        self.latency   = args.latency_ms / 1000
+        self.jitter    = args.jitter_ms / 1000
+        self.error     = args.error_rate
+        self.hang      = args.hang_rate
+        self.hang_s    = args.hang_s
+        self.bucket    = TokenBucket(rate=args.rps, capacity=max(1, int(args.rps))) if args.rps else None
+        self.recorded  = not args.synthetic_only
+        self.cache     = http_cache.HTTPCache(mode="on")
+        self.stats     = Counter()
+        self.lock      = threading.Lock()
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+
+class Handler(BaseHTTPRequestHandler):
+    config: MockConfig = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):   # silencieux : les compteurs suffisent
+        pass
+
+    def _send(self, status: int, body: bytes = b"", ctype: str = "application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+        self.config.count(status)
+
+    def do_GET(self):
+        cfg = self.config
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query, keep_blank_values=True))
+        parts = url.path.strip("/").split("/")
+
+        # Modes de défaillance
+        if cfg.bucket is not None and not cfg.bucket.try_acquire():
+            return self._send(429, b'{"message": "Too Many Requests"}')
+        if random.random() < cfg.hang:
+            time.sleep(cfg.hang_s)
+        time.sleep(max(0.0, random.gauss(cfg.latency, cfg.jitter)))
+        if random.random() < cfg.error:
+            return self._send(500, b'{"message": "Internal Server Error"}')
+
+        if parts[0] == "stats" and len(parts) == 2:
+            return self._stats(parts[1].lower(), params)
+        if parts[0] == "logos" and parts[-1] == "logo.svg":
+            return self._asset(synth_logo(parts[2]), "image/svg+xml")
+        if parts[0] == "headshots":
+            return self._asset(PNG_1PX, "image/png")
+        return self._send(404, b'{"message": "Not Found"}')
+
+    def _stats(self, endpoint: str, params: dict):
+        cfg = self.config
+        if cfg.recorded:
+            path = cfg.cache._path(http_cache.cache_key("GET", REAL_STATS.format(endpoint=endpoint), params))
+            if path.exists():
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    entry = json.load(f)
+                cfg.count("recorded")
+                return self._send(200, entry["body"].encode("latin-1"))
+        if endpoint not in SYNTH:
+            return self._send(404, b'{"message": "Unknown endpoint"}')
+        cfg.count("synthetic")
+        return self._send(200, json.dumps(SYNTH[endpoint](params)).encode())
+
+    def _asset(self, body: bytes, ctype: str):
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, headers={"ETag": etag})
+        return self._send(200, body, ctype, headers={"ETag": etag})
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Faux stats.nba.com / cdn.nba.com pour tests hors-ligne")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--latency-ms", type=float, default=200, help="Latence moyenne par requête")
+    p.add_argument("--jitter-ms", type=float, default=50, help="Écart-type de la latence")
+    p.add_argument("--error-rate", type=float, default=0.0, help="Proportion de réponses 500")
+    p.add_argument("--hang-rate", type=float, default=0.0, help="Proportion de requêtes qui pendent")
+    p.add_argument("--hang-s", type=float, default=90, help="Durée d'une requête qui pend (s)")
+    p.add_argument("--rps", type=float, default=0, help="Débit max avant 429 (0 = illimité)")
+    p.add_argument("--synthetic-only", action="store_true",
+                   help="N'utilise pas les réponses enregistrées dans le cache HTTP")
+    args = p.parse_args()
+
+    Handler.config = MockConfig(args)
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f"🧪 Mock NBA sur http://{args.host}:{args.port} "
+          f"(latence {args.latency_ms} ms, erreurs {args.error_rate:.0%}, "
+          f"pend {args.hang_rate:.0%}, limite {args.rps or '∞'} req/s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n📊 Réponses servies : {dict(Handler.config.stats)}")
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+name_matching.py
+----------------
+Normalisation et fuzzy matching de noms de joueurs (B-Ref ↔ nba_api) :
+  · normalize_series : normalize() appliqué une seule fois par nom unique
+  · fuzzy_match      : blocking par clés peu coûteuses (token nom de famille,
+    prénom, initiales, trigrammes du nom de famille) puis, pour chaque bloc,
+    matrice de similarité toutes-paires vectorisée (rapidfuzz.process.cdist,
+    multi-cœurs) au lieu d'un extractOne par nom contre toute la liste.
+    Parallélisme par threads (`workers=-1`) et non par pool de processus :
+    cdist calcule la matrice en C++ hors GIL, donc sur tous les cœurs, sans
+    sérialiser les listes de noms vers des processus fils ni payer leur
+    démarrage — coûts qui dépasseraient le calcul d'un bloc (quelques
+    dizaines de noms)
+  · table d'alias persistante (nom normalisé, saison) → PLAYER_ID, avec la
+    provenance de chaque résolution (exact / fuzzy / manual)
+"""
+import re
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process, utils
+
+from parquet_io import write_parquet
+
+SCORE_CUTOFF = 90
+
+
+def normalize(name: str) -> str:
+    if not isinstance(name, str):
+        return ""
+    # enlever accents
+    nfkd = unicodedata.normalize("NFKD", name)
+    ascii_str = "".join(c for c in nfkd if not unicodedata.combining(c))
+    # ➊ remplacer tirets/traits d’union par espace
+    ascii_str = ascii_str.replace("-", " ").replace("–", " ")
+    # ➋ minuscules, ne garder que alphanum & espace
+    s = re.sub(r"[^a-zA-Z0-9 ]+", "", ascii_str.lower()).strip()
+    # ➌ retirer suffixes
+    s = re.sub(r"\b(jr|sr|ii|iii|iv)\b", "", s)
+    # ➍ compresser espaces multiples
+    return re.sub(r"\s+", " ", s).strip()
+
+
+def normalize_series(names: pd.Series) -> pd.Series:
+    """normalize() sur les seules valeurs uniques, puis map vectorisé."""
+    uniq = pd.unique(names)
+    return names.map(dict(zip(uniq, map(normalize, uniq))))
+
+
+def block_keys(name: str) -> set[str]:
+    """Clés de blocking : deux noms ne sont comparés que s'ils partagent une clé."""
+    toks = name.split()
+    if not toks:
+        return set()
+    last = toks[-1]
+    keys = {f"L:{last}", f"F:{toks[0]}", "I:" + "".join(t[0] for t in toks)}
+    padded = f" {last} "
+    keys.update(f"G:{padded[i:i+3]}" for i in range(len(padded) - 2))
+    return keys
+
+
+def _index(names) -> dict[str, list[int]]:
+    idx = defaultdict(list)
+    for i, n in enumerate(names):
+        for k in block_keys(n):
+            idx[k].append(i)
+    return idx
+
+
+def fuzzy_match(queries, choices, score_cutoff: int = SCORE_CUTOFF,
+                with_scores: bool = False) -> dict:
+    """
+    Meilleur choix (WRatio ≥ score_cutoff, comme thefuzz.process.extractOne)
+    pour chaque nom de `queries` ; les noms sans correspondance sont absents du dict.
+    Avec `with_scores`, les valeurs sont des tuples (choix, score).
+    """
+    queries = list(queries)
+    choices = list(dict.fromkeys(choices))
+    if not queries or not choices:
+        return {}
+
+    q_idx, c_idx = _index(queries), _index(choices)
+    best_score = np.zeros(len(queries))
+    best_match = np.full(len(queries), -1)
+
+    for key, qi in q_idx.items():
+        cj = c_idx.get(key)
+        if not cj:
+            continue
+        scores = process.cdist(
+            [queries[i] for i in qi], [choices[j] for j in cj],
+            scorer=fuzz.WRatio, processor=utils.default_process,
+            score_cutoff=score_cutoff, workers=-1,
+        )
+        arg = scores.argmax(axis=1)
+        top = scores[np.arange(len(qi)), arg]
+        qi  = np.asarray(qi)
+        better = top > best_score[qi]
+        best_score[qi[better]] = top[better]
+        best_match[qi[better]] = np.asarray(cj)[arg[better]]
+
+    if with_scores:
+        return {queries[i]: (choices[j], float(best_score[i]))
+                for i, j in enumerate(best_match) if j >= 0}
+    return {queries[i]: choices[j] for i, j in enumerate(best_match) if j >= 0}
+
+
+# ────────────────────────────────
+#  Table d'alias persistante
+# ────────────────────────────────
+ALIAS_KEY  = ["PLAYER_NAME_NORM", "season"]
+ALIAS_COLS = ALIAS_KEY + ["PLAYER_ID", "method", "matched_name", "score", "resolved_at"]
+IGNORE_ID  = "-"   # dans le CSV manuel : nom connu mais volontairement non mappé
+
+
+def load_aliases(path: Path) -> pd.DataFrame:
+    if not path.exists():
+        return pd.DataFrame({c: pd.Series(dtype="object") for c in ALIAS_COLS})
+    return pd.read_parquet(path)
+
+
+def save_aliases(aliases: pd.DataFrame, path: Path):
+    aliases = aliases[ALIAS_COLS].astype({"PLAYER_ID": "Int64", "score": "float64"})
+    write_parquet(aliases, path, sort_by=ALIAS_KEY)
+
+
+def make_aliases(keys: pd.DataFrame, ids, method: str, matched=None, scores=None) -> pd.DataFrame:
+    """Construit des lignes d'alias pour `keys` (PLAYER_NAME_NORM, season)."""
+    out = keys[ALIAS_KEY].reset_index(drop=True).copy()
+    out["PLAYER_ID"]    = pd.array(list(ids), dtype="Int64")
+    out["method"]       = method
+    out["matched_name"] = list(matched) if matched is not None else out["PLAYER_NAME_NORM"]
+    out["score"]        = list(scores) if scores is not None else 100.0
+    out["resolved_at"]  = pd.Timestamp.now(tz="UTC")
+    return out
+
+
+def upsert_aliases(aliases: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """Ajoute/remplace des alias ; la dernière résolution d'une clé l'emporte."""
+    if new.empty:
+        return aliases
+    return (
+        pd.concat([aliases, new], ignore_index=True)
+          .drop_duplicates(ALIAS_KEY, keep="last")
+          .reset_index(drop=True)
+    )
+
+
+def load_manual_aliases(path: Path, seasons) -> pd.DataFrame:
+    """
+    CSV éditable à la main : PLAYER_NAME_NORM, season, PLAYER_ID[, PLAYER_NAME].
+    season vide ou "*" = toutes les saisons ; PLAYER_ID vide = à compléter
+    (ignoré) ; PLAYER_ID "-" = non-joueur, jamais envoyé au fuzzy matching.
+    """
+    if not path.exists():
+        return pd.DataFrame(columns=ALIAS_COLS)
+    man = pd.read_csv(path, dtype=str, keep_default_na=False)
+    man = man[man["PLAYER_ID"].str.strip() != ""]
+    wildcard = man["season"].isin(["", "*"])
+    expanded = (
+        man[wildcard].drop(columns="season")
+                     .merge(pd.DataFrame({"season": list(seasons)}), how="cross")
+    )
+    man = pd.concat([expanded, man[~wildcard]], ignore_index=True)   # saison explicite prioritaire
+    ids = pd.to_numeric(man["PLAYER_ID"], errors="coerce")   # IGNORE_ID → <NA>
+    return make_aliases(man, ids, "manual", scores=[None] * len(man))
+
+
+def append_pending_manual(path: Path, unmatched: pd.DataFrame):
+    """Ajoute au CSV manuel les noms non résolus (PLAYER_ID vide, à compléter)."""
+    cols = ["PLAYER_NAME_NORM", "season", "PLAYER_ID", "PLAYER_NAME"]
+    old = (pd.read_csv(path, dtype=str, keep_default_na=False)
+           if path.exists() else pd.DataFrame(columns=cols))
+    new = unmatched.assign(PLAYER_ID="")[cols]
+    known = old.set_index(["PLAYER_NAME_NORM", "season"]).index
+    new = new[~new.set_index(["PLAYER_NAME_NORM", "season"]).index.isin(known)]
+    if not new.empty:
+        pd.concat([old, new], ignore_index=True).to_csv(path, index=False)
+    return len(new)
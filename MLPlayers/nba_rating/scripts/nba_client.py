@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+nba_client.py
+-------------
+Accès partagé à stats.nba.com pour tous les collecteurs :
+  · une seule session HTTP (keep-alive) injectée dans nba_api
+  · un token bucket partagé entre threads, piloté par un contrôleur AIMD :
+    débit et concurrence augmentent additivement tant que l'API répond,
+    sont divisés par deux sur timeout / 429 (métriques via `metrics()`)
+  · le cache disque de http_cache.py (les hits ne consomment pas de jeton)
+  · un pool de workers borné pour paralléliser les appels
+  · un retry avec backoff exponentiel « full jitter »
+  · la télémétrie de telemetry.py (latence, taille, attente, retries par requête)
+  · NBA_STATS_BASE_URL=http://127.0.0.1:8765 redirige tous les endpoints vers
+    un autre hôte (ex. mock_nba_server.py pour les tests de charge hors-ligne)
+
+Usage :
+    from nba_client import install_session, run_parallel
+    install_session()
+    run_parallel(tasks, workers=4)
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from tqdm import tqdm
+from nba_api.stats.library.http import NBAStatsHTTP
+
+from http_cache import HTTPCache
+from telemetry import TELEMETRY
+
+# Point de départ empirique de stats.nba.com ; l'AIMD ajuste ensuite
+RATE_PER_SEC = 1.5
+BURST        = 3
+MAX_WORKERS  = 4
+RATE_MIN, RATE_MAX   = 0.2, 6.0   # req/s
+RATE_STEP            = 0.1        # + additif par fenêtre de succès
+WINDOW_MIN           = 1          # requêtes simultanées
+THROTTLE_STATUS      = {429, 503}
+RETRIES      = 4
+BACKOFF_BASE = 1.0   # s
+BACKOFF_CAP  = 30.0  # s
+STATS_BASE_URL = os.environ.get("NBA_STATS_BASE_URL", "").rstrip("/")
+
+
+class TokenBucket:
+    """Token bucket thread-safe : `acquire()` bloque jusqu'à ce qu'un jeton soit dispo."""
+
+    def __init__(self, rate: float = RATE_PER_SEC, capacity: int = BURST):
+        self.rate     = rate
+        self.capacity = capacity
+        self.tokens   = float(capacity)
+        self.updated  = time.monotonic()
+        self.lock     = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens  = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> float:
+        """Consomme un jeton, renvoie le temps passé à attendre (s)."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def try_acquire(self) -> bool:
+        """Consomme un jeton s'il y en a un, sans attendre."""
+        with self.lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class AdaptiveController:
+    """
+    Contrôleur AIMD partagé par toutes les requêtes réseau :
+      · succès : après `window` réponses OK, window += 1 et rate += RATE_STEP
+      · timeout / 429 / 503 : window et rate divisés par deux (backoff)
+    `acquire()` attend une place dans la fenêtre puis un jeton du bucket.
+    """
+
+    def __init__(self, bucket: TokenBucket, window: int = 2, max_window: int = 2 * MAX_WORKERS):
+        self.bucket     = bucket
+        self.window     = window
+        self.max_window = max_window
+        self.in_flight  = 0
+        self.successes  = 0
+        self.backoffs   = []            # (timestamp, raison, nouveau débit)
+        self.cond       = threading.Condition()
+
+    def acquire(self) -> float:
+        """Réserve une place + un jeton ; renvoie le temps d'attente (s)."""
+        t0 = time.monotonic()
+        with self.cond:
+            while self.in_flight >= self.window:
+                self.cond.wait()
+            self.in_flight += 1
+        self.bucket.acquire()
+        return time.monotonic() - t0
+
+    def release(self, throttled: bool = False, reason: str = ""):
+        with self.cond:
+            self.in_flight -= 1
+            if throttled:
+                self.window      = max(WINDOW_MIN, self.window // 2)
+                self.bucket.rate = max(RATE_MIN, self.bucket.rate / 2)
+                self.successes   = 0
+                self.backoffs.append((time.time(), reason, self.bucket.rate))
+                print(f"🐢 Backoff ({reason}) → {self.bucket.rate:.2f} req/s, fenêtre {self.window}")
+            else:
+                self.successes += 1
+                if self.successes >= self.window:
+                    self.successes   = 0
+                    self.window      = min(self.max_window, self.window + 1)
+                    self.bucket.rate = min(RATE_MAX, self.bucket.rate + RATE_STEP)
+            self.cond.notify_all()
+
+    def metrics(self) -> dict:
+        with self.cond:
+            return {
+                "rate_per_s":     round(self.bucket.rate, 3),
+                "window":         self.window,
+                "in_flight":      self.in_flight,
+                "backoff_events": len(self.backoffs),
+                "backoffs":       list(self.backoffs),
+            }
+
+
+class CachedSession(requests.Session):
+    """Session requests qui sert les GET depuis le cache disque quand c'est possible."""
+
+    def __init__(self, cache: HTTPCache | None = None):
+        super().__init__()
+        self.cache = cache or HTTPCache()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=MAX_WORKERS,
+                                                pool_maxsize=MAX_WORKERS)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def _send_network(self, method, url, params=None, **kwargs):
+        return super().request(method, url, params=params, **kwargs)
+
+    def request(self, method, url, params=None, **kwargs):
+        # nba_api passe ses paramètres en liste de (clé, valeur) triée : un dict
+        # garde cet ordre et sert de forme unique au cache et à la télémétrie
+        params = dict(params or {})
+        t0 = time.perf_counter()
+        if method.upper() == "GET":
+            cached = self.cache.lookup(method, url, params)
+            if cached is not None:
+                TELEMETRY.request(url, params, time.perf_counter() - t0, cached, from_cache=True)
+                return cached
+        try:
+            resp = self._send_network(method, url, params=params, **kwargs)
+        except Exception as e:
+            TELEMETRY.request(url, params, time.perf_counter() - t0, error=type(e).__name__)
+            raise
+        TELEMETRY.request(url, params, time.perf_counter() - t0, resp,
+                          wait_s=getattr(resp, "wait_s", 0.0))
+        if method.upper() == "GET":
+            self.cache.store(method, url, params, resp)
+        return resp
+
+
+class RateLimitedSession(CachedSession):
+    """CachedSession dont chaque requête réseau passe par le contrôleur AIMD partagé."""
+
+    def __init__(self, controller: AdaptiveController, cache: HTTPCache | None = None):
+        super().__init__(cache)
+        self.controller = controller
+
+    def _send_network(self, method, url, params=None, **kwargs):
+        wait = self.controller.acquire()
+        try:
+            resp = super()._send_network(method, url, params=params, **kwargs)
+            resp.wait_s = wait
+        except requests.Timeout:
+            self.controller.release(throttled=True, reason="timeout")
+            raise
+        except Exception:
+            self.controller.release()
+            raise
+        throttled = resp.status_code in THROTTLE_STATUS
+        self.controller.release(throttled=throttled, reason=f"HTTP {resp.status_code}")
+        return resp
+
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+def install_session(rate: float = RATE_PER_SEC, burst: int = BURST) -> RateLimitedSession:
+    """
+    Crée (une seule fois) la session partagée et l'installe dans nba_api :
+    tous les endpoints (LeagueGameLog, CommonTeamRoster, …) passent par elle.
+    """
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = RateLimitedSession(AdaptiveController(TokenBucket(rate, burst)))
+            NBAStatsHTTP.set_session(_SESSION)
+            if STATS_BASE_URL:
+                NBAStatsHTTP.base_url = STATS_BASE_URL + "/stats/{endpoint}"
+                print(f"🧪 Endpoints stats redirigés vers {STATS_BASE_URL}")
+    return _SESSION
+
+
+def metrics() -> dict:
+    """Débit courant, fenêtre de concurrence et backoffs du contrôleur partagé."""
+    return _SESSION.controller.metrics() if _SESSION is not None else {}
+
+
+def write_report(out_dir, name: str) -> dict:
+    """Rapport de télémétrie du run (+ état final du contrôleur AIMD)."""
+    m = metrics()
+    m["backoffs"] = [{"ts": ts, "reason": r, "rate": rate} for ts, r, rate in m.get("backoffs", [])]
+    return TELEMETRY.report(out_dir, name, extra={"rate_controller": m})
+
+
+def print_metrics():
+    m = metrics()
+    if m:
+        print(f"⚙️  Débit final {m['rate_per_s']} req/s · fenêtre {m['window']} · "
+              f"{m['backoff_events']} backoff(s)")
+
+
+def with_retry(fn, retries: int = RETRIES, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP,
+               endpoint: str = "-", season: str = "-"):
+    """
+    Appelle `fn()` ; en cas d'exception, réessaie jusqu'à `retries` fois en
+    attendant uniform(0, min(cap, base·2^n)) secondes (backoff « full jitter »,
+    évite que les workers repartent tous en même temps).
+    Chaque retry est compté dans la télémétrie sous (endpoint, season).
+    """
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception:
+            if attempt == retries:
+                raise
+            TELEMETRY.add_retry(endpoint, season)
+            time.sleep(random.uniform(0, min(cap, base * 2 ** attempt)))
+
+
+def run_parallel(tasks, workers: int = MAX_WORKERS, desc: str | None = None):
+    """
+    Exécute une liste de (label, callable) sur un pool de threads borné.
+    Les erreurs sont affichées sans interrompre les autres tâches ;
+    renvoie la liste des labels en échec.
+    """
+    failed = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fn): label for label, fn in tasks}
+        done = as_completed(futures)
+        if desc:
+            done = tqdm(done, total=len(futures), desc=desc)
+        for fut in done:
+            label = futures[fut]
+            try:
+                fut.result()
+            except Exception as e:
+                print(f"❌ {label} : {e}")
+                failed.append(label)
+    return failed
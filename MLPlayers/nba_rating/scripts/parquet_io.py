@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+parquet_io.py
+-------------
+Profil d'écriture Parquet commun à tous les scripts :
+  · tri sur la clé naturelle (PLAYER_ID, season, TEAM_ID…) → statistiques
+    min/max serrées par row group et par page
+  · compression zstd
+  · row groups de ROW_GROUP_ROWS lignes : une lecture filtrée sur un joueur
+    ou une plage de saisons saute la plupart des row groups
+  · page index (column index + offset index) pour sauter aussi des pages
+  · Bloom filters sur les colonnes d'identifiants (si pyarrow sait les écrire)
+  · métadonnées de schéma "nba_rating" : clé de tri, script, date, nb de lignes
+  · écriture atomique (fichier temporaire caché puis rename)
+
+Usage :
+    from parquet_io import write_parquet
+    write_parquet(df, path, sort_by=["PLAYER_ID", "season"])
+"""
+import inspect
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+COMPRESSION       = "zstd"
+COMPRESSION_LEVEL = 6
+ROW_GROUP_ROWS    = 32_768
+ID_COLUMNS        = ("PLAYER_ID", "TEAM_ID", "GAME_ID")
+BLOOM_FPP         = 0.01
+METADATA_KEY      = b"nba_rating"
+# écriture des Bloom filters : détectée une fois sur la signature de pyarrow
+BLOOM_FILTERS     = "bloom_filter_options" in inspect.signature(pq.write_table).parameters
+
+
+def _table(df: pd.DataFrame, sort_by) -> pa.Table:
+    keys = [c for c in (sort_by or []) if c in df.columns]
+    if keys:
+        df = df.sort_values(keys, kind="stable")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    meta = dict(table.schema.metadata or {})
+    meta[METADATA_KEY] = json.dumps({
+        "sort_by":    keys,
+        "rows":       len(df),
+        "written_by": Path(sys.argv[0]).name,
+        "written_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }).encode()
+    return table.replace_schema_metadata(meta)
+
+
+def write_parquet(df: pd.DataFrame, path, sort_by=None, row_group_rows: int = ROW_GROUP_ROWS):
+    """Écrit `df` dans `path` avec le profil commun (cf. docstring du module)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = _table(df, sort_by)
+    ids   = [c for c in ID_COLUMNS if c in table.column_names]
+    options = dict(
+        compression=COMPRESSION,
+        compression_level=COMPRESSION_LEVEL,
+        row_group_size=row_group_rows,
+        write_statistics=True,
+        write_page_index=True,
+    )
+    if BLOOM_FILTERS and ids:
+        options["bloom_filter_options"] = {c: {"fpp": BLOOM_FPP} for c in ids}
+    # fichier temporaire caché : ignoré par les scans de dataset pendant l'écriture
+    tmp = path.with_name(f".{path.name}.tmp")
+    pq.write_table(table, tmp, **options)
+    tmp.replace(path)
+    return path
+
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+pipeline.py
+-----------
+Exécution mémoïsée du pipeline joueurs, en aval de la collecte raw.
+
+Chaque étape déclare ses entrées et sorties (motifs glob relatifs à MLPlayers/).
+Son empreinte combine :
+  · le hash du contenu de chaque entrée (sha256, mis en cache par
+    (taille, mtime) : un no-op ne relit aucun fichier)
+  · la version du code : le script et les modules locaux qu'il importe
+  · ses arguments
+Une étape dont l'empreinte n'a pas changé et dont les sorties existent est
+sautée. Les empreintes sont enregistrées dans data/pipeline_state.json
+après chaque succès.
+
+Ordonnancement (DAG) : les étapes indépendantes (generate_ws_vorp,
+cluster_players, pipeline MLTeams…) tournent en parallèle sur `--workers`
+sous-processus, dans la limite des budgets `--cpus` et `--mem-gb` (chaque
+étape déclare son estimation ; une étape hors budget tourne seule). La
+sortie de chaque étape va dans data/logs/pipeline/{étape}.log. Une étape en
+échec ne bloque que ses dépendants : les autres branches continuent.
+
+Les étapes `per_season` (motifs contenant {season}) ont une empreinte par
+saison et ne sont relancées qu'avec `--season` pour les saisons modifiées.
+Les étapes sont évaluées dans l'ordre : une étape relancée dont les sorties
+sont identiques au bit près ne rend pas les suivantes obsolètes.
+
+Usage (depuis MLPlayers/) :
+    python nba_rating/scripts/pipeline.py                  # tout ce qui est obsolète
+    python nba_rating/scripts/pipeline.py dashboard_data   # une cible et ses dépendances
+    python nba_rating/scripts/pipeline.py --dry-run        # ce qui serait reconstruit
+    python nba_rating/scripts/pipeline.py curate --force   # ignore les empreintes des cibles
+    python nba_rating/scripts/pipeline.py --workers 4 --mem-gb 8
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+SCRIPTS = Path(__file__).resolve().parent
+ROOT    = SCRIPTS.parents[1]                  # MLPlayers/
+MLTEAMS = ROOT.parent / "MLTeams"
+STATE   = ROOT / "nba_rating" / "data" / "pipeline_state.json"
+LOG_DIR = ROOT / "nba_rating" / "data" / "logs" / "pipeline"
+RAW     = "nba_rating/data/raw"
+CURATED = "nba_rating/data/curated"
+SEASONS = [f"{y}-{str(y+1)[-2:]}" for y in range(1999, 2024)]
+
+
+@dataclass
+class Stage:
+    name:      str
+    script:    str
+    inputs:    list[str]
+    outputs:   list[str]
+    deps:      list[str] = field(default_factory=list)
+    args:      list[str] = field(default_factory=list)
+    per_season: bool = False
+    cpus:      int   = 1          # cœurs occupés (estimation)
+    jobs:      bool  = False      # accepte --jobs : saisons réparties sur `cpus` processus
+    mem_gb:    float = 1.0        # pic mémoire (estimation)
+    home:      Path  = SCRIPTS    # dossier du script
+    cwd:       Path  = ROOT       # répertoire d'exécution
+
+
+STAGES = [
+    Stage("rassemble_gamelogs", "rassemble_gamelogs.py",
+          inputs=[f"{RAW}/player_gamelog_*.parquet", f"{RAW}/team_gamelog_*.parquet"],
+          outputs=[], mem_gb=0.5),
+    # fix_phys réécrit ses entrées : l'empreinte est prise après exécution
+    Stage("fix_phys", "fix_phys.py",
+          inputs=[f"{RAW}/player_phys_*.parquet"],
+          outputs=[f"{RAW}/player_phys_*.parquet"], cpus=2, jobs=True),
+    Stage("curate", "curate_players.py", per_season=True,
+          inputs=[f"{RAW}/player_gamelog/season={{season}}/part-0.parquet",
+                  f"{RAW}/player_phys_{{season}}.parquet",
+                  f"{RAW}/player_esv_{{season}}.parquet",
+                  f"{RAW}/team_pace_{{season}}.parquet"],
+          outputs=[f"{CURATED}/player_season_{{season}}.parquet",
+                   f"{CURATED}/all_seasons_scores.parquet"],
+          deps=["rassemble_gamelogs", "fix_phys"], cpus=4, mem_gb=3, jobs=True),
+    Stage("cluster_players", "cluster_players.py",
+          inputs=[f"{CURATED}/player_season_*.parquet"],
+          outputs=[f"{CURATED}/player_clusters.parquet"],
+          deps=["curate"], cpus=2, mem_gb=2),
+    Stage("build_dataset_ml", "build_dataset_ml.py",
+          inputs=[f"{CURATED}/all_seasons_scores.parquet",
+                  f"{CURATED}/player_season_*.parquet",
+                  f"{CURATED}/player_clusters.parquet",
+                  f"{RAW}/player_gamelog/season=*/part-0.parquet"],
+          outputs=[f"{CURATED}/dataset_ml.parquet"],
+          deps=["curate", "cluster_players"], mem_gb=2),
+    Stage("generate_ws_vorp", "generate_ws_vorp.py",
+          inputs=[f"{RAW}/player_gamelog/season=*/part-0.parquet",
+                  f"{RAW}/bref/advanced_*.html.gz",
+                  "nba_rating/data/manual_aliases.csv"],
+          outputs=[f"{CURATED}/wins_shares_vorp.parquet"],
+          deps=["rassemble_gamelogs"]),
+    Stage("predict_future", "predict_future.py",
+          inputs=[f"{CURATED}/dataset_ml.parquet", "nba_rating/models/model_best.pkl"],
+          outputs=[f"{CURATED}/projections.parquet"],
+          deps=["build_dataset_ml"]),
+    Stage("dashboard_data", "dashboard_data.py",
+          inputs=[f"{CURATED}/dataset_ml.parquet",
+                  f"{CURATED}/all_seasons_scores.parquet",
+                  f"{CURATED}/wins_shares_vorp.parquet",
+                  f"{CURATED}/player_clusters.parquet",
+                  f"{CURATED}/projections.parquet",
+                  f"{RAW}/player_gamelog/season=*/part-0.parquet"],
+          outputs=[f"{CURATED}/dashboard_data.parquet", f"{CURATED}/dashboard_slim.parquet",
+                   "nba_rating/data/snapshots/dashboard.arrow"],
+          deps=["build_dataset_ml", "generate_ws_vorp", "predict_future"], mem_gb=2),
+    # pipeline MLTeams : vérification du dataset team_gamelog + instantanés Arrow
+    Stage("teams_curated", "prepare_curated.py",
+          inputs=[f"{RAW}/team_gamelog/season=*/part-0.parquet",
+                  "../MLTeams/data/curated/all_pair_preds.parquet"],
+          outputs=["nba_rating/data/snapshots/team_gamelog.arrow"],
+          deps=["rassemble_gamelogs"], home=MLTEAMS / "scripts", cwd=MLTEAMS),
+]
+BY_NAME = {s.name: s for s in STAGES}
+
+
+# ────────────────────────────────
+#  Empreintes
+# ────────────────────────────────
+class Hasher:
+    """sha256 des fichiers, mémorisé par (chemin, taille, mtime_ns) d'une exécution à l'autre."""
+
+    def __init__(self, cache: dict):
+        self.cache = cache
+
+    def file(self, path: Path) -> str:
+        st  = path.stat()
+        key = os.path.relpath(path, ROOT)
+        hit = self.cache.get(key)
+        if hit and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+            return hit[2]
+        h = hashlib.sha256()
+        with path.open("rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        self.cache[key] = [st.st_size, st.st_mtime_ns, h.hexdigest()]
+        return h.hexdigest()
+
+
+IMPORT_RE = re.compile(r"^\s*(?:from|import)\s+(\w+)", re.M)
+
+
+def code_files(stage: Stage) -> list[Path]:
+    """Le script et, transitivement, les modules locaux (son dossier, scripts/) qu'il importe."""
+    seen, todo = set(), [stage.home / stage.script]
+    while todo:
+        path = todo.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        for mod in IMPORT_RE.findall(path.read_text(encoding="utf-8")):
+            todo.extend(d / f"{mod}.py" for d in {path.parent, SCRIPTS}
+                        if (d / f"{mod}.py").exists())
+    return sorted(seen)
+
+
+def expand(patterns: list[str], season: str | None = None) -> list[Path]:
+    files = set()
+    for pat in patterns:
+        if season is not None:
+            pat = pat.replace("{season}", season)
+        elif "{season}" in pat:
+            pat = pat.replace("{season}", "*")
+        files.update(p for p in ROOT.glob(pat) if p.is_file())
+    return sorted(files)
+
+
+def fingerprint(stage: Stage, hasher: Hasher, season: str | None = None) -> str:
+    h = hashlib.sha256()
+    h.update(json.dumps([stage.script, stage.args, season]).encode())
+    for path in code_files(stage) + expand(stage.inputs, season):
+        h.update(os.path.relpath(path, ROOT).encode())
+        h.update(hasher.file(path).encode())
+    return h.hexdigest()
+
+
+def outputs_exist(stage: Stage, season: str | None = None) -> bool:
+    patterns = [p.replace("{season}", season) if season else p for p in stage.outputs]
+    return all(list(ROOT.glob(p)) for p in patterns)
+
+
+def seasons_of(stage: Stage) -> list[str]:
+    """Saisons dont au moins une entrée existe."""
+    return [s for s in SEASONS if expand(stage.inputs[:1], s)]
+
+
+# ────────────────────────────────
+#  Planification / exécution
+# ────────────────────────────────
+def closure(targets: list[str]) -> list[Stage]:
+    """Étapes à considérer pour `targets` (dépendances comprises), dans l'ordre de STAGES."""
+    wanted, todo = set(), list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in BY_NAME:
+            raise SystemExit(f"❌ Étape inconnue : {name} (connues : {', '.join(BY_NAME)})")
+        if name not in wanted:
+            wanted.add(name)
+            todo.extend(BY_NAME[name].deps)
+    return [s for s in STAGES if s.name in wanted]
+
+
+def stale(stage: Stage, state: dict, hasher: Hasher, force: bool) -> tuple[bool, list[str]]:
+    """(obsolète ?, saisons obsolètes) ; les saisons ne concernent que les étapes per_season."""
+    done = state["stages"].get(stage.name, {})
+    if stage.per_season:
+        dirty = [s for s in seasons_of(stage)
+                 if force or done.get(s) != fingerprint(stage, hasher, s)
+                 or not outputs_exist(stage, s)]
+        return bool(dirty), dirty
+    fp = fingerprint(stage, hasher)
+    return force or done.get("*") != fp or not outputs_exist(stage), []
+
+
+def run_stage(stage: Stage, seasons: list[str]) -> tuple[bool, float]:
+    """Lance l'étape en sous-processus, sortie dans son log ; (succès, durée)."""
+    cmd = [sys.executable, str(stage.home / stage.script), *stage.args]
+    for s in seasons:
+        cmd += ["--season", s]
+    if stage.jobs:
+        cmd += ["--jobs", str(stage.cpus)]   # hors empreinte : ne change pas les sorties
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    with (LOG_DIR / f"{stage.name}.log").open("w") as log:
+        log.write(f"$ {' '.join(cmd)}\n")
+        log.flush()
+        ok = subprocess.run(cmd, cwd=stage.cwd, stdout=log, stderr=subprocess.STDOUT).returncode == 0
+    return ok, time.perf_counter() - t0
+
+
+def log_tail(stage: Stage, n: int = 15) -> str:
+    lines = (LOG_DIR / f"{stage.name}.log").read_text(errors="replace").splitlines()
+    return "\n".join(f"   │ {l}" for l in lines[-n:])
+
+
+def default_mem_gb() -> float:
+    """80 % de la mémoire physique (8 Go si indisponible)."""
+    try:
+        return 0.8 * os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / 2**30
+    except (ValueError, OSError, AttributeError):
+        return 8.0
+
+
+def load_state() -> dict:
+    if STATE.exists():
+        return json.loads(STATE.read_text())
+    return {"stages": {}, "hashes": {}}
+
+
+def save_state(state: dict):
+    STATE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = STATE.with_name(f".{STATE.name}.tmp")
+    tmp.write_text(json.dumps(state, indent=1, sort_keys=True))
+    tmp.replace(STATE)
+
+
+def record(stage: Stage, seasons: list[str], seconds: float, state: dict, hasher: Hasher):
+    # empreinte prise après exécution (étapes qui réécrivent leurs entrées)
+    done = state["stages"].setdefault(stage.name, {})
+    if stage.per_season:
+        for s in seasons:
+            done[s] = fingerprint(stage, hasher, s)
+    else:
+        done["*"] = fingerprint(stage, hasher)
+    state.setdefault("durations", {})[stage.name] = round(seconds, 1)
+
+
+def critical_path(stages: list[Stage], durations: dict) -> tuple[float, list[str]]:
+    """Plus long chemin du DAG selon les dernières durées connues."""
+    best = {}
+    for stage in stages:                                  # STAGES est trié topologiquement
+        prev = max((best[d] for d in stage.deps if d in best), default=(0.0, []))
+        best[stage.name] = (prev[0] + durations.get(stage.name, 0.0), prev[1] + [stage.name])
+    return max(best.values(), default=(0.0, []))
+
+
+def dry_run(stages: list[Stage], state: dict, hasher: Hasher, forced: set):
+    upstream_dirty = set()
+    for stage in stages:
+        dirty, seasons = stale(stage, state, hasher, stage.name in forced)
+        if dirty:
+            what = f" saisons {', '.join(seasons)}" if stage.per_season else ""
+            print(f"🔁 {stage.name:<20} à reconstruire{what}")
+            upstream_dirty.add(stage.name)
+        elif upstream_dirty & set(stage.deps):
+            # réévaluée après exécution de ses dépendances
+            print(f"❔ {stage.name:<20} probable (dépend de {', '.join(sorted(upstream_dirty & set(stage.deps)))})")
+            upstream_dirty.add(stage.name)
+        else:
+            print(f"✔️  {stage.name:<20} à jour")
+    durations = state.get("durations", {})
+    rebuilt = [s for s in stages if s.name in upstream_dirty]
+    if rebuilt and all(s.name in durations for s in rebuilt):
+        total, path = critical_path(rebuilt, durations)
+        serial = sum(durations[s.name] for s in rebuilt)
+        print(f"\n⏱️  Chemin critique estimé : {total:.0f} s ({' → '.join(path)}) ; en série : {serial:.0f} s")
+
+
+def schedule(stages: list[Stage], state: dict, hasher: Hasher, forced: set,
+             workers: int, cpus: int, mem_gb: float) -> dict[str, str]:
+    """Exécute le DAG ; renvoie le statut de chaque étape (ok, à jour, échec, bloquée)."""
+    status  = {}
+    pending = list(stages)
+    running = {}
+    used_cpus, used_mem = 0, 0.0
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            progress = True
+            while progress:
+                progress = False
+                for stage in list(pending):
+                    deps = [status.get(d) for d in stage.deps]
+                    if any(st in ("échec", "bloquée") for st in deps):
+                        status[stage.name] = "bloquée"
+                        pending.remove(stage)
+                        print(f"⛔ {stage.name:<20} bloquée (dépendance en échec)")
+                        progress = True
+                        continue
+                    if not all(st in ("ok", "à jour") for st in deps):
+                        continue
+                    dirty, seasons = stale(stage, state, hasher, stage.name in forced)
+                    if not dirty:
+                        status[stage.name] = "à jour"
+                        pending.remove(stage)
+                        print(f"✔️  {stage.name:<20} à jour")
+                        progress = True
+                        continue
+                    # une étape plus grosse que le budget tourne seule
+                    fits = len(running) < workers and (not running or (
+                        used_cpus + stage.cpus <= cpus and used_mem + stage.mem_gb <= mem_gb))
+                    if not fits:
+                        continue
+                    pending.remove(stage)
+                    used_cpus += stage.cpus
+                    used_mem  += stage.mem_gb
+                    running[pool.submit(run_stage, stage, seasons)] = (stage, seasons)
+                    what = f" ({len(seasons)} saisons)" if stage.per_season else ""
+                    print(f"▶️  {stage.name:<20} lancée{what} → {os.path.relpath(LOG_DIR / (stage.name + '.log'), ROOT)}")
+                    progress = True
+
+            if not running:
+                break   # plus rien de lançable
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                stage, seasons = running.pop(fut)
+                used_cpus -= stage.cpus
+                used_mem  -= stage.mem_gb
+                ok, seconds = fut.result()
+                if ok:
+                    record(stage, seasons, seconds, state, hasher)
+                    status[stage.name] = "ok"
+                    print(f"✅ {stage.name:<20} {seconds:.1f} s")
+                else:
+                    status[stage.name] = "échec"
+                    print(f"❌ {stage.name:<20} {seconds:.1f} s\n{log_tail(stage)}")
+            save_state(state)
+    return status
+
+
+def main(args):
+    state  = load_state()
+    hasher = Hasher(state["hashes"])
+    stages = closure(args.targets or [s.name for s in STAGES])
+    forced = set(args.targets or BY_NAME) if args.force else set()
+    t0 = time.perf_counter()
+
+    if args.dry_run:
+        dry_run(stages, state, hasher, forced)
+        save_state(state)   # seuls les hashes mis en cache changent
+        return
+
+    status = schedule(stages, state, hasher, forced, args.workers, args.cpus, args.mem_gb)
+    save_state(state)
+    failed = [n for n, st in status.items() if st in ("échec", "bloquée")]
+    print(f"\n⏱️  {time.perf_counter() - t0:.1f} s — "
+          + ", ".join(f"{sum(st == k for st in status.values())} {k}" for k in ("ok", "à jour", "échec", "bloquée")))
+    if failed:
+        raise SystemExit(f"❌ Étapes non terminées : {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Pipeline joueurs mémoïsé par empreinte de contenu")
+    p.add_argument("targets", nargs="*", help=f"Étapes cibles (défaut : toutes) parmi {', '.join(BY_NAME)}")
+    p.add_argument("--dry-run", action="store_true", help="Affiche ce qui serait reconstruit, sans rien lancer")
+    p.add_argument("--force", action="store_true",
+                   help="Reconstruit les cibles (toutes si aucune) malgré leur empreinte")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                   help="Étapes lancées simultanément au plus")
+    p.add_argument("--cpus", type=int, default=os.cpu_count() or 1, help="Budget de cœurs")
+    p.add_argument("--mem-gb", type=float, default=default_mem_gb(), help="Budget mémoire (Go)")
+    main(p.parse_args())
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+polars_backend.py
+-----------------
+Backend optionnel (`--backend polars`) de la curation joueurs : les mêmes
+tables que le chemin pandas, construites en requêtes Polars `LazyFrame`.
+  · scans Parquet lazy : projection et filtre de saisons poussés au scan
+    (partitions season=… élaguées)
+  · un plan par saison, exécutés ensemble par `pl.collect_all`
+    (multi-thread, sous-plans communs mutualisés)
+  · aucun DataFrame intermédiaire matérialisé avant la collecte
+
+Utilisé par prepare_curated, feature_engineering, compute_rating_all,
+curate_players et build_dataset_ml ; les tables sont rendues en pandas pour
+l'écriture commune (compact + parquet_io), les formules sont celles des
+modules pandas (gamelog_aggregates, compute_rating_all.TO_Z/WEIGHTS…).
+
+Polars (>= 1.0) est optionnel : `pip install polars` pour ce backend.
+
+Contrôle de parité (sans écriture) entre les deux chemins :
+    python nba_rating/scripts/polars_backend.py --parity
+"""
+import argparse
+import sys
+from functools import reduce
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import polars as pl
+except ImportError:   # backend optionnel
+    pl = None
+
+from gamelog_store import dataset_dir, gamelog_seasons
+from gamelog_aggregates import KEYS, SUM_COLUMNS, BASE_STATS, ADVANCED_FEATURES, PER36
+from column_contracts import SEASON_FEATURES, available
+
+BACKENDS = ("pandas", "polars")
+
+
+def add_backend_argument(p: argparse.ArgumentParser):
+    p.add_argument("--backend", choices=BACKENDS, default="pandas",
+                   help="Moteur de calcul : pandas (défaut) ou polars (lazy, multi-thread)")
+
+
+def _require():
+    if pl is None:
+        raise SystemExit("❌ --backend polars : module polars absent (pip install polars)")
+
+
+def _ratio(num, den):
+    return pl.when(den != 0).then(num / den).otherwise(None)
+
+
+# ────────────────────────────────
+#  Agrégats joueur/saison (gamelog_aggregates.aggregate_player_seasons)
+# ────────────────────────────────
+def scan_player_gamelogs(seasons) -> "pl.LazyFrame":
+    _require()
+    pattern = str(dataset_dir("P") / "season=*" / "part-0.parquet")
+    return (
+        pl.scan_parquet(pattern, hive_partitioning=True)
+          .filter(pl.col("season").cast(pl.String).is_in(list(seasons)))
+          .with_columns(pl.col("season").cast(pl.String),
+                        pl.col("PLAYER_ID", "TEAM_ID").cast(pl.Int64))
+    )
+
+
+def player_season_aggregates(seasons) -> "pl.LazyFrame":
+    """KEYS + BASE_STATS + TEAM_ID + ADVANCED_FEATURES, trié par KEYS."""
+    gl = scan_player_gamelogs(seasons)
+    t = gl.group_by(KEYS).agg(
+        *[pl.col(c).cast(pl.Float64).sum() for c in SUM_COLUMNS],
+        pl.len().cast(pl.Int64).alias("gp"),
+    )
+    # équipe principale ; à égalité, le plus petit TEAM_ID (comme le chemin pandas)
+    main_team = (
+        gl.group_by([*KEYS, "TEAM_ID"]).agg(pl.len().alias("cnt"))
+          .sort(["cnt", "TEAM_ID"], descending=[True, False])
+          .unique(subset=KEYS, keep="first", maintain_order=True)
+          .select([*KEYS, "TEAM_ID"])
+    )
+    c, gp = pl.col, pl.col("gp")
+    poss = c("FGA") + 0.44 * c("FTA") + c("TOV")
+    return (
+        t.join(main_team, on=KEYS, how="left")
+         .select(
+            *KEYS,
+            (c("PTS") / gp).alias("pts_mean"),
+            (c("REB") / gp).alias("reb_mean"),
+            (c("AST") / gp).alias("ast_mean"),
+            (c("PLUS_MINUS") / gp).alias("plus_minus_mean"),
+            gp,
+            (c("MIN") / gp).alias("min_per_game"),
+            c("TEAM_ID"),
+            _ratio(c("FGM") + 0.5 * c("FG3M"), c("FGA")).alias("efg_pct"),
+            _ratio(c("PTS"), 2 * (c("FGA") + 0.44 * c("FTA"))).alias("ts_pct"),
+            _ratio(c("FGM") - c("FG3M"), c("FGA") - c("FG3A")).alias("fg2_pct"),
+            _ratio(c("FG3M"), c("FG3A")).alias("fg3_pct"),
+            _ratio(c("FTM"), c("FTA")).alias("ft_pct"),
+            (c("STL") / gp).alias("stl_mean"),
+            (c("BLK") / gp).alias("blk_mean"),
+            (c("TOV") / gp).alias("tov_mean"),
+            _ratio(c("AST"), c("TOV")).alias("ast_tov_ratio"),
+            _ratio(poss, c("MIN") / 48).alias("usage_rate"),
+            *[_ratio(c(col) * 36, c("MIN")).alias(name) for col, name in PER36.items()],
+         )
+         .sort(KEYS)
+    )
+
+
+def aggregate_player_seasons(seasons) -> pd.DataFrame:
+    return player_season_aggregates(seasons).collect().to_pandas()
+
+
+# ────────────────────────────────
+#  Tables curées (prepare_curated / compute_rating_all / curate_players)
+# ────────────────────────────────
+def _scan(path: Path, keys=("PLAYER_ID", "TEAM_ID")) -> "pl.LazyFrame":
+    lf = pl.scan_parquet(str(path))
+    names = pl.read_parquet_schema(str(path))
+    return lf.with_columns([pl.col(k).cast(pl.Int64) for k in keys if k in names])
+
+
+def base_features(agg: "pl.LazyFrame", season: str, raw: Path) -> "pl.LazyFrame":
+    """prepare_curated.base_features pour une saison (sans colonne season)."""
+    rows = agg.filter(pl.col("season") == season)
+    phys_path = raw / f"player_phys_{season}.parquet"
+    names = pl.read_parquet_schema(str(phys_path))
+    rename = {k: v for k, v in {"AGE": "age", "EXP": "exp"}.items() if k in names}
+    keep = ["PLAYER_ID", "POSITION", "height_cm", "weight_kg", "bmi", "age", "exp"]
+    renamed = [rename.get(n, n) for n in names]
+    phys = _scan(phys_path).rename(rename).select([k for k in keep if k in renamed])
+
+    return (
+        rows.select(["PLAYER_ID", *BASE_STATS])
+            .join(phys, on="PLAYER_ID", how="left")
+            .join(_scan(raw / f"player_esv_{season}.parquet"), on="PLAYER_ID", how="left")
+            .join(rows.select(["PLAYER_ID", "TEAM_ID"]), on="PLAYER_ID", how="left")
+            .join(_scan(raw / f"team_pace_{season}.parquet"), on="TEAM_ID", how="left")
+    )
+
+
+def score_season(lf: "pl.LazyFrame", season: str) -> "pl.LazyFrame":
+    """compute_rating_all.score_season : imputation, z-scores (ddof=0), score_100."""
+    from compute_rating_all import TO_Z, WEIGHTS
+
+    lf = lf.with_columns((pl.col("gp").cast(pl.Float64, strict=False) / 82).alias("avail"))
+    num = {c: pl.col(c).cast(pl.Float64, strict=False).fill_nan(None) for c in TO_Z}
+    lf = lf.with_columns([e.fill_null(e.mean()).alias(c) for c, e in num.items()])
+    z = {c: (pl.col(c) - pl.col(c).mean()) / pl.col(c).std(ddof=0) for c in TO_Z}
+    note = reduce(lambda a, b: a + b, [z[f] * w for f, w in WEIGHTS.items()])
+    score = 100 * (note - note.min()) / (note.max() - note.min())
+    return lf.with_columns(score.alias("score_100"), pl.lit(season).alias("season"))
+
+
+def base_tables(seasons, raw: Path) -> dict[str, pd.DataFrame]:
+    """Sorties de prepare_curated, par saison."""
+    agg = player_season_aggregates(seasons)
+    plans = [base_features(agg, s, raw) for s in seasons]
+    return {s: df.to_pandas() for s, df in zip(seasons, pl.collect_all(plans))}
+
+
+def curated_tables(seasons, raw: Path) -> dict[str, pd.DataFrame]:
+    """Sorties de curate_players (base + avancé + score), par saison."""
+    agg = player_season_aggregates(seasons)
+    plans = [
+        score_season(
+            base_features(agg, s, raw).join(
+                agg.filter(pl.col("season") == s).select(["PLAYER_ID", *ADVANCED_FEATURES]),
+                on="PLAYER_ID", how="left"),
+            s)
+        for s in seasons
+    ]
+    return {s: df.to_pandas() for s, df in zip(seasons, pl.collect_all(plans))}
+
+
+def scored_tables(paths: dict[str, Path]) -> dict[str, pd.DataFrame]:
+    """Sorties de compute_rating_all (player_season_* + score_100), par saison."""
+    _require()
+    plans = [score_season(pl.scan_parquet(str(p)), s) for s, p in paths.items()]
+    return {s: df.to_pandas() for s, df in zip(paths, pl.collect_all(plans))}
+
+
+# ────────────────────────────────
+#  Dataset ML (build_dataset_ml.build)
+# ────────────────────────────────
+def build_dataset() -> pd.DataFrame:
+    _require()
+    from build_dataset_ml import CURATED, SEASONS, SCORES_IN, CL_IN, FEATURES_USED, _strip_suffix
+
+    keys = ["PLAYER_ID", "season"]
+    scores = _scan(SCORES_IN).select([*keys, "score_100"])
+
+    parts = []
+    for season in SEASONS:
+        path = CURATED / f"player_season_{season}.parquet"
+        if not path.exists():
+            continue
+        # première colonne par nom une fois les suffixes _x/_y retirés
+        cols = {}
+        for col in available(path, SEASON_FEATURES, _strip_suffix):
+            cols.setdefault(_strip_suffix(col), col)
+        parts.append(
+            _scan(path).select([pl.col(c).alias(n) for n, c in cols.items()])
+                       .with_columns(pl.lit(season).alias("season"))
+        )
+    if not parts:
+        raise RuntimeError("Aucun fichier player_season_*.parquet trouvé")
+    features = pl.concat(parts, how="diagonal_relaxed")
+
+    df = scores.join(features, on=keys, how="left")
+    names = df.collect_schema().names()
+    if "gp" in names:
+        df = df.with_columns((pl.col("gp") / 82).alias("avail"))
+    df = (
+        df.sort(keys)
+          .with_columns(pl.col("score_100").alias("note_n"),
+                        pl.col("score_100").shift(-1).over("PLAYER_ID").alias("note_n1"))
+          .with_columns((pl.col("note_n1") - pl.col("note_n")).alias("delta_score"))
+    )
+    if "exp" in names:
+        df = df.with_columns(
+            pl.col("exp").cast(pl.Float64, strict=False).fill_nan(0).fill_null(0).cast(pl.Int64))
+    if CL_IN.exists():
+        cl = (
+            _scan(CL_IN).select([*keys, pl.col("player_cluster").alias("cluster")])
+                        .unique(subset=keys, keep="first", maintain_order=True)
+        )
+        df = df.join(cl, on=keys, how="left")
+    if gamelog_seasons("P"):
+        pattern = str(dataset_dir("P") / "season=*" / "part-0.parquet")
+        player_names = (
+            pl.scan_parquet(pattern, hive_partitioning=True)
+              .select(pl.col("PLAYER_ID").cast(pl.Int64),
+                      pl.col("PLAYER_NAME").cast(pl.String).alias("player_name"))
+              .unique(subset=["PLAYER_ID"], keep="first", maintain_order=True)
+        )
+        df = df.join(player_names, on="PLAYER_ID", how="left")
+
+    df = df.filter(pl.col("note_n1").is_not_null() & pl.col("note_n1").is_not_nan())
+    missing = [f for f in FEATURES_USED if f not in df.collect_schema().names()]
+    if missing:
+        raise KeyError(f"Features manquantes : {missing}")
+    return (
+        df.select(["PLAYER_ID", "season", "player_name", *FEATURES_USED,
+                   pl.col("note_n1").alias("target_note_n1")])
+          .collect()
+          .to_pandas()
+    )
+
+
+# ────────────────────────────────
+#  Parité pandas ↔ polars
+# ────────────────────────────────
+def _same(name: str, a: pd.DataFrame, b: pd.DataFrame, keys) -> bool:
+    """Mêmes colonnes (dans le même ordre), mêmes lignes, valeurs à rtol 1e-5 près."""
+    try:
+        assert list(a.columns) == list(b.columns), f"colonnes {list(a.columns)} ≠ {list(b.columns)}"
+        a = a.sort_values(keys, kind="stable").reset_index(drop=True)
+        b = b.sort_values(keys, kind="stable").reset_index(drop=True)
+        # dtypes (int32/Int64, float32/float64, category/str) : valeurs seules
+        a = a.astype({c: "object" for c in a.columns if not pd.api.types.is_numeric_dtype(a[c])})
+        b = b.astype({c: "object" for c in b.columns if not pd.api.types.is_numeric_dtype(b[c])})
+        pd.testing.assert_frame_equal(a, b, check_dtype=False, check_exact=False, rtol=1e-5)
+    except AssertionError as e:
+        print(f"❌ {name} : {str(e).splitlines()[0]}")
+        return False
+    print(f"✅ {name} : {len(a)} lignes × {a.shape[1]} colonnes identiques")
+    return True
+
+
+def parity() -> bool:
+    """Compare les deux backends étape par étape, en mémoire (aucune écriture)."""
+    import gamelog_aggregates
+    import prepare_curated
+    import compute_rating_all
+    import curate_players
+    import build_dataset_ml
+    from gamelog_store import scan_gamelogs
+
+    def pandas_agg(seasons):
+        return gamelog_aggregates.aggregate_player_seasons(
+            scan_gamelogs("P", columns=gamelog_aggregates.GAMELOG_COLUMNS, seasons=seasons))
+
+    seasons = [s for s in prepare_curated.SEASONS if s in set(gamelog_seasons("P"))]
+    raw = compute_rating_all.BASE / "data" / "raw"
+    ok = True
+
+    pd_agg = pandas_agg(seasons)
+    ok &= _same("agrégats gamelog", pd_agg, aggregate_player_seasons(seasons), KEYS)
+
+    # feature_engineering : agrégat sur toutes les partitions présentes, features avancées
+    fe_cols = [*KEYS, *ADVANCED_FEATURES]
+    all_seasons = gamelog_seasons("P")
+    ok &= _same("feature_engineering", pandas_agg(all_seasons)[fe_cols],
+                aggregate_player_seasons(all_seasons)[fe_cols], KEYS)
+
+    pl_base = base_tables(seasons, raw)
+    pl_curated = curated_tables(seasons, raw)
+    for season, rows in pd_agg.groupby("season", sort=True):
+        ok &= _same(f"prepare_curated {season}",
+                    prepare_curated.base_features(rows, season, raw=raw), pl_base[season], ["PLAYER_ID"])
+        ok &= _same(f"curate_players {season}",
+                    curate_players.curated_table(rows, season), pl_curated[season], ["PLAYER_ID"])
+
+    paths = {s: compute_rating_all.CURATED / f"player_season_{s}.parquet" for s in seasons}
+    paths = {s: p for s, p in paths.items() if p.exists()}
+    pl_scored = scored_tables(paths)
+    for season, path in paths.items():
+        ok &= _same(f"compute_rating {season}",
+                    compute_rating_all.score_season(pd.read_parquet(path), season),
+                    pl_scored[season], ["PLAYER_ID"])
+
+    if build_dataset_ml.SCORES_IN.exists():
+        ok &= _same("build_dataset_ml", build_dataset_ml.build(), build_dataset(), ["PLAYER_ID", "season"])
+    return ok
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Backend Polars : contrôle de parité avec pandas")
+    p.add_argument("--parity", action="store_true", help="Compare pandas et polars sur les données locales")
+    args = p.parse_args()
+    _require()
+    if not args.parity:
+        p.print_help()
+        sys.exit(0)
+    sys.exit(0 if parity() else 1)
@@ -6,6 +6,7 @@ import joblib
 import pandas as pd
 import numpy as np
 from pathlib import Path
+from parquet_io import write_parquet
 
 def load_model(model_path):
     return joblib.load(model_path)
@@ -82,7 +83,7 @@ def main(args):
 #    # Sauvegarde par défaut vers projections.parquet
     output_path = args.output or (Path(__file__).resolve().parents[1] / "data" / "curated" / "projections.parquet")
     output_path.parent.mkdir(exist_ok=True, parents=True)
-    out.to_parquet(output_path, index=False)
+    write_parquet(out, output_path, sort_by=["PLAYER_NAME", "horizon"])
     print(f"→ Projections sauvegardées dans {output_path}")
 
 if __name__ == "__main__":
@@ -4,37 +4,44 @@
 """
 prepare_curated.py
 -------------------
-Pour chaque saison :
-1. Lit les raw (boxscores, phys)
-2. Agrège match→joueur/saison
+1. Lit le dataset player_gamelog (toutes saisons en un scan)
+2. Agrège match→joueur/saison (noyau commun gamelog_aggregates.py)
+Puis pour chaque saison :
 3. Fusionne mensurations + POSITION + exp
 4. Ajoute min_per_game
 5. Joint esv_mean et pace
 6. Sauvegarde en curated
+
+`base_features` est aussi appelée par curate_players.py (étape fusionnée).
+`--jobs N` répartit les saisons sur N processus (season_pool.py) ;
+`--backend polars` calcule toutes les saisons en requêtes lazy (polars_backend.py).
 """
+import argparse
 import pandas as pd
 from pathlib import Path
+from gamelog_store import gamelog_seasons, scan_gamelogs
+from gamelog_aggregates import GAMELOG_COLUMNS, BASE_STATS, aggregate_player_seasons
+from compact_schema import compact
+from parquet_io import write_parquet
+from season_pool import add_jobs_argument, map_seasons
+from polars_backend import add_backend_argument
 
 RAW     = Path("nba_rating/data/raw")
 CURATED = Path("nba_rating/data/curated")
-CURATED.mkdir(parents=True, exist_ok=True)
 SEASONS = [f"{y}-{str(y+1)[-2:]}" for y in range(1999, 2024)]
 
-for season in SEASONS:
-    gl = pd.read_parquet(RAW/f"player_gamelog_{season}.parquet")
-    phys = pd.read_parquet(RAW/f"player_phys_{season}.parquet")
-    esv  = pd.read_parquet(RAW/f"player_esv_{season}.parquet")
-    pace = pd.read_parquet(RAW/f"team_pace_{season}.parquet")
+
+def base_features(agg: pd.DataFrame, season: str, raw: Path = RAW) -> pd.DataFrame:
+    """
+    Stats de base joueur/saison + phys, esv_mean et pace.
+    `agg` : lignes de la saison issues de aggregate_player_seasons.
+    """
+    phys = pd.read_parquet(raw/f"player_phys_{season}.parquet")
+    esv  = pd.read_parquet(raw/f"player_esv_{season}.parquet")
+    pace = pd.read_parquet(raw/f"team_pace_{season}.parquet")
 
     # 1) stats de base
-    stats = gl.groupby("PLAYER_ID").agg(
-        pts_mean        = ("PTS","mean"),
-        reb_mean        = ("REB","mean"),
-        ast_mean        = ("AST","mean"),
-        plus_minus_mean = ("PLUS_MINUS","mean"),
-        gp               = ("GAME_ID","nunique"),
-        min_per_game    = ("MIN","mean")
-    ).reset_index()
+    stats = agg[["PLAYER_ID", *BASE_STATS]]
 
     # 2) phys + poste + exp
     phys = phys.rename(columns={"AGE":"age","EXP":"exp"})
@@ -46,17 +53,43 @@ for season in SEASONS:
     # 3) esv_mean
     df = df.merge(esv, on="PLAYER_ID", how="left")
 
-    # 4) pace
-    main_tm = gl.groupby(["PLAYER_ID","TEAM_ID"]).size()\
-                .reset_index(name="cnt")\
-                .sort_values("cnt",ascending=False)\
-                .drop_duplicates("PLAYER_ID")
-    df = df.merge(main_tm[["PLAYER_ID","TEAM_ID"]], on="PLAYER_ID", how="left")
+    # 4) pace (équipe principale de la saison)
+    df = df.merge(agg[["PLAYER_ID","TEAM_ID"]], on="PLAYER_ID", how="left")
     df = df.merge(pace, on="TEAM_ID", how="left")
 
     # 5) vérifications
     for c in ["pts_mean","reb_mean","ast_mean","plus_minus_mean","gp"]:
         assert c in df.columns
+    return df
+
+
+def write_table(df: pd.DataFrame, season: str) -> int:
+    write_parquet(compact(df, categories=False), CURATED/f"player_season_{season}.parquet", sort_by=["PLAYER_ID"])
+    return len(df)
+
+
+def write_season(rows: pd.DataFrame, season: str) -> int:
+    return write_table(base_features(rows, season), season)
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Tables curées joueur/saison (stats de base)")
+    add_jobs_argument(p)
+    add_backend_argument(p)
+    args = p.parse_args()
 
-    df.to_parquet(CURATED/f"player_season_{season}.parquet", index=False)
-    print(f"✅ {season} → {len(df)} joueurs")
+    CURATED.mkdir(parents=True, exist_ok=True)
+    if args.backend == "polars":
+        # une requête lazy multi-thread pour toutes les saisons, écritures ensuite
+        from polars_backend import base_tables
+        present = set(gamelog_seasons("P"))
+        tables  = base_tables([s for s in SEASONS if s in present], RAW)
+        results, failed = map_seasons(write_table, [(s, (df, s)) for s, df in tables.items()])
+    else:
+        agg = aggregate_player_seasons(scan_gamelogs("P", columns=GAMELOG_COLUMNS, seasons=SEASONS))
+        tasks = [(season, (rows, season)) for season, rows in agg.groupby("season", sort=True)]
+        results, failed = map_seasons(write_season, tasks, args.jobs)
+    for season, n in results.items():
+        print(f"✅ {season} → {n} joueurs")
+    if failed:
+        raise SystemExit(f"❌ Saisons en échec : {', '.join(failed)}")
@@ -3,27 +3,33 @@
 """
 rassemble_gamelogs.py
 ----------------------
-Concatène tous les raw/player_gamelog_*.parquet en un seul fichier
-nba_rating/data/curated/all_player_gamelogs.parquet pour usage ultérieur.
+Rassemble les gamelogs joueurs et équipes dans les datasets partitionnés par
+saison du store raw (raw/player_gamelog/season=…/, raw/team_gamelog/season=…/) :
+  · les anciens fichiers plats raw/*_gamelog_{season}.parquet sont déplacés
+    (sans copie) dans leur partition
+  · l'ancienne copie concaténée curated/all_player_gamelogs.parquet est
+    supprimée : les lecteurs scannent directement le dataset
 """
 
-import pandas as pd
 from pathlib import Path
 
-RAW      = Path(__file__).resolve().parents[1] / "data" / "raw"
-OUT      = Path(__file__).resolve().parents[1] / "data" / "curated" / "all_player_gamelogs.parquet"
+from gamelog_store import PREFIX, gamelog_dataset, gamelog_seasons, migrate_legacy
 
-# 1) Liste et chargement
-files = sorted(RAW.glob("player_gamelog_*.parquet"))
-if not files:
-    raise RuntimeError(f"Aucun fichier raw/player_gamelog_*.parquet dans {RAW}")
+LEGACY_OUT = Path(__file__).resolve().parents[1] / "data" / "curated" / "all_player_gamelogs.parquet"
 
-dfs = []
-for f in files:
-    print(f"🔄 Chargement de {f.name}")
-    dfs.append(pd.read_parquet(f))
-all_logs = pd.concat(dfs, ignore_index=True)
+for kind, name in PREFIX.items():
+    moved = migrate_legacy(kind)
+    if moved:
+        print(f"🔄 {name} : {len(moved)} saisons migrées ({moved[0]} → {moved[-1]})")
+    seasons = gamelog_seasons(kind)
+    if not seasons:
+        if kind == "P":
+            raise RuntimeError(f"Aucune partition {name}/season=* dans le store raw")
+        continue
+    # nombre de lignes lu dans les métadonnées parquet, sans charger les données
+    rows = sum(f.count_rows() for f in gamelog_dataset(kind).get_fragments())
+    print(f"✅ Dataset {name} : {len(seasons)} saisons, {rows} lignes")
 
-# 2) Écriture
-all_logs.to_parquet(OUT, index=False)
-print(f"✅ Fichier unifié écrit : {OUT} ({len(all_logs)} lignes)")
+if LEGACY_OUT.exists():
+    LEGACY_OUT.unlink()
+    print(f"🗑️  Copie concaténée supprimée : {LEGACY_OUT.name}")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+season_pool.py
+--------------
+Répartition du travail par saison sur un pool de processus (`--jobs N`),
+pour les étapes dont les saisons sont indépendantes : fix_phys,
+prepare_curated, feature_engineering, compute_rating_all, curate_players.
+
+  · jobs ≤ 1 : exécution séquentielle dans le processus courant
+  · les résultats sont rendus dans l'ordre des saisons demandées, quel que
+    soit l'ordre de fin des processus (sorties déterministes)
+  · une saison en erreur est signalée (❌ saison : exception) sans
+    interrompre les autres ; les scripts décident ensuite du code de sortie
+
+La fonction appliquée doit être définie au niveau module (picklable).
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def add_jobs_argument(p: argparse.ArgumentParser):
+    p.add_argument("--jobs", type=int, default=1,
+                   help=f"Processus en parallèle sur les saisons (1 = séquentiel, cœurs : {os.cpu_count()})")
+
+
+def map_seasons(fn, tasks, jobs: int = 1):
+    """
+    `tasks` : liste de (saison, args) ; appelle fn(*args) pour chacune.
+    Renvoie ({saison: résultat} dans l'ordre de `tasks`, [saisons en échec]).
+    """
+    results, failed = {}, []
+
+    def collect(season, get):
+        try:
+            results[season] = get()
+        except Exception as e:
+            print(f"❌ {season} : {type(e).__name__}: {e}")
+            failed.append(season)
+
+    if jobs <= 1 or len(tasks) <= 1:
+        for season, args in tasks:
+            collect(season, lambda: fn(*args))
+        return results, failed
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+        futures = [(season, pool.submit(fn, *args)) for season, args in tasks]
+        for season, fut in futures:
+            collect(season, fut.result)
+    return results, failed
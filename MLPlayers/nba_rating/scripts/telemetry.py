@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+telemetry.py
+------------
+Télémétrie des collecteurs : chaque requête passant par la session partagée
+(nba_client.py) est enregistrée avec son endpoint, sa saison, sa latence,
+son attente de throttling, sa taille et son origine (réseau / cache) ;
+les collecteurs y ajoutent le nombre de lignes et les retries.
+
+`TELEMETRY.report(dossier, nom)` écrit en fin de run :
+  · {nom}_{horodatage}.parquet : un événement par requête
+  · {nom}_{horodatage}.json    : synthèse par endpoint et par (endpoint, saison),
+    histogrammes de latence inclus
+et affiche un résumé console par endpoint.
+"""
+import json
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+from parquet_io import write_parquet
+
+LATENCY_BUCKETS = [0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60]   # bornes hautes (s)
+
+
+def endpoint_of(url: str) -> str:
+    return urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1].lower()
+
+
+class Telemetry:
+    def __init__(self):
+        self.lock    = threading.Lock()
+        self.events  = []
+        self.rows    = defaultdict(int)   # (endpoint, season) → lignes
+        self.retries = defaultdict(int)   # (endpoint, season) → retries
+        self.started = time.time()
+
+    def request(self, url: str, params, elapsed: float, resp=None,
+                wait_s: float = 0.0, from_cache: bool = False, error: str | None = None):
+        event = {
+            "ts":         time.time(),
+            "endpoint":   endpoint_of(url),
+            "season":     dict(params or {}).get("Season", "-"),
+            "status":     getattr(resp, "status_code", None),
+            "bytes":      len(resp.content) if resp is not None else 0,
+            "latency_s":  max(0.0, elapsed - wait_s),
+            "wait_s":     wait_s,
+            "from_cache": from_cache,
+            "error":      error,
+        }
+        with self.lock:
+            self.events.append(event)
+
+    def add_rows(self, endpoint: str, season: str, n: int):
+        with self.lock:
+            self.rows[(endpoint, season)] += n
+
+    def add_retry(self, endpoint: str, season: str):
+        with self.lock:
+            self.retries[(endpoint, season)] += 1
+
+    # ────────────────────────────────
+    #  Rapport
+    # ────────────────────────────────
+    def frame(self) -> pd.DataFrame:
+        with self.lock:
+            return pd.DataFrame(self.events, columns=[
+                "ts", "endpoint", "season", "status", "bytes",
+                "latency_s", "wait_s", "from_cache", "error",
+            ])
+
+    def _summary(self, ev: pd.DataFrame, keys: list[str]) -> list[dict]:
+        out = []
+        counters = {"rows": self.rows, "retries": self.retries}
+        for key, g in ev.groupby(keys, sort=True):
+            key = key if isinstance(key, tuple) else (key,)
+            net = g[~g["from_cache"]]
+            hist = pd.cut(net["latency_s"], [0] + LATENCY_BUCKETS + [float("inf")],
+                          include_lowest=True).value_counts(sort=False)
+            item = dict(zip(keys, key))
+            item.update(
+                requests    = int(len(g)),
+                cache_hits  = int(g["from_cache"].sum()),
+                errors      = int(g["error"].notna().sum()),
+                throttled   = int(g["status"].isin([429, 503]).sum()),
+                bytes       = int(g["bytes"].sum()),
+                wait_s      = round(float(g["wait_s"].sum()), 3),
+                latency_p50 = round(float(net["latency_s"].quantile(0.5)), 3) if len(net) else None,
+                latency_p95 = round(float(net["latency_s"].quantile(0.95)), 3) if len(net) else None,
+                latency_max = round(float(net["latency_s"].max()), 3) if len(net) else None,
+                latency_hist = {str(b): int(n) for b, n in hist.items()},
+            )
+            for name, counter in counters.items():
+                item[name] = sum(v for (e, s), v in counter.items()
+                                 if e == item["endpoint"] and s == item.get("season", s))
+            out.append(item)
+        return out
+
+    def report(self, out_dir: Path, name: str, extra: dict | None = None) -> dict:
+        ev = self.frame()
+        elapsed = time.time() - self.started
+        report = {
+            "run":         name,
+            "started_at":  datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+            "elapsed_s":   round(elapsed, 1),
+            "requests":    int(len(ev)),
+            "throughput_rps": round(len(ev) / elapsed, 3) if elapsed else None,
+            "by_endpoint": self._summary(ev, ["endpoint"]) if len(ev) else [],
+            "by_endpoint_season": self._summary(ev, ["endpoint", "season"]) if len(ev) else [],
+            **(extra or {}),
+        }
+
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{name}_{datetime.fromtimestamp(self.started):%Y%m%d_%H%M%S}"
+        write_parquet(ev, out_dir / f"{stem}.parquet", sort_by=["ts"])
+        (out_dir / f"{stem}.json").write_text(json.dumps(report, indent=1, default=str))
+
+        print(f"\n📊 Télémétrie {name} : {report['requests']} requêtes en {report['elapsed_s']} s "
+              f"({report['throughput_rps']} req/s)")
+        for e in report["by_endpoint"]:
+            print(f"   · {e['endpoint']:<22} {e['requests']:>5} req "
+                  f"({e['cache_hits']} cache) · p50 {e['latency_p50']} s · p95 {e['latency_p95']} s · "
+                  f"{e['bytes']/1e6:.1f} Mo · {e['rows']} lignes · {e['retries']} retries · "
+                  f"{e['throttled']} throttlés · attente {e['wait_s']} s")
+        print(f"   → {out_dir / stem}.json / .parquet")
+        return report
+
+
+TELEMETRY = Telemetry()
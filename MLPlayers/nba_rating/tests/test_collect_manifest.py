@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Reprise (`--resume`) du manifest de collecte : les fichiers raw écrits avant
+le manifest sont adoptés, seuls les fichiers illisibles ou vides sont recollectés.
+
+    python -m pytest MLPlayers/nba_rating/tests
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from collect_manifest import CollectManifest, file_sha256  # noqa: E402
+from parquet_io import write_parquet                        # noqa: E402
+
+SEASON = "2019-20"
+
+
+@pytest.fixture
+def raw(tmp_path):
+    calls = []
+
+    def collect(season):
+        calls.append(season)
+        write_parquet(pd.DataFrame({"PLAYER_ID": [1, 2, 3]}), tmp_path / f"phys_{season}.parquet")
+
+    manifest = CollectManifest(tmp_path / "_manifest.json")
+    tracked = manifest.tracked("player_phys", lambda s: tmp_path / f"phys_{s}.parquet", resume=True)
+    return tmp_path, manifest, tracked(collect), calls
+
+
+def test_resume_adopts_file_written_before_manifest(raw):
+    root, manifest, collect, calls = raw
+    path = root / f"phys_{SEASON}.parquet"
+    write_parquet(pd.DataFrame({"PLAYER_ID": range(5)}), path)
+    sha = file_sha256(path)
+
+    collect(SEASON)
+
+    assert calls == []                       # pas de recollecte
+    assert path.exists() and file_sha256(path) == sha
+    entry = manifest.get(SEASON, "player_phys")
+    assert (entry["status"], entry["rows"], entry["sha256"]) == ("done", 5, sha)
+    assert CollectManifest(root / "_manifest.json").is_done(SEASON, "player_phys", path)
+
+
+@pytest.mark.parametrize("content", [b"pas un parquet", None])
+def test_resume_refetches_unreadable_or_empty_file(raw, content):
+    root, manifest, collect, calls = raw
+    path = root / f"phys_{SEASON}.parquet"
+    if content is None:
+        write_parquet(pd.DataFrame({"PLAYER_ID": pd.Series([], dtype="int64")}), path)
+    else:
+        path.write_bytes(content)
+
+    collect(SEASON)
+
+    assert calls == [SEASON]
+    assert manifest.get(SEASON, "player_phys")["rows"] == 3
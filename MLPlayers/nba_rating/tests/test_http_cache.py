@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Fraîcheur du cache disque http_cache : une réponse collectée pendant une
+saison reste soumise au TTL court après la clôture, seule une collecte
+postérieure à la clôture est permanente.
+
+    python -m pytest MLPlayers/nba_rating/tests
+"""
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import http_cache                                    # noqa: E402
+from http_cache import CURRENT_SEASON_TTL_H, HTTPCache  # noqa: E402
+
+URL    = "https://stats.nba.com/stats/leaguegamelog"
+PARAMS = [("PlayerOrTeam", "P"), ("Season", "2023-24")]
+H      = 3600
+
+
+def _response(body: bytes) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.url = URL
+    resp._content = body
+    return resp
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Horloge de http_cache pilotée par le test."""
+    now = {"t": 0.0}
+    monkeypatch.setattr(http_cache.time, "time", lambda: now["t"])
+    return now
+
+
+def test_entry_fetched_in_season_expires_after_rollover(tmp_path, clock):
+    cache = HTTPCache(tmp_path, mode="on")
+
+    # collecte en cours de saison (mars 2024) : TTL court
+    clock["t"] = datetime(2024, 3, 1, 12).timestamp()
+    cache.store("GET", URL, PARAMS, _response(b"partiel"))
+    clock["t"] += (CURRENT_SEASON_TTL_H - 1) * H
+    assert cache.lookup("GET", URL, PARAMS).content == b"partiel"
+
+    # saison close (novembre 2024) : l'entrée partielle n'est pas devenue permanente
+    clock["t"] = datetime(2024, 11, 1).timestamp()
+    assert cache.lookup("GET", URL, PARAMS) is None
+
+    # recollectée après la clôture : permanente
+    cache.store("GET", URL, PARAMS, _response(b"definitif"))
+    clock["t"] = datetime(2030, 1, 1).timestamp()
+    assert cache.lookup("GET", URL, PARAMS).content == b"definitif"
+
+
+def test_ttl_hours_by_fetch_time():
+    closed = datetime(2024, 10, 1).timestamp()
+    assert http_cache.ttl_hours(URL, PARAMS, closed - 1) == CURRENT_SEASON_TTL_H
+    assert http_cache.ttl_hours(URL, PARAMS, closed) is None
+    # sans saison : TTL de l'endpoint
+    assert http_cache.ttl_hours("https://cdn.nba.com/logos/nba/1/logo.svg", None, closed) == 24 * 7
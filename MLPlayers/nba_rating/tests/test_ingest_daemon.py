@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Robustesse du service ingest_daemon : une reconstruction en erreur n'arrête
+pas le consommateur, et un consommateur mort est détecté par main au lieu
+de laisser le poller ou queue.join() bloqués.
+
+    python -m pytest MLPlayers/nba_rating/tests
+"""
+import asyncio
+import sys
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import ingest_daemon                  # noqa: E402
+from ingest_daemon import Batch       # noqa: E402
+
+ARGS = Namespace(season="2024-25", interval=1, offseason_interval=1, once=True)
+
+
+def test_consumer_survives_failed_rebuild(monkeypatch):
+    seen = []
+
+    async def rebuild(batches):
+        seen.append([b.rows for b in batches])
+        if len(seen) == 1:
+            raise RuntimeError("étape cassée")
+    monkeypatch.setattr(ingest_daemon, "rebuild", rebuild)
+
+    async def scenario():
+        queue = asyncio.Queue()
+        worker = asyncio.create_task(ingest_daemon.consumer(queue))
+        await queue.put(Batch("P", "2024-25", 1))
+        await asyncio.wait_for(queue.join(), 1)     # task_done malgré l'erreur
+        await queue.put(Batch("T", "2024-25", 2))
+        await asyncio.wait_for(queue.join(), 1)
+        assert not worker.done()
+        worker.cancel()
+
+    asyncio.run(scenario())
+    assert seen == [[1], [2]]
+
+
+@pytest.fixture
+def daemon(monkeypatch):
+    reports = []
+    monkeypatch.setattr(ingest_daemon, "install_session", lambda: None)
+    monkeypatch.setattr(ingest_daemon, "print_metrics", lambda: None)
+    monkeypatch.setattr(ingest_daemon, "write_report", lambda out, name: reports.append(name))
+    return reports
+
+
+def test_main_detects_dead_consumer(monkeypatch, daemon):
+    async def consumer(queue):
+        await queue.get()
+        raise SystemError("consommateur tué")
+
+    async def poller(season, queue, stop, interval, offseason_interval, once):
+        for rows in range(10):                      # > QUEUE_MAX : bloquerait sans consommateur
+            await queue.put(Batch("P", season, rows))
+    monkeypatch.setattr(ingest_daemon, "consumer", consumer)
+    monkeypatch.setattr(ingest_daemon, "poller", poller)
+
+    assert asyncio.run(asyncio.wait_for(ingest_daemon.main(ARGS), 2)) == 1
+    assert daemon == ["ingest_daemon"]
+
+
+def test_main_waits_for_pending_rebuilds(monkeypatch, daemon):
+    done = []
+
+    async def rebuild(batches):
+        await asyncio.sleep(0.05)
+        done.extend(b.rows for b in batches)
+
+    async def poller(season, queue, stop, interval, offseason_interval, once):
+        await queue.put(Batch("P", season, 3))
+    monkeypatch.setattr(ingest_daemon, "rebuild", rebuild)
+    monkeypatch.setattr(ingest_daemon, "poller", poller)
+
+    assert asyncio.run(ingest_daemon.main(ARGS)) == 0
+    assert done == [3]
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Matching de noms B-Ref ↔ nba_api : clés de blocking et fuzzy_match bloqué,
+comparé à un extractOne sur toute la liste. Sauté sans rapidfuzz.
+
+    python -m pytest MLPlayers/nba_rating/tests
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("rapidfuzz")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from rapidfuzz import fuzz, process, utils                               # noqa: E402
+from name_matching import (                                              # noqa: E402
+    SCORE_CUTOFF, block_keys, fuzzy_match, normalize, normalize_series)
+
+CHOICES = [normalize(n) for n in [
+    "Luka Dončić", "Nikola Jokić", "Nikola Vučević", "Shai Gilgeous-Alexander",
+    "Giannis Antetokounmpo", "Thanasis Antetokounmpo", "Jaren Jackson Jr.",
+    "Kelly Oubre Jr.", "Karl-Anthony Towns", "P.J. Tucker", "Gary Payton II",
+]]
+
+
+def test_normalize_series_matches_normalize():
+    names = pd.Series(["Luka Dončić", "Jaren Jackson Jr.", None, "Luka Dončić"])
+    assert normalize_series(names).tolist() == ["luka doncic", "jaren jackson", "", "luka doncic"]
+
+
+def test_block_keys():
+    keys = block_keys("karl anthony towns")
+    assert {"L:towns", "F:karl", "I:kat"} <= keys
+    assert {"G: to", "G:tow", "G:own", "G:wns", "G:ns "} <= keys
+    assert block_keys("") == set()
+    # faute de frappe dans le nom de famille : un trigramme commun suffit
+    assert block_keys("luka doncic") & block_keys("lukka donchic")
+    assert not block_keys("pj tucker") & block_keys("luka doncic")
+
+
+def test_fuzzy_match_synthetic_names():
+    queries = ["luka doncic", "nikola jokic", "shai gilgeous alexandr", "giannis antetokoumpo",
+               "thanasis antetokounmpo", "jaren jackson", "kelly oubre", "karl anthony town",
+               "pj tucker", "gary payton", "totals", "zzz qqq"]
+    got = fuzzy_match(queries, CHOICES + CHOICES[:3], with_scores=True)
+
+    assert got["giannis antetokoumpo"][0] == "giannis antetokounmpo"
+    assert got["thanasis antetokounmpo"] == ("thanasis antetokounmpo", 100.0)
+    assert got["shai gilgeous alexandr"][0] == "shai gilgeous alexander"
+    assert "totals" not in got and "zzz qqq" not in got
+    assert all(score >= SCORE_CUTOFF for _, score in got.values())
+
+    # même résultat qu'un extractOne contre toute la liste
+    for q in queries:
+        ref = process.extractOne(q, CHOICES, scorer=fuzz.WRatio, processor=utils.default_process,
+                                 score_cutoff=SCORE_CUTOFF)
+        assert (got[q][0] if q in got else None) == (ref[0] if ref else None), q
+
+
+def test_fuzzy_match_empty_inputs():
+    assert fuzzy_match([], CHOICES) == {}
+    assert fuzzy_match(["luka doncic"], []) == {}
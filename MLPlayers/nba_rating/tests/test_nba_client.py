@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Session partagée nba_client avec un vrai endpoint nba_api : seul le transport
+HTTP est remplacé (adapter requests factice), tout le reste — paramètres triés
+en liste par nba_api, cache disque, télémétrie — est le chemin réel.
+
+    python -m pytest MLPlayers/nba_rating/tests
+"""
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import nba_client                                  # noqa: E402
+from http_cache import HTTPCache                   # noqa: E402
+from nba_api.stats.endpoints import leaguegamelog  # noqa: E402
+from nba_api.stats.library.http import NBAStatsHTTP  # noqa: E402
+from telemetry import TELEMETRY                    # noqa: E402
+
+HEADERS = ["SEASON_ID", "PLAYER_ID", "PLAYER_NAME", "GAME_ID", "PTS"]
+PAYLOAD = {
+    "resource": "leaguegamelog",
+    "parameters": {},
+    "resultSets": [{"name": "LeagueGameLog", "headers": HEADERS,
+                    "rowSet": [["22022", 2544, "LeBron James", "0022200001", 31]]}],
+}
+
+
+class StubAdapter(BaseAdapter):
+    """Répond le même JSON à chaque requête et garde les URL reçues."""
+
+    def __init__(self):
+        super().__init__()
+        self.urls = []
+
+    def send(self, request, **kwargs):
+        self.urls.append(request.url)
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.url = request.url
+        resp.headers["Content-Type"] = "application/json"
+        resp.encoding = "utf-8"
+        resp._content = json.dumps(PAYLOAD).encode()
+        resp.request = request
+        return resp
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    monkeypatch.setattr(nba_client, "_SESSION", None)
+    monkeypatch.setattr(NBAStatsHTTP, "_session", None)
+    monkeypatch.setattr(TELEMETRY, "events", [])
+    sess = nba_client.install_session()
+    sess.cache = HTTPCache(tmp_path, mode="on")
+    stub = StubAdapter()
+    sess.mount("https://", stub)
+    sess.mount("http://", stub)
+    return sess, stub
+
+
+def test_endpoint_through_cached_session(session):
+    sess, stub = session
+    assert NBAStatsHTTP.get_session() is sess
+
+    first = leaguegamelog.LeagueGameLog(season="2022-23", player_or_team_abbreviation="P")
+    assert first.get_data_frames()[0]["PTS"].tolist() == [31]
+    assert len(stub.urls) == 1
+    assert "Season=2022-23" in stub.urls[0]
+
+    # saison terminée : servie depuis le cache, sans nouvel appel réseau
+    second = leaguegamelog.LeagueGameLog(season="2022-23", player_or_team_abbreviation="P")
+    assert second.get_data_frames()[0]["PLAYER_ID"].tolist() == [2544]
+    assert len(stub.urls) == 1
+
+    events = TELEMETRY.events
+    assert [e["from_cache"] for e in events] == [False, True]
+    assert {e["season"] for e in events} == {"2022-23"}
+    assert {e["endpoint"] for e in events} == {"leaguegamelog"}
+
+
+def test_concurrent_store_same_key(tmp_path):
+    """Threads écrivant la même clé : fichiers temporaires distincts, entrée finale lisible."""
+    cache = HTTPCache(tmp_path, mode="on")
+    url = "https://stats.nba.com/stats/leaguegamelog"
+    params = [("Season", "2022-23")]
+    resp = StubAdapter().send(requests.Request("GET", url, params=params).prepare())
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: cache.store("GET", url, params, resp), range(64)))
+
+    assert [p.name for p in tmp_path.rglob("*.tmp")] == []
+    assert cache.lookup("GET", url, params).json() == PAYLOAD
+
+
+def test_network_error_keeps_original_exception(session, monkeypatch):
+    sess, stub = session
+    sess.cache = HTTPCache(sess.cache.root, mode="off")
+
+    def refuse(request, **kwargs):
+        raise requests.ConnectionError("refusé")
+    monkeypatch.setattr(stub, "send", refuse)
+
+    with pytest.raises(requests.ConnectionError, match="refusé"):
+        leaguegamelog.LeagueGameLog(season="2021-22", player_or_team_abbreviation="T")
+    [event] = TELEMETRY.events
+    assert (event["season"], event["error"]) == ("2021-22", "ConnectionError")
+
+
+def test_telemetry_accepts_param_pairs(monkeypatch):
+    monkeypatch.setattr(TELEMETRY, "events", [])
+    TELEMETRY.request("https://stats.nba.com/stats/commonteamroster",
+                      [("LeagueID", "00"), ("Season", "2020-21")], 0.1, error="Timeout")
+    assert TELEMETRY.events[0]["season"] == "2020-21"
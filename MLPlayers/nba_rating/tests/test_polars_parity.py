@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Parité pandas ↔ polars (`--backend polars`) sur un gamelog synthétique :
+agrégats joueur/saison, features de base (prepare_curated) et score_100
+(compute_rating_all) doivent coïncider à RTOL près. Sauté sans polars.
+
+    python -m pytest MLPlayers/nba_rating/tests
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pl = pytest.importorskip("polars")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import gamelog_store                                            # noqa: E402
+import polars_backend                                           # noqa: E402
+from compact_schema import compact                              # noqa: E402
+from compute_rating_all import score_season                     # noqa: E402
+from gamelog_aggregates import (                                # noqa: E402
+    ADVANCED_FEATURES, GAMELOG_COLUMNS, KEYS, aggregate_player_seasons)
+from parquet_io import write_parquet                            # noqa: E402
+from prepare_curated import base_features                       # noqa: E402
+
+SEASONS = ["2021-22", "2022-23"]
+TEAMS   = [1610612737 + i for i in range(4)]
+PLAYERS = list(range(100, 124))
+TRADED  = PLAYERS[-1]          # change d'équipe à mi-saison, à égalité de matchs
+RTOL    = 1e-5
+
+
+def _gamelog(season: str, rng) -> pd.DataFrame:
+    rows = []
+    for g in range(16):
+        # TEAMS[0] reçoit les 8 premiers matchs, TEAMS[1] les 8 suivants : TRADED y joue tout
+        home = TEAMS[g >= 8]
+        away = int(rng.choice([t for t in TEAMS if t != home]))
+        for tid in (home, away):
+            roster = [p for i, p in enumerate(PLAYERS[:-1]) if TEAMS[i % 4] == tid]
+            if tid == home:
+                roster.append(TRADED)
+            for pid in roster:
+                fga = int(rng.integers(0, 18)); fgm = int(rng.integers(0, fga + 1))
+                fg3a = int(rng.integers(0, 7)); fg3m = min(int(rng.integers(0, fg3a + 1)), fgm)
+                fta = 0 if pid == PLAYERS[0] else int(rng.integers(0, 8))   # ft_pct indéfini
+                ftm = int(rng.integers(0, fta + 1))
+                oreb, dreb = int(rng.integers(0, 4)), int(rng.integers(0, 8))
+                rows.append(dict(
+                    PLAYER_ID=pid, PLAYER_NAME=f"Player {pid}", TEAM_ID=int(tid),
+                    GAME_ID=f"00{season[2:4]}{g:05d}", GAME_DATE=f"20{season[2:4]}-11-{g + 1:02d}",
+                    MIN=int(rng.integers(5, 40)), FGM=fgm, FGA=fga, FG3M=fg3m, FG3A=fg3a,
+                    FTM=ftm, FTA=fta, OREB=oreb, DREB=dreb, REB=oreb + dreb,
+                    AST=int(rng.integers(0, 9)), STL=int(rng.integers(0, 3)),
+                    BLK=int(rng.integers(0, 3)),
+                    TOV=0 if pid == PLAYERS[1] else int(rng.integers(0, 5)),   # ast_tov indéfini
+                    PTS=2 * (fgm - fg3m) + 3 * fg3m + ftm, PLUS_MINUS=int(rng.integers(-12, 13)),
+                ))
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture(scope="module")
+def raw(tmp_path_factory):
+    """Store gamelog partitionné + phys / esv / pace par saison, dans un répertoire temporaire."""
+    root = tmp_path_factory.mktemp("raw")
+    mp = pytest.MonkeyPatch()
+    mp.setattr(gamelog_store, "RAW_STORE", root)
+    rng = np.random.default_rng(0)
+    for season in SEASONS:
+        gl = compact(_gamelog(season, rng))
+        write_parquet(gl, gamelog_store.gamelog_path("P", season), sort_by=["PLAYER_ID", "GAME_DATE"])
+        write_parquet(compact(gamelog_store.derive_esv(gl)), root / f"player_esv_{season}.parquet")
+        pace = pd.DataFrame({"TEAM_ID": TEAMS, "pace": rng.normal(98, 3, len(TEAMS))})
+        write_parquet(compact(pace), root / f"team_pace_{season}.parquet")
+        # un joueur sans fiche phys : colonnes phys imputées par la moyenne
+        phys = pd.DataFrame({"PLAYER_ID": PLAYERS[:-2],
+                             "POSITION": rng.choice(["G", "F", "C"], len(PLAYERS) - 2)})
+        phys["height_cm"] = rng.normal(200, 8, len(phys))
+        phys["weight_kg"] = rng.normal(100, 10, len(phys))
+        phys["bmi"] = phys["weight_kg"] / (phys["height_cm"] / 100) ** 2
+        phys["age"] = rng.integers(19, 38, len(phys))
+        phys["exp"] = rng.integers(0, 15, len(phys)).astype(str)
+        write_parquet(compact(phys, categories=False), root / f"player_phys_{season}.parquet")
+    yield root
+    mp.undo()
+
+
+def assert_same(a: pd.DataFrame, b: pd.DataFrame, keys):
+    """Mêmes colonnes dans le même ordre, mêmes lignes, valeurs à RTOL près (dtypes ignorés)."""
+    assert list(a.columns) == list(b.columns)
+    a = a.sort_values(keys, kind="stable").reset_index(drop=True)
+    b = b.sort_values(keys, kind="stable").reset_index(drop=True)
+    a = a.astype({c: "object" for c in a.columns if not pd.api.types.is_numeric_dtype(a[c])})
+    b = b.astype({c: "object" for c in b.columns if not pd.api.types.is_numeric_dtype(b[c])})
+    pd.testing.assert_frame_equal(a, b, check_dtype=False, check_exact=False, rtol=RTOL)
+
+
+@pytest.fixture(scope="module")
+def aggregates(raw):
+    gl = gamelog_store.scan_gamelogs("P", columns=GAMELOG_COLUMNS, seasons=SEASONS)
+    return aggregate_player_seasons(gl), polars_backend.player_season_aggregates(SEASONS)
+
+
+def test_player_season_aggregates(aggregates):
+    pd_agg, pl_agg = aggregates
+    pl_df = pl_agg.collect().to_pandas()
+    assert len(pd_agg) == len(PLAYERS) * len(SEASONS)
+    assert_same(pd_agg, pl_df, KEYS)
+    traded = pl_df[pl_df["PLAYER_ID"] == TRADED]
+    assert (traded["TEAM_ID"] == TEAMS[0]).all()      # égalité : plus petit TEAM_ID
+
+
+@pytest.mark.parametrize("season", SEASONS)
+def test_base_features(raw, aggregates, season):
+    pd_agg, pl_agg = aggregates
+    rows = pd_agg[pd_agg["season"] == season]
+    assert_same(base_features(rows, season, raw=raw),
+                polars_backend.base_features(pl_agg, season, raw).collect().to_pandas(),
+                ["PLAYER_ID"])
+
+
+@pytest.mark.parametrize("season", SEASONS)
+def test_score_season(raw, aggregates, season):
+    pd_agg, pl_agg = aggregates
+    rows = pd_agg[pd_agg["season"] == season]
+    advanced = ["PLAYER_ID", *ADVANCED_FEATURES]
+
+    pd_df = base_features(rows, season, raw=raw).merge(rows[advanced], on="PLAYER_ID", how="left")
+    pl_lf = polars_backend.base_features(pl_agg, season, raw).join(
+        pl_agg.filter(pl.col("season") == season).select(advanced), on="PLAYER_ID", how="left")
+
+    pd_scored = score_season(pd_df, season)
+    pl_scored = polars_backend.score_season(pl_lf, season).collect().to_pandas()
+    assert pd_scored["score_100"].min() == 0 and np.isclose(pd_scored["score_100"].max(), 100)
+    assert_same(pd_scored, pl_scored, ["PLAYER_ID"])
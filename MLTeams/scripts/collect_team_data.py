@@ -6,59 +6,64 @@ collect_team_data.py
 --------------------
 Collecte les GameLogs NBA pour les équipes :
   · GameLog des équipes (T)
-  · Sauvegarde en Parquet dans data/raw/
+  · Sauvegarde en Parquet dans le store raw partagé avec MLPlayers
+    (dataset partitionné de gamelog_store.py :
+    MLPlayers/nba_rating/data/raw/team_gamelog/season={season}/part-0.parquet) :
+    la même partition sert au calcul du pace côté joueurs, elle n'est
+    téléchargée qu'une fois.
+Les requêtes passent par la session partagée (cache disque + débit adaptatif AIMD)
+de MLPlayers/nba_rating/scripts/nba_client.py.
 """
 
-import time
+import argparse
+import sys
 from pathlib import Path
 import pandas as pd
-from nba_api.stats.endpoints import LeagueGameLog
 
 # Définir le chemin de base
 BASE_DIR = Path(__file__).resolve().parents[1]
-DATA_DIR = BASE_DIR / "data"
-RAW_DIR = DATA_DIR / "raw"
+sys.path.insert(0, str(BASE_DIR.parent / "MLPlayers" / "nba_rating" / "scripts"))
+from nba_client import install_session, print_metrics, write_report
+from gamelog_store import update_gamelog, gamelog_path, RAW_STORE
 
-# Créer les dossiers data/ et data/raw/ s'ils n'existent pas
-if not DATA_DIR.exists():
-    DATA_DIR.mkdir(parents=True)
-if not RAW_DIR.exists():
-    RAW_DIR.mkdir(parents=True)
+RAW_STORE.mkdir(parents=True, exist_ok=True)
 
 # Définir les saisons à télécharger
 SEASONS = [f"{year}-{str(year+1)[-2:]}" for year in range(1999, 2024)]  # 2018-2019 à 2023-2024
 
-def collect_team_gamelog(season: str):
+def collect_team_gamelog(season: str, incremental: bool = False):
     """
     Récupère les GameLogs d'une saison et sauvegarde en Parquet.
+    En mode incrémental, n'ajoute que les matchs joués depuis la dernière collecte.
     """
-    out_path = RAW_DIR / f"team_gamelog_{season}.parquet"
-    
-    if out_path.exists():
-        print(f"📁 GameLog {season} déjà présent")
-        return
+    out_path = gamelog_path("T", season)
 
     try:
-        df = LeagueGameLog(
-            player_or_team_abbreviation="T",  # "T" pour Team
-            season=season,
-            season_type_all_star="Regular Season",
-            timeout=60
-        ).get_data_frames()[0]
-
-        df.to_parquet(out_path, index=False)
-        print(f"✅ {season}: {len(df)} matchs collectés")
-
+        added = update_gamelog(out_path, "T", season, incremental=incremental)
     except Exception as e:
         print(f"❌ Erreur pour {season} : {e}")
+        return
 
-    time.sleep(1)  # Petite pause pour éviter d'être bloqué par l'APIpwd
+    if added is None:
+        print(f"📁 GameLog {season} déjà présent")
+        return
+    print(f"✅ {season}: {added} matchs collectés" + (" (incrémental)" if incremental else ""))
 
 if __name__ == "__main__":
-    print(f"📦 Collecte des GameLogs dans {RAW_DIR.resolve()}")
-    for season in SEASONS:
+    p = argparse.ArgumentParser(description="Collecte des GameLogs équipes")
+    p.add_argument("--incremental", action="store_true",
+                   help="Ajoute les nouveaux matchs aux gamelogs existants au lieu de les ignorer")
+    p.add_argument("--season", action="append",
+                   help="Saison(s) à collecter, ex. 2024-25 (défaut : 1999-00 → 2023-24)")
+    args = p.parse_args()
+
+    install_session()
+    print(f"📦 Collecte des GameLogs dans {RAW_STORE.resolve()}")
+    for season in args.season or SEASONS:
         print(f"\n=== Saison {season} ===")
-        collect_team_gamelog(season)
+        collect_team_gamelog(season, incremental=args.incremental)
+    print_metrics()
+    write_report(BASE_DIR / "data" / "reports", "collect_team_data")
     print("\n✅ Collecte des GameLogs terminée.")
 
     
@@ -1,31 +1,120 @@
 # fetch_logos.py
+"""
+Télécharge les logos SVG des 30 équipes dans logos/ :
+  · requêtes asynchrones (asyncio) sur une session HTTP poolée, au plus
+    CONCURRENCY en vol à la fois
+  · GET conditionnels (If-None-Match / If-Modified-Since) : un logo inchangé
+    répond 304 et le fichier n'est pas réécrit
+  · logos/manifest.json : team_id → abréviation, fichier, sha256, ETag…
+    utilisé par les dashboards pour servir les logos en local
+
+Usage (depuis MLTeams/) :
+    python scripts/fetch_logos.py
+"""
+import asyncio
+import hashlib
+import json
 import os
+import sys
+from pathlib import Path
+
 import requests
 from nba_api.stats.static import teams
-from time import sleep
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "MLPlayers" / "nba_rating" / "scripts"))
+from nba_client import CachedSession
+import http_cache
 
 # 1) Dossier de sortie
-out_dir = "logos"
-os.makedirs(out_dir, exist_ok=True)
-
-# 2) Récupération des équipes NBA
-teams_list = teams.get_teams()
-print(f"Trouvé {len(teams_list)} équipes.")
-
-# 3) Pour chaque équipe, télécharger son logo SVG
-for t in teams_list:
-    tid  = t["id"]
-    abbr = t["abbreviation"]
-    # URL standard du logo NBA
-    url  = f"https://cdn.nba.com/logos/nba/{tid}/primary/L/logo.svg"
-    resp = requests.get(url, timeout=5)
-    if resp.status_code == 200:
-        path = os.path.join(out_dir, f"{abbr}.svg")
-        with open(path, "wb") as f:
-            f.write(resp.content)
+out_dir  = Path("logos")
+MANIFEST = out_dir / "manifest.json"
+CONCURRENCY = 6
+# NBA_CDN_BASE_URL permet de pointer vers mock_nba_server.py
+CDN_BASE = os.environ.get("NBA_CDN_BASE_URL", "https://cdn.nba.com").rstrip("/")
+URL = CDN_BASE + "/logos/nba/{tid}/primary/L/logo.svg"
+
+
+def make_session() -> requests.Session:
+    # En mode replay, on rejoue le cache HTTP (aucun appel réseau) ;
+    # sinon les GET conditionnels jouent le rôle de cache.
+    if http_cache.MODE == "replay":
+        return CachedSession()
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=CONCURRENCY)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def fetch_logo(session: requests.Session, team: dict, previous: dict) -> dict:
+    tid, abbr = team["id"], team["abbreviation"]
+    path  = out_dir / f"{abbr}.svg"
+    entry = {"abbr": abbr, "path": path.name, "url": URL.format(tid=tid)}
+
+    headers = {}
+    if path.exists():
+        if previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+
+    resp = session.get(entry["url"], headers=headers, timeout=5)
+    if resp.status_code == 304:
+        print(f"✔️  {abbr} inchangé (304)")
+        return {**previous, **entry}
+    if resp.status_code != 200:
+        print(f"⚠️ Échec pour {abbr} ({resp.status_code})")
+        return previous or None
+
+    digest = hashlib.sha256(resp.content).hexdigest()
+    if digest != previous.get("sha256") or not path.exists():
+        tmp = path.with_suffix(".svg.tmp")
+        tmp.write_bytes(resp.content)
+        tmp.replace(path)
         print(f"📥 {abbr} → {path}")
     else:
-        print(f"⚠️ Échec pour {abbr} ({resp.status_code})")
-    sleep(0.1)  # politesse
+        print(f"✔️  {abbr} identique (sha256)")
+    return {
+        **entry,
+        "sha256":        digest,
+        "bytes":         len(resp.content),
+        "etag":          resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+    }
+
+
+async def fetch_all(teams_list: list[dict], manifest: dict) -> dict:
+    session = make_session()
+    sem = asyncio.Semaphore(CONCURRENCY)
+
+    async def one(team):
+        async with sem:
+            # requests est bloquant : on le délègue au pool de threads d'asyncio
+            return team["id"], await asyncio.to_thread(
+                fetch_logo, session, team, manifest.get(str(team["id"]), {})
+            )
+
+    results = await asyncio.gather(*(one(t) for t in teams_list), return_exceptions=True)
+    out = dict(manifest)
+    for res in results:
+        if isinstance(res, Exception):
+            print(f"❌ {res}")
+            continue
+        tid, entry = res
+        if entry:
+            out[str(tid)] = entry
+    return out
+
+
+if __name__ == "__main__":
+    os.makedirs(out_dir, exist_ok=True)
+
+    # 2) Récupération des équipes NBA
+    teams_list = teams.get_teams()
+    print(f"Trouvé {len(teams_list)} équipes.")
 
-print("Terminé !")
+    # 3) Téléchargement concurrent + mise à jour du manifest
+    manifest = json.loads(MANIFEST.read_text()) if MANIFEST.exists() else {}
+    manifest = asyncio.run(fetch_all(teams_list, manifest))
+    MANIFEST.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    print(f"Terminé ! Manifest → {MANIFEST} ({len(manifest)} logos)")
@@ -4,36 +4,49 @@
 """
 assemble_curated.py
 -------------------
-Assemble tous les fichiers par saison en un seul dataset global.
+Vérifie le dataset global des team gamelogs, partitionné par saison dans le
+store raw partagé avec MLPlayers (raw/team_gamelog/season=…/part-0.parquet).
+Les dashboards lisent directement ce dataset : plus de copie concaténée
+team_gamelog_all_seasons.parquet (supprimée si présente), mais un instantané
+Arrow memory-mappable (team_gamelog, pair_preds) est régénéré pour eux.
 """
 
-import pandas as pd
+import sys
 from pathlib import Path
 
 # Chemins des dossiers
 BASE_DIR = Path(__file__).resolve().parents[1]
-RAW_DIR = BASE_DIR / "data" / "raw"
+sys.path.insert(0, str(BASE_DIR.parent / "MLPlayers" / "nba_rating" / "scripts"))
+from gamelog_store import dataset_dir, gamelog_dataset, gamelog_seasons, migrate_legacy, scan_gamelogs
+from arrow_snapshots import write_snapshot
+import pandas as pd
 CURATED_DIR = BASE_DIR / "data" / "curated"
-CURATED_DIR.mkdir(parents=True, exist_ok=True)
+LEGACY_OUT  = CURATED_DIR / "team_gamelog_all_seasons.parquet"
+PAIR_PREDS  = CURATED_DIR / "all_pair_preds.parquet"
 
-# Liste des saisons à assembler
+# Liste des saisons attendues
 SEASONS = [f"{year}-{str(year+1)[-2:]}" for year in range(1999, 2024)]  # 2018-2019 à 2023-2024
 
-dfs = []
+moved = migrate_legacy("T")
+if moved:
+    print(f"🔄 {len(moved)} saisons migrées dans {dataset_dir('T')}")
+
+present = set(gamelog_seasons("T"))
 for season in SEASONS:
-    file_path = RAW_DIR / f"team_gamelog_{season}.parquet"
-    if file_path.exists():
-        df = pd.read_parquet(file_path)
-        df["season"] = season  # Ajoute la saison comme colonne
-        dfs.append(df)
-    else:
-        print(f"⚠ Fichier manquant pour la saison {season}")
-
-if dfs:
-    df_all = pd.concat(dfs, ignore_index=True)
-    output_path = CURATED_DIR / "team_gamelog_all_seasons.parquet"
-    df_all.to_parquet(output_path, index=False)
-    print(f"✅ Dataset global sauvegardé dans : {output_path}")
-    print(f"Forme du DataFrame final : {df_all.shape}")
+    if season not in present:
+        print(f"⚠ Partition manquante pour la saison {season}")
+
+if present:
+    dataset = gamelog_dataset("T")
+    rows = sum(f.count_rows() for f in dataset.get_fragments())
+    print(f"✅ Dataset global : {dataset_dir('T')}")
+    print(f"Forme du dataset : ({rows}, {len(dataset.schema.names)}) sur {len(present)} saisons")
+    write_snapshot(scan_gamelogs("T"), "team_gamelog")
+    if LEGACY_OUT.exists():
+        LEGACY_OUT.unlink()
+        print(f"🗑️  Copie concaténée supprimée : {LEGACY_OUT.name}")
 else:
-    print("❌ Aucun fichier à assembler.")
+    print("❌ Aucune partition à assembler.")
+
+if PAIR_PREDS.exists():
+    write_snapshot(pd.read_parquet(PAIR_PREDS), "pair_preds")
@@ -2,6 +2,7 @@
 # Tu peux le copier dans ton app Streamlit pour un rendu plus "pro".
 
 import os
+import sys
 import streamlit as st
 import pandas as pd
 import altair as alt
@@ -45,26 +46,37 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ─── CHARGEMENT DES DONNÉES ────────────────────────────────────────────────────
-@st.cache_data
+# Team gamelogs : dataset partitionné par saison du store raw partagé (season=…/)
+TEAM_GAMELOGS = os.path.join(os.environ.get("NBA_RAW_STORE", "../MLPlayers/nba_rating/data/raw"), "team_gamelog")
+
+# Instantanés Arrow memory-mappés (partagés entre workers), cf. arrow_snapshots.py
+sys.path.insert(0, os.path.abspath("../MLPlayers/nba_rating/scripts"))
+from arrow_snapshots import read_snapshot
+
+@st.cache_resource
 def load_gamelog():
-    for p in [
-        "data/curated/team_gamelog_all_seasons.parquet"    ]:
-        if os.path.exists(p):
-            df = pd.read_parquet(p)
-            df["date"] = pd.to_datetime(df["GAME_DATE"])
-            df["year"] = df["date"].dt.year
-            df["team"] = df["TEAM_NAME"]
-            df["win"]  = df["WL"].map({"W":1,"L":0})
-            df["pts"]  = df["PTS"]
-            df["ast"]  = df["AST"]
-            df["reb"]  = df["REB"]
-            df["stl"]  = df["STL"]
-            df["blk"]  = df["BLK"]
-            return df
-    raise FileNotFoundError("team_gamelog_all_seasons.parquet introuvable.")
-
-@st.cache_data
+    df = read_snapshot("team_gamelog")
+    if df is None and os.path.exists(TEAM_GAMELOGS):
+        df = pd.read_parquet(TEAM_GAMELOGS)
+    if df is None:
+        raise FileNotFoundError(f"{TEAM_GAMELOGS} introuvable.")
+    df["season"] = df["season"].astype(str)
+    df["date"] = pd.to_datetime(df["GAME_DATE"])
+    df["year"] = df["date"].dt.year
+    df["team"] = df["TEAM_NAME"]
+    df["win"]  = df["WL"].map({"W":1,"L":0})
+    df["pts"]  = df["PTS"]
+    df["ast"]  = df["AST"]
+    df["reb"]  = df["REB"]
+    df["stl"]  = df["STL"]
+    df["blk"]  = df["BLK"]
+    return df
+
+@st.cache_resource
 def load_pair_preds():
+    snap = read_snapshot("pair_preds")
+    if snap is not None:
+        return snap
     for p in [
         "data/curated/all_pair_preds.parquet"]:
         if os.path.exists(p):
@@ -198,5 +210,5 @@ with tab_modele:
             else:
                 st.error(f"❌ {away} est favori ({(1-p)*100:.1f}% de confiance)")
 
-            comp = df.groupby("team")[["pts", "reb", "ast", "stl", "blk"]].mean().loc[[home, away]]
+            comp = df.groupby("team", observed=True)[["pts", "reb", "ast", "stl", "blk"]].mean().loc[[home, away]]
             st.dataframe(comp.round(2))
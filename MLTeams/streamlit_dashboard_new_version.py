@@ -1,4 +1,5 @@
 import os
+import sys
 import streamlit as st
 import pandas as pd
 import altair as alt
@@ -110,9 +111,19 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ─── 3) CHARGEMENT DES DONNÉES ────────────────────────────────────────────────
-@st.cache_data
+# Team gamelogs : dataset partitionné par saison du store raw partagé (season=…/)
+TEAM_GAMELOGS = os.path.join(os.environ.get("NBA_RAW_STORE", "../MLPlayers/nba_rating/data/raw"), "team_gamelog")
+
+# Instantanés Arrow memory-mappés (partagés entre workers), cf. arrow_snapshots.py
+sys.path.insert(0, os.path.abspath("../MLPlayers/nba_rating/scripts"))
+from arrow_snapshots import read_snapshot
+
+@st.cache_resource
 def load_gamelog():
-    df = pd.read_parquet("data/curated/team_gamelog_all_seasons.parquet")
+    df = read_snapshot("team_gamelog")
+    if df is None:
+        df = pd.read_parquet(TEAM_GAMELOGS)
+    df["season"] = df["season"].astype(str)
     df["date"] = pd.to_datetime(df["GAME_DATE"])
     df["year"] = df["date"].dt.year
     df["team"] = df["TEAM_NAME"]
@@ -124,9 +135,10 @@ def load_gamelog():
     df["blk"]  = df["BLK"]
     return df
 
-@st.cache_data
+@st.cache_resource
 def load_preds():
-    return pd.read_parquet("data/curated/all_pair_preds.parquet")
+    snap = read_snapshot("pair_preds")
+    return snap if snap is not None else pd.read_parquet("data/curated/all_pair_preds.parquet")
 
 @st.cache_data
 def load_logos():
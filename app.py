@@ -13,8 +13,11 @@ import pandas as pd
 import altair as alt
 import streamlit.components.v1 as components
 import re, urllib.parse
+import base64, hashlib, json
 from functools import lru_cache
 import os
+import sys
+import pyarrow.parquet as pq
 import numpy as np
 from datetime import date
 
@@ -157,6 +160,33 @@ TEAM_INFO = {
     1610612766: ('CHA', 'https://cdn.nba.com/logos/nba/1610612766/global/L/logo.svg'),
 }
 
+# --- Logos servis en local (manifest produit par MLTeams/scripts/fetch_logos.py) ---
+LOGO_MANIFEST = "MLTeams/logos/manifest.json"
+
+@st.cache_data
+def load_local_logos():
+    """team_id → data-URI du SVG local dont le sha256 correspond au manifest."""
+    try:
+        with open(LOGO_MANIFEST) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    logos = {}
+    for tid, entry in manifest.items():
+        path = os.path.join(os.path.dirname(LOGO_MANIFEST), entry["path"])
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+        except OSError:
+            continue
+        if hashlib.sha256(content).hexdigest() == entry.get("sha256"):
+            logos[int(tid)] = "data:image/svg+xml;base64," + base64.b64encode(content).decode()
+    return logos
+
+# Le CDN ne sert plus que de secours si le logo local manque
+_local_logos = load_local_logos()
+TEAM_INFO = {tid: (abbr, _local_logos.get(tid, url)) for tid, (abbr, url) in TEAM_INFO.items()}
+
 # --- Ajout helper carte joueur ---
 from PIL import Image, ImageDraw, ImageFont
 import requests
@@ -262,9 +292,44 @@ def fetch_highlight_url(player: str) -> str | None:
     return f"https://www.youtube.com/watch?v={ids[0]}" if ids else None
 
 # 1) Chargement des données (en cache)
-@st.cache_data
+sys.path.insert(0, os.path.abspath("MLPlayers/nba_rating/scripts"))
+from column_contracts import dashboard_columns, TEAM_GAMELOG_COLUMNS
+from arrow_snapshots import read_snapshot
+
+DASHBOARD_SLIM = "MLPlayers/nba_rating/data/curated/dashboard_slim.parquet"
+DASHBOARD_FULL = "MLPlayers/nba_rating/data/curated/dashboard_data.parquet"
+
+# cache_resource : un seul objet par process, pas de copie à chaque rerun ;
+# les instantanés Arrow memory-mappés sont partagés entre workers via le page cache
+def find_position_col(columns):
+    return next(
+        (c for c in columns
+         if c != "position_full"
+         and (c.lower() in ("position", "pos", "player_pos", "player_position")
+              or "position" in c.lower())),
+        None
+    )
+
+def read_dashboard():
+    snap = read_snapshot("dashboard")
+    if snap is not None:
+        return snap
+    if os.path.exists(DASHBOARD_SLIM):
+        return pd.read_parquet(DASHBOARD_SLIM)
+    # Artefact slim pas encore généré : lecture projetée de l'artefact complet
+    cols = dashboard_columns(pq.read_schema(DASHBOARD_FULL).names)
+    return pd.read_parquet(DASHBOARD_FULL, columns=cols)
+
+@st.cache_resource
 def load_data():
-    df = pd.read_parquet("MLPlayers/nba_rating/data/curated/dashboard_data.parquet")
+    df = read_dashboard()
+    # position_full (nom complet du poste) calculée ici, une fois : l'objet en
+    # cache est partagé par toutes les sessions et ne doit plus être modifié
+    position_col = find_position_col(df.columns)
+    if position_col:
+        df["position_full"] = df[position_col].map(POS_MAPPING).fillna(df[position_col])
+    else:
+        df["position_full"] = None
     return df
 
 df = load_data()
@@ -287,12 +352,7 @@ if score_col is None:
 if score_col is None:
     st.warning(f"Colonne de score introuvable. Colonnes disponibles : {list(df.columns)}")
 # Colonnes position et équipe
-position_col = next(
-    (c for c in df.columns
-     if c.lower() in ("position", "pos", "player_pos", "player_position")
-     or "position" in c.lower()),
-    None
-)
+position_col = find_position_col(df.columns)
  # Column holding numeric team ID (preferred). Fallback to team name text column.
 team_col = next((c for c in df.columns if "team_id" in c.lower()), None)
 if team_col is None:
@@ -300,12 +360,6 @@ if team_col is None:
 # Détection colonne des profils (noms de clusters)
 profile_col = next((c for c in df.columns if "profile_name" in c.lower()), None)
 
-# Ajouter une colonne position_full avec le nom complet si position existe
-if position_col and position_col in df.columns:
-    df["position_full"] = df[position_col].map(POS_MAPPING).fillna(df[position_col])
-else:
-    df["position_full"] = None
-
 # On stoppe si colonnes manquantes
 if season_col is None or player_col is None or score_col is None:
     st.error(f"❌ Colonnes requises manquantes : season_col={season_col}, player_col={player_col}, score_col={score_col}")
@@ -316,9 +370,15 @@ st.markdown("### Explorez les statistiques et la carrière des joueurs NBA grâc
 st.markdown("---")
 
 # ─── Teams Tab: Data Loading and Utilities (Top-level) ─────────────────────────────
-@st.cache_data
+# Team gamelogs : dataset partitionné par saison du store raw partagé (season=…/)
+TEAM_GAMELOGS = os.path.join(os.environ.get("NBA_RAW_STORE", "MLPlayers/nba_rating/data/raw"), "team_gamelog")
+
+@st.cache_resource
 def load_gamelog():
-    df = pd.read_parquet("MLTeams/data/curated/team_gamelog_all_seasons.parquet")
+    df = read_snapshot("team_gamelog", columns=TEAM_GAMELOG_COLUMNS)
+    if df is None:
+        df = pd.read_parquet(TEAM_GAMELOGS, columns=TEAM_GAMELOG_COLUMNS)
+    df["season"] = df["season"].astype(str)
     df["date"] = pd.to_datetime(df["GAME_DATE"])
     df["year"] = df["date"].dt.year
     df["team"] = df["TEAM_NAME"]
@@ -330,9 +390,10 @@ def load_gamelog():
     df["blk"]  = df["BLK"]
     return df
 
-@st.cache_data
+@st.cache_resource
 def load_preds():
-    return pd.read_parquet("MLTeams/data/curated/all_pair_preds.parquet")
+    snap = read_snapshot("pair_preds")
+    return snap if snap is not None else pd.read_parquet("MLTeams/data/curated/all_pair_preds.parquet")
 
 @st.cache_data
 def load_logos():